@@ -1 +1,11 @@
-__all__ = ['app_settings', 'exception_formatter']
+__all__ = [
+    'app_settings',
+    'connection_pool',
+    'device_mgr',
+    'device_poller',
+    'device_topic',
+    'error_reporter',
+    'exception_formatter',
+    'status_memory',
+    'status_server',
+]
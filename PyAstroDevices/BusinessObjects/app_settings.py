@@ -2,6 +2,73 @@ import os
 from os.path import exists
 import json
 
+from device_topic import DeviceTopic
+
+
+class DeviceSettings(object):
+    """
+    Class to contain the connection settings for a single device instance.
+    Focusers also have backlash compensation settings; the overshoot is the
+    number of steps to move past the target before approaching it from the
+    chosen direction, either 'out' or 'in'. An overshoot of 0 turns off the
+    compensation. Telescopes have slew limits, a dictionary with the
+    HORIZON_FILE, MINIMUM_ALTITUDE, HOUR_ANGLE_EAST and HOUR_ANGLE_WEST
+    settings, any of which may be missing, and a pointing model, a
+    dictionary with the ENABLED flag and the sync POINTS.
+    """
+
+    def __init__(
+        self,
+        driverName="",
+        address="",
+        deviceNumber=0,
+        protocol="http",
+        backlashSteps=0,
+        backlashDirection="out",
+        slewLimits=None,
+        pointingModel=None,
+    ):
+        self._driverName = driverName
+        self._address = address
+        self._deviceNumber = deviceNumber
+        self._protocol = protocol
+        self._backlashSteps = backlashSteps
+        self._backlashDirection = backlashDirection
+        self._slewLimits = slewLimits or {}
+        self._pointingModel = pointingModel or {}
+
+    @property
+    def DriverName(self):
+        return self._driverName
+
+    @property
+    def Address(self):
+        return self._address
+
+    @property
+    def DeviceNumber(self):
+        return self._deviceNumber
+
+    @property
+    def Protocol(self):
+        return self._protocol
+
+    @property
+    def BacklashSteps(self):
+        return self._backlashSteps
+
+    @property
+    def BacklashDirection(self):
+        return self._backlashDirection
+
+    @property
+    def SlewLimits(self):
+        return dict(self._slewLimits)
+
+    @property
+    def PointingModel(self):
+        return dict(self._pointingModel)
+
 
 class ApplicationSettings(object):
     """
@@ -51,6 +118,20 @@ class ApplicationSettings(object):
             self._focuserDeviceNumber = 0
             self._focuserDriverName = ""
             self._focuserProtocol = "http"
+            self._focuserBacklashSteps = 0
+            self._focuserBacklashDirection = "out"
+            self._telescopeInstances = 1
+            self._focuserInstances = 1
+            self._statusServerPort = 0
+            self._statusSharedMemory = False
+            self._telescopeSlewLimits = {}
+            self._telescopePointingModel = {}
+
+            # the settings for the second and later instances of each device
+            # type, keyed by device ID. The settings of the first instance
+            # are kept in the properties above.
+
+            self._devices = {}
 
             self._InitGeometry()
 
@@ -108,6 +189,84 @@ class ApplicationSettings(object):
     def FocuserProtocol(self):
         return self._focuserProtocol
 
+    @property
+    def TelescopeInstances(self):
+        return self._telescopeInstances
+
+    @property
+    def FocuserInstances(self):
+        return self._focuserInstances
+
+    @property
+    def StatusServerPort(self):
+        return self._statusServerPort
+
+    @property
+    def StatusSharedMemory(self):
+        return self._statusSharedMemory
+
+    def GetDeviceIds(self, devType):
+        """
+        Get the IDs of all the configured instances of a device type
+
+        Positional arguments:
+        devType -- either 'telescope' or 'focuser'
+
+        Returns -- a list of device IDs, the first instance first
+        """
+        count = 1
+
+        if devType.lower() == "telescope":
+            count = self._telescopeInstances
+        elif devType.lower() == "focuser":
+            count = self._focuserInstances
+
+        return [DeviceTopic.MakeDeviceId(devType, n) for n in range(1, count + 1)]
+
+    def GetDeviceConfiguration(self, deviceId):
+        """
+        Get the connection settings for a device instance
+
+        Positional arguments:
+        deviceId -- the ID of the device instance
+
+        Returns -- a DeviceSettings instance
+        """
+        if deviceId == DeviceTopic.MakeDeviceId("telescope", 1):
+            return DeviceSettings(
+                self._telescopeDriverName,
+                self._telescopeAddress,
+                self._telescopeDeviceNumber,
+                self._telescopeProtocol,
+                slewLimits=self._telescopeSlewLimits,
+                pointingModel=self._telescopePointingModel,
+            )
+        elif deviceId == DeviceTopic.MakeDeviceId("focuser", 1):
+            return DeviceSettings(
+                self._focuserDriverName,
+                self._focuserAddress,
+                self._focuserDeviceNumber,
+                self._focuserProtocol,
+                self._focuserBacklashSteps,
+                self._focuserBacklashDirection,
+            )
+
+        device = self._devices.get(deviceId)
+
+        if device is None:
+            return DeviceSettings()
+
+        return DeviceSettings(
+            device.get("DRIVER_NAME", ""),
+            device.get("ADDRESS", ""),
+            device.get("DEVICENUM", 0),
+            device.get("PROTOCOL", "http"),
+            device.get("BACKLASH_STEPS", 0),
+            device.get("BACKLASH_DIRECTION", "out"),
+            device.get("SLEW_LIMITS", {}),
+            device.get("POINTING_MODEL", {}),
+        )
+
     def InitFromSettingsFile(self):
         """
         Read the contents of the settings file, deserialize the JSON and
@@ -134,6 +293,23 @@ class ApplicationSettings(object):
             self._focuserDeviceNumber = settings["FOCUSER_DEVICENUM"]
             self._focuserDriverName = settings["FOCUSER_DRIVER_NAME"]
             self._focuserProtocol = settings["FOCUSER_PROTOCOL"]
+
+            # these settings were added later, so older settings files
+            # may not have them
+
+            self._telescopeInstances = settings.get("TELESCOPE_INSTANCES", 1)
+            self._focuserInstances = settings.get("FOCUSER_INSTANCES", 1)
+            self._devices = settings.get("DEVICES", {})
+            self._statusServerPort = settings.get("STATUS_SERVER_PORT", 0)
+            self._statusSharedMemory = settings.get("STATUS_SHARED_MEMORY", False)
+            self._focuserBacklashSteps = settings.get("FOCUSER_BACKLASH_STEPS", 0)
+            self._focuserBacklashDirection = settings.get(
+                "FOCUSER_BACKLASH_DIRECTION", "out"
+            )
+            self._telescopeSlewLimits = settings.get("TELESCOPE_SLEW_LIMITS", {})
+            self._telescopePointingModel = settings.get(
+                "TELESCOPE_POINTING_MODEL", {}
+            )
             self._InitGeometry()
 
             f.close()
@@ -162,7 +338,9 @@ class ApplicationSettings(object):
         self._windowLeft = left
         self._windowTop = top
 
-    def SetDeviceConfiguration(self, devType, devName, devAddr, devNumber, devProtocol):
+    def SetDeviceConfiguration(
+        self, devType, devName, devAddr, devNumber, devProtocol, deviceId=None
+    ):
         """
         Update the current settings instance with updated telescope or
         focuser configuration values
@@ -173,8 +351,24 @@ class ApplicationSettings(object):
         devAddr     -- the device's IP address
         devNumber   -- the device number
         devProtocol -- either 'http' or 'https'
+
+        Keyword arguments:
+        deviceId    -- the ID of the device instance, or None for the first
+                       instance of the device type
         """
-        if devType.lower() == "telescope":
+        if deviceId is not None and deviceId != DeviceTopic.MakeDeviceId(devType, 1):
+            # update rather than replace the entry, to keep any other
+            # settings for the device
+
+            self._devices.setdefault(deviceId, {}).update(
+                {
+                    "DRIVER_NAME": devName,
+                    "ADDRESS": devAddr,
+                    "DEVICENUM": devNumber,
+                    "PROTOCOL": devProtocol,
+                }
+            )
+        elif devType.lower() == "telescope":
             self._telescopeDriverName = devName
             self._telescopeAddress = devAddr
             self._telescopeDeviceNumber = devNumber
@@ -185,6 +379,59 @@ class ApplicationSettings(object):
             self._focuserDeviceNumber = devNumber
             self._focuserProtocol = devProtocol
 
+    def SetBacklashCompensation(self, deviceId, steps, direction):
+        """
+        Update the current settings instance with the backlash compensation
+        values for a focuser
+
+        Positional arguments:
+        deviceId  -- the ID of the focuser instance
+        steps     -- the overshoot, in steps, or 0 for no compensation
+        direction -- the direction of the final approach, 'out' or 'in'
+        """
+        direction = direction.lower()
+
+        if direction not in ("out", "in"):
+            raise ValueError(f"Invalid backlash direction: {direction}")
+
+        if deviceId == DeviceTopic.MakeDeviceId("focuser", 1):
+            self._focuserBacklashSteps = steps
+            self._focuserBacklashDirection = direction
+        else:
+            device = self._devices.setdefault(deviceId, {})
+            device["BACKLASH_STEPS"] = steps
+            device["BACKLASH_DIRECTION"] = direction
+
+    def SetSlewLimits(self, deviceId, limits):
+        """
+        Update the current settings instance with the slew limits for a
+        telescope
+
+        Positional arguments:
+        deviceId -- the ID of the telescope instance
+        limits   -- a dictionary with any of the HORIZON_FILE,
+                    MINIMUM_ALTITUDE, HOUR_ANGLE_EAST and HOUR_ANGLE_WEST
+                    settings
+        """
+        if deviceId == DeviceTopic.MakeDeviceId("telescope", 1):
+            self._telescopeSlewLimits = dict(limits)
+        else:
+            self._devices.setdefault(deviceId, {})["SLEW_LIMITS"] = dict(limits)
+
+    def SetPointingModel(self, deviceId, model):
+        """
+        Update the current settings instance with the pointing model for a
+        telescope
+
+        Positional arguments:
+        deviceId -- the ID of the telescope instance
+        model    -- a dictionary with the ENABLED flag and the sync POINTS
+        """
+        if deviceId == DeviceTopic.MakeDeviceId("telescope", 1):
+            self._telescopePointingModel = dict(model)
+        else:
+            self._devices.setdefault(deviceId, {})["POINTING_MODEL"] = dict(model)
+
     def SaveSettings(self):
         """
         Save the current application settings to the settings file.
@@ -224,10 +471,19 @@ class ApplicationSettings(object):
             "TELESCOPE_DEVICENUM": self._telescopeDeviceNumber,
             "TELESCOPE_DRIVER_NAME": self._telescopeDriverName,
             "TELESCOPE_PROTOCOL": self._telescopeProtocol,
+            "TELESCOPE_SLEW_LIMITS": self._telescopeSlewLimits,
+            "TELESCOPE_POINTING_MODEL": self._telescopePointingModel,
             "FOCUSER_ADDRESS": self._focuserAddress,
             "FOCUSER_DEVICENUM": self._focuserDeviceNumber,
             "FOCUSER_DRIVER_NAME": self._focuserDriverName,
             "FOCUSER_PROTOCOL": self._focuserProtocol,
+            "FOCUSER_BACKLASH_STEPS": self._focuserBacklashSteps,
+            "FOCUSER_BACKLASH_DIRECTION": self._focuserBacklashDirection,
+            "TELESCOPE_INSTANCES": self._telescopeInstances,
+            "FOCUSER_INSTANCES": self._focuserInstances,
+            "DEVICES": self._devices,
+            "STATUS_SERVER_PORT": self._statusServerPort,
+            "STATUS_SHARED_MEMORY": self._statusSharedMemory,
         }
 
     # End of Private Methods and Properties
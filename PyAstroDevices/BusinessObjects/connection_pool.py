@@ -0,0 +1,98 @@
+import threading as thread
+
+import requests
+
+
+class AlpacaConnectionPool(object):
+    """
+    A singleton class that shares one HTTP session, and therefore one pool
+    of keep-alive connections, between all the devices that are served by
+    the same Alpaca server. Sessions are reference counted and closed when
+    the last device using them is released.
+    """
+
+    _instance = None
+
+    _POOL_SIZE = 10
+
+    @staticmethod
+    def GetInstance():
+        """
+        Provides access to the singleton instance, creating the instance if it
+        does not already exist
+
+        Returns -- the instance of AlpacaConnectionPool
+        """
+        # Static Access Method
+
+        if AlpacaConnectionPool._instance is None:
+            AlpacaConnectionPool()
+
+        return AlpacaConnectionPool._instance
+
+    def __init__(self):
+        # the class instance initializer
+
+        if AlpacaConnectionPool._instance is not None:
+            raise Exception("The AlpacaConnectionPool class is a singleton!")
+
+        AlpacaConnectionPool._instance = self
+        self._lock = thread.Lock()
+        self._sessions = {}
+
+    def Attach(self, device, address, protocol="http"):
+        """
+        Replace the private HTTP session of an alpyca device object with the
+        shared session for its Alpaca server.
+
+        Positional arguments:
+        device   -- the alpyca device object, e.g. a Telescope
+        address  -- the internet address and port number of the server
+        protocol -- either 'http' or 'https'
+        """
+        key = self._GetKey(address, protocol)
+
+        with self._lock:
+            entry = self._sessions.get(key)
+
+            if entry is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self._POOL_SIZE
+                )
+                session.mount(f"{protocol}://", adapter)
+                entry = [session, 0]
+                self._sessions[key] = entry
+
+            entry[1] += 1
+
+        # alpyca sends all of its requests through the rqs session
+
+        device.rqs = entry[0]
+
+    def Release(self, address, protocol="http"):
+        """
+        Release a device's use of the shared session for its server.
+
+        Positional arguments:
+        address  -- the internet address and port number of the server
+        protocol -- either 'http' or 'https'
+        """
+        key = self._GetKey(address, protocol)
+
+        with self._lock:
+            entry = self._sessions.get(key)
+
+            if entry is None:
+                return
+
+            entry[1] -= 1
+
+            if entry[1] <= 0:
+                del self._sessions[key]
+                entry[0].close()
+
+    def _GetKey(self, address, protocol):
+        # alpyca forces 'localhost' to IPv4, so do the same here
+
+        return (protocol.lower(), address.replace("localhost", "127.0.0.1"))
@@ -0,0 +1,221 @@
+import threading as thread
+from abc import ABC, abstractmethod
+
+from pubsub import pub
+
+from device_poller import DevicePollingScheduler
+from device_topic import DeviceTopic
+from exception_formatter import ExceptionFormatter
+from error_reporter import ErrorReporter
+
+
+class DeviceManager(ABC):
+    """
+    Base class for the device managers. It handles the periodic polling of
+    the connected device by registering with the shared
+    DevicePollingScheduler, so that any number of managers are serviced
+    without each creating its own polling thread.
+
+    Derived classes provide the names of their status and polling exception
+    messages and override the _ReadStatus, _GetPollingInterval and
+    _PollingExceptionListener methods.
+
+    Each manager is identified by a device ID. All the messages that it
+    sends are published on topics for that device ID, so that several
+    managers can run at the same time.
+    """
+
+    _POLLING_INTERVAL_FAST = 1.0  # once per second
+    _POLLING_INTERVAL_NORMAL = 5.0  # every 5 seconds
+    _POLLING_INTERVAL_SLOW = 10.0  # every 10 seconds
+
+    _STATUS_TOPIC = None
+    _POLLING_EXCEPTION_TOPIC = None
+
+    def __init__(self, deviceId=None):
+        # Initialize the instance level variables
+
+        self._id = deviceId
+        self._isConnected = False
+        self._isPolling = False
+        self._pollingJob = None
+        self._pollingException = None
+        self._status = None
+        self._statusCount = 0
+        self._statusCondition = thread.Condition()
+        self._isListenerFailing = False
+
+    # Start of Public Properties
+
+    @property
+    def ID(self):
+        return self._id
+
+    @property
+    def Status(self):
+        return self._status
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def Topic(self, topic):
+        """
+        Get the name of a message topic for this manager's device
+
+        Positional arguments:
+        topic -- the plain topic name, e.g. 'TelescopeStatusUpdate'
+
+        Returns -- the topic name for this device
+        """
+        return DeviceTopic.Format(topic, self._id)
+
+    def ImmediateStatusUpdate(self):
+        """
+        Cause the status to be read and sent to subscribers immediately,
+        rather than waiting for the next polling interval.
+        """
+        if self._isConnected:
+            self._InterruptPollingSleep()
+
+    def WaitForStatusUpdate(self, timeout=None):
+        """
+        Block until the next status update has been read from the device.
+        This allows scripts to follow the device status without subscribing
+        to the status messages.
+
+        Keyword arguments:
+        timeout -- the maximum number of seconds to wait, or None to wait
+                   indefinitely
+
+        Returns -- the new status, or None if the wait timed out or polling
+                   has stopped
+        """
+        with self._statusCondition:
+            count = self._statusCount
+            updated = self._statusCondition.wait_for(
+                lambda: self._statusCount != count or not self._isPolling, timeout
+            )
+
+            if not updated or self._statusCount == count:
+                return None
+
+            return self._status
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    @abstractmethod
+    def _ReadStatus(self):
+        # read fresh status from the device. Derived classes must override
+        # this method.
+
+        pass
+
+    def _GetPollingInterval(self, status):
+        # get the number of seconds until the next status update. Derived
+        # classes override this method to poll faster while the device is
+        # in motion.
+
+        return self._POLLING_INTERVAL_NORMAL
+
+    def _PollingExceptionListener(self, xcp):
+        # report an error raised while polling. Derived classes override
+        # this method.
+
+        pass
+
+    def _PollDevice(self):
+        # this method is called by the polling scheduler, on one of its
+        # worker threads, each time that our device is due to be polled.
+
+        # get fresh status from the device
+
+        try:
+            status = self._ReadStatus()
+        except Exception as xcp:
+            self._pollingException = xcp
+
+            with self._statusCondition:
+                self._isPolling = False
+                self._statusCondition.notify_all()
+
+            pub.sendMessage(self.Topic(self._POLLING_EXCEPTION_TOPIC), xcp=xcp)
+
+            return None
+
+        # save the new status and release any waiting scripts
+
+        with self._statusCondition:
+            self._status = status
+            self._statusCount += 1
+            self._statusCondition.notify_all()
+
+        # send status update message. A failing listener must not stop the
+        # polling, so its error is reported and the polling goes on.
+
+        try:
+            pub.sendMessage(self.Topic(self._STATUS_TOPIC), sts=self._status)
+        except Exception as xcp:
+            self._StatusListenerFailed(xcp)
+        else:
+            self._isListenerFailing = False
+
+        # tell the scheduler when to poll us again
+
+        return self._GetPollingInterval(self._status)
+
+    def _StatusListenerFailed(self, xcp):
+        # report an error raised by a status listener, only the first of a
+        # run of failures so the same error is not reported on every poll
+
+        if self._isListenerFailing:
+            return
+
+        self._isListenerFailing = True
+        msg = "An error occurred while handling a status update. "
+        msg += "Details follow:\r\n\r\n"
+        msg += ExceptionFormatter.GetInstance().Format(xcp)
+        ErrorReporter.GetInstance().Report("Status Update Error", msg, xcp)
+
+    def _StartDevicePolling(self):
+        # begin polling the connected device for fresh status
+
+        # return if not connected or if already polling
+
+        if not self._isConnected or self._isPolling:
+            return
+
+        # subscribe to receive any unhandled exception raised while polling
+
+        pub.subscribe(
+            self._PollingExceptionListener, self.Topic(self._POLLING_EXCEPTION_TOPIC)
+        )
+
+        scheduler = DevicePollingScheduler.GetInstance()
+        self._pollingJob = scheduler.Register(
+            self._PollDevice, name=self.Topic(self.__class__.__name__)
+        )
+        self._isPolling = True
+
+    def _StopDevicePolling(self):
+        # remove the device from the polling schedule and wait for any
+        # status update in progress to finish.
+
+        if self._pollingJob is not None:
+            scheduler = DevicePollingScheduler.GetInstance()
+            scheduler.Unregister(self._pollingJob)
+            self._pollingJob = None
+
+        with self._statusCondition:
+            self._isPolling = False
+            self._statusCondition.notify_all()
+
+    def _InterruptPollingSleep(self):
+        # force an immediate status update
+
+        if self._pollingJob is not None:
+            DevicePollingScheduler.GetInstance().WakeUp(self._pollingJob)
+
+    # End of Private Helper Methods
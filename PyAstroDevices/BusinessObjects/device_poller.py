@@ -0,0 +1,278 @@
+import heapq
+import itertools
+import threading as thread
+from time import monotonic
+from concurrent.futures import ThreadPoolExecutor
+
+from exception_formatter import ExceptionFormatter
+from error_reporter import ErrorReporter
+
+
+class PollingJob(object):
+    """
+    Class to contain the scheduling state of one device that is registered
+    with the DevicePollingScheduler. Instances are created by the scheduler
+    and returned to the caller as a handle for later calls.
+    """
+
+    def __init__(self, pollMethod, name=""):
+        # the instance initializer
+
+        self._pollMethod = pollMethod
+        self._name = name
+        self._registered = True
+        self._running = False
+        self._runningThread = None
+        self._wakeRequested = False
+        self._due = None
+
+    @property
+    def Name(self):
+        return self._name
+
+    @property
+    def IsRegistered(self):
+        return self._registered
+
+    @property
+    def IsRunning(self):
+        return self._running
+
+
+class DevicePollingScheduler(object):
+    """
+    A singleton class that polls every connected device from a single
+    scheduler thread. Registered jobs are kept in a priority queue ordered
+    by the time that they are next due.
+
+    A due job is run on a pool of worker threads that grows to one worker
+    for each registered job, so a device that is slow to answer only
+    occupies its own worker and cannot delay the polling of the other
+    devices. A job is never queued again while it is running, so a slow
+    device cannot build up a backlog of polls either.
+
+    The poll method of a job returns the number of seconds until it should
+    be run again, or None to stop polling. A poll method that raises is
+    reported and run again after the retry interval.
+    """
+
+    _instance = None
+
+    _RETRY_INTERVAL = 5.0  # seconds until a failed poll is run again
+
+    @staticmethod
+    def GetInstance():
+        """
+        Provides access to the singleton instance, creating the instance if it
+        does not already exist
+
+        Returns -- the instance of DevicePollingScheduler
+        """
+        # Static Access Method
+
+        if DevicePollingScheduler._instance is None:
+            DevicePollingScheduler()
+
+        return DevicePollingScheduler._instance
+
+    def __init__(self):
+        # the class instance initializer
+
+        if DevicePollingScheduler._instance is not None:
+            raise Exception("The DevicePollingScheduler class is a singleton!")
+
+        DevicePollingScheduler._instance = self
+
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = thread.Condition()
+        self._schedulerThread = None
+        self._jobs = set()
+        self._executor = None
+        self._workerCount = 0
+
+    # Start of Public Methods
+
+    def Register(self, pollMethod, name=""):
+        """
+        Add a device to the polling schedule. The first poll is run
+        immediately.
+
+        Positional arguments:
+        pollMethod -- a callable that polls the device and returns the
+                      number of seconds until the next poll, or None to stop
+                      polling
+
+        Keyword arguments:
+        name       -- an optional name for the job, for diagnostic use
+
+        Returns -- the PollingJob handle for the registered device
+        """
+        job = PollingJob(pollMethod, name)
+
+        with self._condition:
+            self._jobs.add(job)
+            self._GrowWorkers()
+            self._StartSchedulerThread()
+            self._Schedule(job, monotonic())
+
+        return job
+
+    def Unregister(self, job, wait=True):
+        """
+        Remove a device from the polling schedule.
+
+        Positional arguments:
+        job  -- the handle that was returned by Register
+
+        Keyword arguments:
+        wait -- if True, block until any poll in progress has finished.
+                There is no wait when called from within the job's own poll.
+        """
+        with self._condition:
+            job._registered = False
+            job._due = None
+            self._jobs.discard(job)
+            self._condition.notify_all()
+
+            if not wait or job._runningThread == thread.get_ident():
+                return
+
+            while job._running:
+                self._condition.wait()
+
+    def WakeUp(self, job):
+        """
+        Cause a registered job to be polled as soon as possible. If the job
+        is currently being polled, it will be polled again when that poll
+        finishes.
+
+        Positional arguments:
+        job -- the handle that was returned by Register
+        """
+        with self._condition:
+            if not job._registered:
+                return
+
+            if job._running:
+                job._wakeRequested = True
+            else:
+                self._Schedule(job, monotonic())
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _StartSchedulerThread(self):
+        # create the scheduler thread the first time that it is needed.
+        # The caller must hold the condition lock.
+
+        if self._schedulerThread is None:
+            self._schedulerThread = thread.Thread(
+                target=self._SchedulerTask, name="DevicePollingScheduler", daemon=True
+            )
+            self._schedulerThread.start()
+
+    def _GrowWorkers(self):
+        # make sure that there is a worker for every registered job. The
+        # executor cannot be resized, so it is replaced by a larger one and
+        # any polls that are running on the old one finish there. The
+        # caller must hold the condition lock.
+
+        if len(self._jobs) <= self._workerCount:
+            return
+
+        previous = self._executor
+        self._workerCount = len(self._jobs)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._workerCount, thread_name_prefix="DevicePolling"
+        )
+
+        if previous is not None:
+            previous.shutdown(wait=False)
+
+    def _Schedule(self, job, due):
+        # queue a job to be run at the due time. Any earlier queue entry for
+        # the job becomes stale and is discarded when it reaches the front
+        # of the queue. The caller must hold the condition lock.
+
+        job._due = due
+        heapq.heappush(self._queue, (due, next(self._sequence), job))
+        self._condition.notify_all()
+
+    def _SchedulerTask(self):
+        # this method runs on the scheduler thread. It sleeps until the job
+        # at the front of the queue is due and then hands it to the worker
+        # pool. The job is submitted while holding the lock, so the pool
+        # cannot be replaced in between.
+
+        while True:
+            with self._condition:
+                job = self._GetNextDueJob()
+                job._running = True
+                self._executor.submit(self._RunJob, job)
+
+    def _GetNextDueJob(self):
+        # wait for the next due job. The caller must hold the condition lock.
+
+        while True:
+            if len(self._queue) == 0:
+                self._condition.wait()
+                continue
+
+            due, _, job = self._queue[0]
+
+            # discard stale entries for rescheduled or unregistered jobs
+
+            if not job._registered or job._due != due or job._running:
+                heapq.heappop(self._queue)
+                continue
+
+            delay = due - monotonic()
+
+            if delay > 0:
+                self._condition.wait(delay)
+                continue
+
+            heapq.heappop(self._queue)
+
+            return job
+
+    def _RunJob(self, job):
+        # poll a single device on a worker thread and schedule its next poll
+
+        interval = None
+
+        with self._condition:
+            job._runningThread = thread.get_ident()
+
+        try:
+            interval = job._pollMethod()
+        except Exception as xcp:
+            # the poll method should report its own errors, so this is a
+            # bug. Report it, but keep polling so the device status does not
+            # silently go stale.
+
+            interval = self._RETRY_INTERVAL
+            msg = f"An unexpected error occurred while polling {job.Name}. "
+            msg += "Details follow:\r\n\r\n"
+            msg += ExceptionFormatter.GetInstance().Format(xcp)
+            ErrorReporter.GetInstance().Report("Polling Error", msg, xcp)
+        finally:
+            with self._condition:
+                job._running = False
+                job._runningThread = None
+
+                if interval is None:
+                    job._registered = False
+                    self._jobs.discard(job)
+                elif job._registered:
+                    if job._wakeRequested:
+                        interval = 0.0
+
+                    self._Schedule(job, monotonic() + interval)
+
+                job._wakeRequested = False
+                self._condition.notify_all()
+
+    # End of Private Helper Methods
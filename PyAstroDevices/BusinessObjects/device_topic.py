@@ -0,0 +1,52 @@
+import re
+
+
+class DeviceTopic:
+    """
+    This class builds the names of the pubsub message topics for a single
+    device instance, so that several telescopes or focusers can be used at
+    the same time without their messages being mixed up.
+
+    A device topic is a subtopic of the plain topic, named for the device,
+    e.g. 'TelescopeStatusUpdate.Telescope2'. Views subscribe to the topic
+    for their own device. A listener for the plain topic receives the
+    messages for every device.
+
+    All the methods are static methods and do not need an instance of the
+    class to be created.
+    """
+
+    @staticmethod
+    def Format(topic, deviceId):
+        """
+        Get the name of a message topic for a device
+
+        Positional arguments:
+        topic    -- the plain topic name, e.g. 'TelescopeStatusUpdate'
+        deviceId -- the device ID, or None for the plain topic
+
+        Returns -- the device-specific topic name
+        """
+        if not deviceId:
+            return topic
+
+        return f"{topic}.{deviceId}"
+
+    @staticmethod
+    def MakeDeviceId(devType, instance):
+        """
+        Build the device ID for an instance of a device type. The first
+        instance of each type is named for the type alone.
+
+        Positional arguments:
+        devType  -- either 'telescope' or 'focuser'
+        instance -- the 1-based instance number
+
+        Returns -- a device ID that is valid in a topic name, e.g. 'Focuser3'
+        """
+        name = re.sub(r"\W", "", devType.title())
+
+        if instance <= 1:
+            return name
+
+        return f"{name}{instance}"
@@ -0,0 +1,84 @@
+import sys
+import threading as thread
+
+
+class ErrorReporter(object):
+    """
+    A singleton class that delivers error reports from the device managers
+    to pluggable error handlers. The managers do not depend on any user
+    interface toolkit; the GUI application installs a handler that shows a
+    message box, while headless scripts can log or raise instead.
+
+    A handler is any callable that accepts the title, the message and the
+    exception (or None). When no handler is installed errors are written
+    to stderr.
+    """
+
+    _instance = None
+
+    @staticmethod
+    def GetInstance():
+        """
+        Provides access to the singleton instance, creating the instance if it
+        does not already exist
+
+        Returns -- the instance of ErrorReporter
+        """
+        # Static Access Method
+
+        if ErrorReporter._instance is None:
+            ErrorReporter()
+
+        return ErrorReporter._instance
+
+    def __init__(self):
+        # the class instance initializer
+
+        if ErrorReporter._instance is not None:
+            raise Exception("The ErrorReporter class is a singleton!")
+
+        ErrorReporter._instance = self
+        self._lock = thread.Lock()
+        self._handlers = []
+
+    def AddHandler(self, handler):
+        """
+        Install an error handler
+
+        Positional arguments:
+        handler -- a callable taking (title, message, xcp)
+        """
+        with self._lock:
+            if handler not in self._handlers:
+                self._handlers.append(handler)
+
+    def RemoveHandler(self, handler):
+        """
+        Remove a previously installed error handler
+
+        Positional arguments:
+        handler -- the handler to be removed
+        """
+        with self._lock:
+            if handler in self._handlers:
+                self._handlers.remove(handler)
+
+    def Report(self, title, message, xcp=None):
+        """
+        Send an error report to every installed handler
+
+        Positional arguments:
+        title   -- a short title for the error
+        message -- the full error message
+
+        Keyword arguments:
+        xcp     -- the exception that caused the error, if any
+        """
+        with self._lock:
+            handlers = list(self._handlers)
+
+        if len(handlers) == 0:
+            sys.stderr.write(f"{title}: {message}\n")
+
+        for handler in handlers:
+            handler(title, message, xcp)
@@ -0,0 +1,423 @@
+import time
+import struct
+import threading as thread
+from multiprocessing import shared_memory, resource_tracker
+
+from pubsub import pub
+
+
+class StatusMemoryLayout(object):
+    """
+    The fixed layout of a shared memory status block. A block starts with a
+    header, followed by the status fields in a fixed order:
+
+    offset  0 -- magic number b'PADS'
+    offset  4 -- layout version, unsigned 16 bit
+    offset  6 -- status type code, unsigned 16 bit
+    offset  8 -- sequence counter, unsigned 64 bit
+    offset 16 -- the time of the status, seconds since the epoch, double
+    offset 24 -- the status fields
+
+    All values are little-endian. Booleans are stored as one byte, enumerated
+    values as signed 32 bit integers and all others as doubles, with NaN for
+    values that are not available.
+
+    The sequence counter is odd while the block is being written and even
+    when it is consistent.
+    """
+
+    MAGIC = b"PADS"
+    VERSION = 1
+
+    TELESCOPE_STATUS = 1
+    FOCUSER_STATUS = 2
+
+    _HEADER = struct.Struct("<4sHHQd")
+    _SEQUENCE = struct.Struct("<Q")
+    _SEQUENCE_OFFSET = 8
+
+    # the fields of each type of status, as (name, struct format) pairs
+
+    _FIELDS = {
+        TELESCOPE_STATUS: [
+            ("Altitude", "d"),
+            ("AtHome", "?"),
+            ("AtPark", "?"),
+            ("Azimuth", "d"),
+            ("Connected", "?"),
+            ("Declination", "d"),
+            ("DeclinationRate", "d"),
+            ("GuideRateDeclination", "d"),
+            ("GuideRateRightAscension", "d"),
+            ("IsPulseGuiding", "?"),
+            ("RightAscension", "d"),
+            ("RightAscensionRate", "d"),
+            ("SideOfPier", "i"),
+            ("SiderealTime", "d"),
+            ("Slewing", "?"),
+            ("TargetDeclination", "d"),
+            ("TargetRightAscension", "d"),
+            ("Tracking", "?"),
+            ("TrackingRate", "i"),
+            ("HourAngle", "d"),
+            ("IsCounterWeightUp", "?"),
+        ],
+        FOCUSER_STATUS: [
+            ("Connected", "?"),
+            ("IsMoving", "?"),
+            ("Position", "d"),
+            ("TempComp", "?"),
+            ("Temperature", "d"),
+        ],
+    }
+
+    _TYPE_CODES = {"TelescopeStatus": TELESCOPE_STATUS, "FocuserStatus": FOCUSER_STATUS}
+
+    @staticmethod
+    def GetTypeCode(statusType):
+        """
+        Get the type code for the name of a status class
+
+        Positional arguments:
+        statusType -- the status class name, e.g. 'TelescopeStatus'
+
+        Returns -- the type code
+        """
+        return StatusMemoryLayout._TYPE_CODES[statusType]
+
+    @staticmethod
+    def GetFieldNames(typeCode):
+        """
+        Get the names of the status fields, in block order
+
+        Positional arguments:
+        typeCode -- the status type code
+
+        Returns -- a list of field names
+        """
+        return [name for name, _ in StatusMemoryLayout._FIELDS[typeCode]]
+
+    @staticmethod
+    def GetFieldStruct(typeCode):
+        """
+        Get the struct that packs the status fields of a type
+
+        Positional arguments:
+        typeCode -- the status type code
+
+        Returns -- a struct.Struct instance
+        """
+        fmt = "".join(f for _, f in StatusMemoryLayout._FIELDS[typeCode])
+
+        return struct.Struct("<" + fmt)
+
+    @staticmethod
+    def GetBlockSize(typeCode):
+        """
+        Get the size of a status block
+
+        Positional arguments:
+        typeCode -- the status type code
+
+        Returns -- the size in bytes
+        """
+        fields = StatusMemoryLayout.GetFieldStruct(typeCode)
+
+        return StatusMemoryLayout._HEADER.size + fields.size
+
+    @staticmethod
+    def GetBlockName(deviceId):
+        """
+        Get the name of the shared memory block for a device
+
+        Positional arguments:
+        deviceId -- the device ID, e.g. 'Telescope' or 'Focuser2'
+
+        Returns -- the shared memory block name
+        """
+        return f"PyAstroDevices_{deviceId}"
+
+
+class StatusMemoryWriter(object):
+    """
+    Class that creates the shared memory status block for one device and
+    writes each new status into it. The block is removed when the writer is
+    closed.
+    """
+
+    def __init__(self, deviceId, statusType):
+        """
+        Initializer method for the StatusMemoryWriter class
+
+        Positional arguments:
+        deviceId   -- the ID of the device
+        statusType -- the status class name, e.g. 'TelescopeStatus'
+        """
+        self._typeCode = StatusMemoryLayout.GetTypeCode(statusType)
+        self._names = StatusMemoryLayout.GetFieldNames(self._typeCode)
+        self._fields = StatusMemoryLayout.GetFieldStruct(self._typeCode)
+        size = StatusMemoryLayout.GetBlockSize(self._typeCode)
+        name = StatusMemoryLayout.GetBlockName(deviceId)
+
+        # a block that was left behind by a process that did not exit
+        # cleanly is reused
+
+        try:
+            self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name)
+
+            if self._shm.size < size:
+                self._shm.close()
+                raise
+
+        self._sequence = 0
+        StatusMemoryLayout._HEADER.pack_into(
+            self._shm.buf,
+            0,
+            StatusMemoryLayout.MAGIC,
+            StatusMemoryLayout.VERSION,
+            self._typeCode,
+            self._sequence,
+            float("nan"),
+        )
+
+    def Write(self, values, timestamp=None):
+        """
+        Write a new status into the block
+
+        Positional arguments:
+        values    -- a dictionary of the status property values
+
+        Keyword arguments:
+        timestamp -- the time of the status, the current time by default
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        fields = [values[name] for name in self._names]
+        buf = self._shm.buf
+
+        # mark the block as being written, write it, then mark it as
+        # consistent again
+
+        self._sequence += 1
+        StatusMemoryLayout._SEQUENCE.pack_into(
+            buf, StatusMemoryLayout._SEQUENCE_OFFSET, self._sequence
+        )
+        struct.pack_into("<d", buf, 16, timestamp)
+        self._fields.pack_into(buf, StatusMemoryLayout._HEADER.size, *fields)
+        self._sequence += 1
+        StatusMemoryLayout._SEQUENCE.pack_into(
+            buf, StatusMemoryLayout._SEQUENCE_OFFSET, self._sequence
+        )
+
+    def Close(self):
+        """
+        Close and remove the shared memory block
+        """
+        if self._shm is not None:
+            self._shm.close()
+
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+            self._shm = None
+
+
+class StatusMemoryReader(object):
+    """
+    Class that reads consistent snapshots of a device's status from its
+    shared memory block. It can be used from any process on the same host
+    and reads without any system calls, so it can be polled at any rate.
+    """
+
+    _MAX_RETRIES = 1000
+
+    def __init__(self, deviceId):
+        """
+        Initializer method for the StatusMemoryReader class
+
+        Positional arguments:
+        deviceId -- the ID of the device, e.g. 'Telescope' or 'Focuser2'
+
+        Raises FileNotFoundError if the device's status is not being
+        published.
+        """
+        name = StatusMemoryLayout.GetBlockName(deviceId)
+        self._shm = shared_memory.SharedMemory(name)
+
+        # attaching to a block registers it with this process's resource
+        # tracker, which would remove it when this process exits. Only the
+        # writer may remove the block.
+
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        magic, version, typeCode, _, _ = StatusMemoryLayout._HEADER.unpack_from(
+            self._shm.buf, 0
+        )
+
+        if magic != StatusMemoryLayout.MAGIC or version != StatusMemoryLayout.VERSION:
+            self._shm.close()
+            raise ValueError(f"{name} is not a compatible status block.")
+
+        self._typeCode = typeCode
+        self._names = StatusMemoryLayout.GetFieldNames(typeCode)
+        self._fields = StatusMemoryLayout.GetFieldStruct(typeCode)
+
+    @property
+    def TypeCode(self):
+        return self._typeCode
+
+    @property
+    def Sequence(self):
+        """
+        The current sequence counter, which changes each time that a new
+        status is written. It can be compared with a saved value to check
+        for a new status without reading it.
+        """
+        return StatusMemoryLayout._SEQUENCE.unpack_from(
+            self._shm.buf, StatusMemoryLayout._SEQUENCE_OFFSET
+        )[0]
+
+    def Read(self):
+        """
+        Read a consistent snapshot of the status
+
+        Returns -- a dictionary of the status property values, plus 'Time'
+                   and 'Sequence' entries, or None if no status has been
+                   written yet
+        """
+        buf = self._shm.buf
+        offset = StatusMemoryLayout._SEQUENCE_OFFSET
+
+        for _ in range(self._MAX_RETRIES):
+            before = StatusMemoryLayout._SEQUENCE.unpack_from(buf, offset)[0]
+
+            if before == 0:
+                return None
+
+            if before % 2 == 1:
+                # a write is in progress
+
+                continue
+
+            timestamp = struct.unpack_from("<d", buf, 16)[0]
+            values = self._fields.unpack_from(buf, StatusMemoryLayout._HEADER.size)
+            after = StatusMemoryLayout._SEQUENCE.unpack_from(buf, offset)[0]
+
+            if before == after:
+                retval = dict(zip(self._names, values))
+                retval["Time"] = timestamp
+                retval["Sequence"] = after
+
+                return retval
+
+        raise TimeoutError("Unable to read a consistent status snapshot.")
+
+    def Close(self):
+        """
+        Detach from the shared memory block
+        """
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+
+class StatusMemoryPublisher(object):
+    """
+    A singleton class that writes every telescope and focuser status update
+    into a shared memory block for each device, so that other processes on
+    the same host can read the latest status without any socket traffic.
+    See StatusMemoryReader.
+    """
+
+    _instance = None
+
+    _STATUS_TOPICS = ["TelescopeStatusUpdate", "FocuserStatusUpdate"]
+
+    @staticmethod
+    def GetInstance():
+        """
+        Provides access to the singleton instance, creating the instance if it
+        does not already exist
+
+        Returns -- the instance of StatusMemoryPublisher
+        """
+        # Static Access Method
+
+        if StatusMemoryPublisher._instance is None:
+            StatusMemoryPublisher()
+
+        return StatusMemoryPublisher._instance
+
+    def __init__(self):
+        # the class instance initializer
+
+        if StatusMemoryPublisher._instance is not None:
+            raise Exception("The StatusMemoryPublisher class is a singleton!")
+
+        StatusMemoryPublisher._instance = self
+        self._lock = thread.Lock()
+        self._writers = {}
+        self._isRunning = False
+
+    @property
+    def IsRunning(self):
+        return self._isRunning
+
+    def Start(self):
+        """
+        Start writing the status updates to shared memory
+        """
+        if self._isRunning:
+            return
+
+        for topic in self._STATUS_TOPICS:
+            pub.subscribe(self._StatusUpdateListener, topic)
+
+        self._isRunning = True
+
+    def Stop(self):
+        """
+        Stop writing the status updates and remove the shared memory blocks
+        """
+        if not self._isRunning:
+            return
+
+        for topic in self._STATUS_TOPICS:
+            pub.unsubscribe(self._StatusUpdateListener, topic)
+
+        with self._lock:
+            self._isRunning = False
+
+            for writer in self._writers.values():
+                writer.Close()
+
+            self._writers = {}
+
+    def _StatusUpdateListener(self, sts, topic=pub.AUTO_TOPIC):
+        # write the status to its device's block, creating the block the
+        # first time that the device reports its status. Each device is
+        # polled by one job at a time so there is only one writer per block.
+
+        name = topic.getName()
+
+        if "." not in name:
+            return
+
+        deviceId = name.split(".")[-1]
+
+        with self._lock:
+            if not self._isRunning:
+                return
+
+            writer = self._writers.get(deviceId)
+
+            if writer is None:
+                writer = StatusMemoryWriter(deviceId, sts.__class__.__name__)
+                self._writers[deviceId] = writer
+
+            writer.Write(sts.ToDict())
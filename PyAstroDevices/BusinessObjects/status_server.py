@@ -0,0 +1,372 @@
+import json
+import math
+import time
+import socket
+import selectors
+import threading as thread
+from collections import deque
+
+from pubsub import pub
+
+
+class _StatusClient(object):
+    # the connection state of one status consumer
+
+    def __init__(self, sock, address, maxMessages):
+        self.sock = sock
+        self.address = address
+        self.queue = deque()
+        self.maxMessages = maxMessages
+        self.pending = b""
+        self.dropped = 0
+        self.wantWrite = False
+
+    def Enqueue(self, data):
+        # queue a message for sending. When the client is not keeping up the
+        # oldest queued messages are dropped, since a newer status supersedes
+        # them.
+
+        self.queue.append(data)
+
+        while len(self.queue) > self.maxMessages:
+            self.queue.popleft()
+            self.dropped += 1
+
+
+class StatusServer(object):
+    """
+    A singleton class that republishes the device status updates to local
+    consumers, so that any number of tools can share the one polling loop
+    of each device instead of each polling the Alpaca driver.
+
+    Consumers connect to a TCP port on the loopback interface and receive a
+    stream of newline-delimited JSON messages, one per status update. Each
+    message carries the device ID, the status type, the time and the status
+    properties. The latest status of each device is sent to a consumer as
+    soon as it connects.
+
+    All the sockets are serviced by a single thread. A consumer that does
+    not read fast enough has its oldest queued messages dropped, up to the
+    per-client buffer limit, so a slow consumer never delays the polling
+    or the other consumers.
+    """
+
+    _instance = None
+
+    _MAX_QUEUED_MESSAGES = 50  # per client
+    _SEND_CHUNK_SIZE = 65536
+
+    _STATUS_TOPICS = ["TelescopeStatusUpdate", "FocuserStatusUpdate"]
+
+    @staticmethod
+    def GetInstance():
+        """
+        Provides access to the singleton instance, creating the instance if it
+        does not already exist
+
+        Returns -- the instance of StatusServer
+        """
+        # Static Access Method
+
+        if StatusServer._instance is None:
+            StatusServer()
+
+        return StatusServer._instance
+
+    def __init__(self):
+        # the class instance initializer
+
+        if StatusServer._instance is not None:
+            raise Exception("The StatusServer class is a singleton!")
+
+        StatusServer._instance = self
+
+        self._lock = thread.Lock()
+        self._clients = {}
+        self._latest = {}
+        self._selector = None
+        self._listener = None
+        self._wakeReader = None
+        self._wakeWriter = None
+        self._serverThread = None
+        self._isRunning = False
+        self._port = None
+        self._maxMessages = self._MAX_QUEUED_MESSAGES
+
+    # Start of Public Properties
+
+    @property
+    def IsRunning(self):
+        return self._isRunning
+
+    @property
+    def Port(self):
+        return self._port
+
+    @property
+    def ClientCount(self):
+        with self._lock:
+            return len(self._clients)
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def Start(self, port, maxMessages=_MAX_QUEUED_MESSAGES):
+        """
+        Start listening for consumers and republishing the status updates.
+
+        Positional arguments:
+        port        -- the TCP port on the loopback interface, or 0 to have
+                       the system choose one
+
+        Keyword arguments:
+        maxMessages -- the number of messages that are buffered for each
+                       consumer before the oldest are dropped
+
+        Returns -- the port number that is being listened on
+        """
+        if self._isRunning:
+            return self._port
+
+        self._maxMessages = max(1, maxMessages)
+        self._listener = socket.create_server(("127.0.0.1", port))
+        self._listener.setblocking(False)
+        self._port = self._listener.getsockname()[1]
+
+        self._wakeReader, self._wakeWriter = socket.socketpair()
+        self._wakeReader.setblocking(False)
+        self._wakeWriter.setblocking(False)
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._selector.register(self._wakeReader, selectors.EVENT_READ)
+
+        self._isRunning = True
+        self._serverThread = thread.Thread(
+            target=self._ServerTask, name="StatusServer", daemon=True
+        )
+        self._serverThread.start()
+
+        for topic in self._STATUS_TOPICS:
+            pub.subscribe(self._StatusUpdateListener, topic)
+
+        return self._port
+
+    def Stop(self):
+        """
+        Disconnect all the consumers and stop listening.
+        """
+        if not self._isRunning:
+            return
+
+        for topic in self._STATUS_TOPICS:
+            pub.unsubscribe(self._StatusUpdateListener, topic)
+
+        self._isRunning = False
+        self._Wake()
+        self._serverThread.join()
+        self._serverThread = None
+
+    def Publish(self, deviceId, statusType, values):
+        """
+        Send a status to every connected consumer.
+
+        Positional arguments:
+        deviceId   -- the ID of the device that the status was read from
+        statusType -- the kind of status, e.g. 'TelescopeStatus'
+        values     -- a dictionary of the status property values
+        """
+        msg = {
+            "Device": deviceId,
+            "Type": statusType,
+            "Time": time.time(),
+            "Status": {k: self._ToJsonValue(v) for k, v in values.items()},
+        }
+        data = (json.dumps(msg, separators=(",", ":")) + "\n").encode("utf-8")
+
+        with self._lock:
+            self._latest[deviceId] = data
+
+            for client in self._clients.values():
+                client.Enqueue(data)
+
+        self._Wake()
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _StatusUpdateListener(self, sts, topic=pub.AUTO_TOPIC):
+        # receive the status updates for every device. The device ID is the
+        # last part of the topic name.
+
+        name = topic.getName()
+        deviceId = name.split(".")[-1] if "." in name else None
+
+        self.Publish(deviceId, sts.__class__.__name__, sts.ToDict())
+
+    def _ToJsonValue(self, value):
+        # convert a status value to a JSON compatible value. NaN is not
+        # valid JSON so it is sent as null.
+
+        if isinstance(value, bool):
+            return value
+        elif isinstance(value, int):
+            return int(value)
+        elif isinstance(value, float) and not math.isfinite(value):
+            return None
+
+        return value
+
+    def _Wake(self):
+        # interrupt the server thread's wait so that it sends the new data
+
+        try:
+            self._wakeWriter.send(b"\0")
+        except (AttributeError, OSError):
+            # the server is not running, or a wake up is already pending
+
+            pass
+
+    def _ServerTask(self):
+        # this method runs on the server thread. It accepts consumers,
+        # sends them their queued messages and notices when they disconnect.
+
+        while self._isRunning:
+            for key, mask in self._selector.select(timeout=1.0):
+                if key.fileobj is self._listener:
+                    self._AcceptClient()
+                elif key.fileobj is self._wakeReader:
+                    self._DrainWakeSocket()
+                elif mask & selectors.EVENT_READ:
+                    self._ReadClient(key.fileobj)
+
+            self._SendToClients()
+
+        self._CloseAll()
+
+    def _AcceptClient(self):
+        # accept a new consumer and queue the latest status of each device
+
+        try:
+            sock, address = self._listener.accept()
+        except OSError:
+            return
+
+        sock.setblocking(False)
+        client = _StatusClient(sock, address, self._maxMessages)
+
+        with self._lock:
+            for data in self._latest.values():
+                client.Enqueue(data)
+
+            self._clients[sock] = client
+
+        self._selector.register(sock, selectors.EVENT_READ)
+
+    def _DrainWakeSocket(self):
+        try:
+            while self._wakeReader.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _ReadClient(self, sock):
+        # consumers do not send anything, so any data is discarded. A read
+        # of zero bytes means that the consumer has disconnected.
+
+        try:
+            data = sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+
+        if not data:
+            self._RemoveClient(sock)
+
+    def _SendToClients(self):
+        # send as much queued data as each consumer will accept without
+        # blocking
+
+        with self._lock:
+            clients = list(self._clients.values())
+
+        for client in clients:
+            if not self._SendToClient(client):
+                self._RemoveClient(client.sock)
+                continue
+
+            # only watch for writability while data is waiting to be sent
+
+            wantWrite = len(client.pending) > 0
+
+            if wantWrite != client.wantWrite:
+                events = selectors.EVENT_READ
+
+                if wantWrite:
+                    events |= selectors.EVENT_WRITE
+
+                self._selector.modify(client.sock, events)
+                client.wantWrite = wantWrite
+
+    def _SendToClient(self, client):
+        # send queued data to a single consumer. Returns False if the
+        # consumer has disconnected.
+
+        while True:
+            if not client.pending:
+                with self._lock:
+                    if len(client.queue) == 0:
+                        return True
+
+                    chunks = []
+                    size = 0
+
+                    while len(client.queue) > 0 and size < self._SEND_CHUNK_SIZE:
+                        data = client.queue.popleft()
+                        chunks.append(data)
+                        size += len(data)
+
+                client.pending = b"".join(chunks)
+
+            try:
+                sent = client.sock.send(client.pending)
+            except BlockingIOError:
+                return True
+            except OSError:
+                return False
+
+            client.pending = client.pending[sent:]
+
+    def _RemoveClient(self, sock):
+        with self._lock:
+            self._clients.pop(sock, None)
+
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+
+        sock.close()
+
+    def _CloseAll(self):
+        # close every socket when the server is stopped
+
+        with self._lock:
+            socks = list(self._clients.keys())
+
+        for sock in socks:
+            self._RemoveClient(sock)
+
+        self._selector.close()
+        self._listener.close()
+        self._wakeReader.close()
+        self._wakeWriter.close()
+        self._selector = None
+        self._listener = None
+        self._wakeReader = None
+        self._wakeWriter = None
+
+    # End of Private Helper Methods
@@ -1 +1 @@
-__all__ = ['chooser']
+__all__ = ['chooser', 'discovery_cache']
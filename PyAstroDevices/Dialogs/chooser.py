@@ -1,3 +1,4 @@
+import time
 import tkinter as tk
 from tkinter import ttk
 import threading as thread
@@ -8,6 +9,8 @@ from pubsub import pub
 from alpaca import management
 from alpaca import discovery
 
+from discovery_cache import DiscoveryCache
+
 
 class AlpacaDevice:
     """
@@ -15,12 +18,61 @@ class AlpacaDevice:
     and to format those components into a partial URL
     """
 
-    def __init__(self, name, deviceType, ipaddress, deviceNumber, protocol="http"):
+    _STATE_TAGS = {
+        DiscoveryCache.STATE_MISSING: " [not found]",
+        DiscoveryCache.STATE_MOVED: " [address changed]",
+    }
+
+    def __init__(
+        self,
+        name,
+        deviceType,
+        ipaddress,
+        deviceNumber,
+        protocol="http",
+        uniqueId="",
+        state="",
+        addressFamily="",
+        addresses=None,
+    ):
         self._name = name
         self._deviceType = deviceType
         self._address = ipaddress
         self._deviceNumber = deviceNumber
         self._protocol = protocol
+        self._uniqueId = uniqueId
+        self._state = state
+        self._addressFamily = addressFamily
+
+        # all the addresses that the device's server answered on, with the
+        # preferred (fastest) address first.
+
+        if addresses is None:
+            addresses = [ipaddress]
+
+        self._addresses = list(addresses)
+
+    @staticmethod
+    def FromDict(record):
+        """
+        Create a device from a discovery cache record
+
+        Positional arguments:
+        record -- a dictionary created by ToDict, optionally with a State
+
+        Returns -- the new AlpacaDevice instance
+        """
+        return AlpacaDevice(
+            record["Name"],
+            record["DeviceType"],
+            record["Address"],
+            record["DeviceNumber"],
+            record.get("Protocol", "http"),
+            record.get("UniqueID", ""),
+            record.get("State", ""),
+            record.get("AddressFamily", ""),
+            record.get("Addresses"),
+        )
 
     @property
     def Name(self):
@@ -41,6 +93,38 @@ class AlpacaDevice:
     def Protocol(self):
         return self._protocol
 
+    @property
+    def UniqueID(self):
+        return self._uniqueId
+
+    @property
+    def State(self):
+        return self._state
+
+    @property
+    def AddressFamily(self):
+        return self._addressFamily
+
+    @property
+    def Addresses(self):
+        return list(self._addresses)
+
+    def ToDict(self):
+        """
+        Convert the device to a dictionary that can be saved in the
+        discovery cache
+        """
+        return {
+            "Name": self._name,
+            "DeviceType": self._deviceType,
+            "Address": self._address,
+            "DeviceNumber": self._deviceNumber,
+            "Protocol": self._protocol,
+            "UniqueID": self._uniqueId,
+            "AddressFamily": self._addressFamily,
+            "Addresses": list(self._addresses),
+        }
+
     def Format(self):
         """
         Format the class properties into a partial URL
@@ -48,6 +132,7 @@ class AlpacaDevice:
         formatted = self._name
         formatted += f"({self._address}/api/v1/{self._deviceType}/"
         formatted += f"{self._deviceNumber})"
+        formatted += self._STATE_TAGS.get(self._state, "")
 
         return formatted
 
@@ -70,6 +155,9 @@ class Chooser:
         self._deviceType = deviceType
         self._selected = None
         self._dialogResult = None
+        self._selectedIndex = -1
+        self._discoveredDevices = []
+        self._discoveryComplete = False
 
     def Choose(self):
         """
@@ -219,6 +307,12 @@ class Chooser:
 
         self._dlg.focus()
         self._dlg.config(cursor="watch")
+
+        # show any previously discovered devices while discovery
+        # revalidates them in the background
+
+        self._ShowCachedDevices()
+
         self._dlg.update()
 
         # wait here until the dialog window has been closed
@@ -304,21 +398,50 @@ class Chooser:
 
         devicesList = []
 
-        # discover the Alpaca servers on the LAN
+        # discover the Alpaca servers on the LAN using IPv4 and IPv6 at the
+        # same time. Each search also enumerates the devices of the servers
+        # that it finds.
+
+        responses = []
+        searches = (
+            ("IPv4", discovery.search_ipv4),
+            ("IPv6", discovery.search_ipv6),
+        )
+        searchThreads = []
+
+        for family, search in searches:
+            t = thread.Thread(
+                target=self._SearchServersTask, args=(family, search, responses)
+            )
+            t.start()
+            searchThreads.append(t)
 
-        alpacaServers = discovery.search_ipv4(numquery=1)
+        for t in searchThreads:
+            t.join()
+
+        # a dual-stack server answers once for each address family, so
+        # group the responses by server identity
+
+        servers = {}
+
+        for response in responses:
+            identity = self._GetServerIdentity(response)
+            servers.setdefault(identity, []).append(response)
 
         # iterate through the responding servers to get the devices from
         # each one
 
-        for alpacaServer in alpacaServers:
-            # get the list of devices from this alpaca server
-            alpacaDevices = management.configureddevices(alpacaServer)
+        for answers in servers.values():
+            # prefer the address that answered the enumeration fastest
+
+            answers.sort(key=lambda answer: answer["Elapsed"])
+            fastest = answers[0]
+            addresses = [answer["Address"] for answer in answers]
 
             # iterate through the devices to find those for
             # the device type of interest
 
-            for alpacaDevice in alpacaDevices:
+            for alpacaDevice in fastest["Devices"]:
                 if alpacaDevice["DeviceType"].lower() == deviceType:
 
                     # here we have a device that we want to return
@@ -328,38 +451,166 @@ class Chooser:
                     deviceObj = AlpacaDevice(
                         alpacaDevice["DeviceName"],
                         deviceType,
-                        alpacaServer,
+                        fastest["Address"],
                         alpacaDevice["DeviceNumber"],
+                        uniqueId=alpacaDevice.get("UniqueID", ""),
+                        addressFamily=fastest["Family"],
+                        addresses=addresses,
                     )
 
                     devicesList.append(deviceObj)
 
+        # merge the fresh results with the cached devices, so that we can
+        # flag those that have disappeared or moved.
+
+        cache = DiscoveryCache.GetInstance()
+        records = cache.Revalidate(
+            deviceType, [device.ToDict() for device in devicesList]
+        )
+        devicesList = [AlpacaDevice.FromDict(record) for record in records]
+
         # finally send the list of discovered devices to populate the
         # dropdown list in the dialog
 
         pub.sendMessage("DiscoveryList", devices=devicesList)
 
-    def _DiscoveryListener(self, devices):
-        # this method is called when discovery has completed.
-        # the 'devices' argument has the list of discovered devices.
+    def _SearchServersTask(self, family, search, responses):
+        # discover the Alpaca servers for one address family and time how
+        # long each server takes to enumerate its configured devices. This
+        # method runs on its own thread.
 
-        self._discoveredDevices = devices
+        try:
+            alpacaServers = search(numquery=1)
+        except Exception:
+            # discovery is not available for this address family on every
+            # platform or network, so treat a failure as no servers found.
+
+            alpacaServers = []
+
+        for alpacaServer in alpacaServers:
+            start = time.perf_counter()
+
+            try:
+                alpacaDevices = management.configureddevices(alpacaServer)
+            except Exception:
+                continue
+
+            elapsed = time.perf_counter() - start
+
+            # older servers do not report the UniqueID of their devices, so
+            # get the server description to help identify them.
+
+            description = {}
+
+            if not all(device.get("UniqueID") for device in alpacaDevices):
+                try:
+                    description = management.description(alpacaServer)
+                except Exception:
+                    pass
+
+            responses.append(
+                {
+                    "Family": family,
+                    "Address": alpacaServer,
+                    "Elapsed": elapsed,
+                    "Devices": alpacaDevices,
+                    "Description": description,
+                }
+            )
+
+    def _GetServerIdentity(self, response):
+        # identify an Alpaca server independently of the address that it
+        # answered on. The UniqueIDs of its devices are preferred, with a
+        # fallback to the server description, port, and device names.
+
+        devices = response["Devices"]
+        uniqueIds = [device.get("UniqueID") for device in devices]
+
+        if len(uniqueIds) > 0 and all(uniqueIds):
+            return tuple(sorted(uniqueIds))
+
+        description = response["Description"]
+        port = response["Address"].rsplit(":", 1)[-1]
+        names = sorted(f"{d['DeviceType']}/{d['DeviceNumber']}" for d in devices)
+
+        return (
+            description.get("ServerName", ""),
+            description.get("Location", ""),
+            port,
+            tuple(names),
+        )
+
+    def _ShowCachedDevices(self):
+        # populate the dropdown list with the devices that were found by
+        # an earlier discovery. The user can pick one of these without
+        # waiting for discovery to complete.
+
+        if self._discoveryComplete:
+            return
+
+        cache = DiscoveryCache.GetInstance()
+        records = cache.GetDevices(self._deviceType)
+
+        if len(records) == 0:
+            return
+
+        devices = [AlpacaDevice.FromDict(record) for record in records]
+        self._PopulateDeviceList(devices)
+        self._statusDisplay.set("Revalidating")
+
+        # enable the OK and Cancel buttons
+
+        self._okBtn.config(state="normal")
+        self._cancelBtn.config(state="normal")
 
+    def _PopulateDeviceList(self, devices):
         # format each device for display in the combobox and add it to
-        # a display list
+        # a display list. Keep the user's current selection, if it is still
+        # in the list.
+
+        selectedKey = None
+        ndx = self._driverCbx.current()
+
+        if ndx > -1 and ndx < len(self._discoveredDevices):
+            selectedKey = self._GetDeviceKey(self._discoveredDevices[ndx])
+
+        self._discoveredDevices = devices
 
         dispList = []
+        newNdx = 0
 
         if devices is not None and len(devices) > 0:
             for i in range(0, len(devices)):
                 dispList.append(devices[i].Format())
 
-        self._driverCbx["values"] = dispList
+                if self._GetDeviceKey(devices[i]) == selectedKey:
+                    newNdx = i
 
-        # select the first list item and update the status
+        self._driverCbx["values"] = dispList
 
         if len(dispList) > 0:
-            self._driverCbx.current(0)
+            self._driverCbx.current(newNdx)
+
+        return len(dispList)
+
+    def _GetDeviceKey(self, device):
+        # identify a device independently of its address
+
+        if device.UniqueID:
+            return device.UniqueID
+
+        return f"{device.Name}:{device.DeviceNumber}"
+
+    def _DiscoveryListener(self, devices):
+        # this method is called when discovery has completed.
+        # the 'devices' argument has the list of discovered devices.
+
+        self._discoveryComplete = True
+        count = self._PopulateDeviceList(devices)
+
+        # update the status
+
+        if count > 0:
             self._statusDisplay.set("Finished")
         else:
             self._statusDisplay.set("Failed")
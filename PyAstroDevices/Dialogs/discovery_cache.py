@@ -0,0 +1,234 @@
+import os
+import time
+import json
+import threading as thread
+from os.path import exists
+
+
+class DiscoveryCache(object):
+    """
+    Persist the results of Alpaca discovery so that the Chooser can show
+    previously discovered devices immediately while a fresh discovery runs
+    in the background. The class is designed as a singleton class with access
+    through the static GetInstance method.
+
+    The cache is keyed by device type. Each cached device record carries the
+    time that it was last seen on the network. Records that have not been
+    seen for longer than the time-to-live are dropped.
+
+    It uses a private DISCOVERY_CACHE_FILE environment variable to get the
+    name of the JSON cache file.
+    """
+
+    _instance = None
+
+    _DEFAULT_FILENAME = "discovery_cache.json"
+    _DEFAULT_TTL = 7 * 24 * 3600.0  # one week, in seconds
+
+    # states that are reported for each device after revalidation
+
+    STATE_CACHED = "cached"
+    STATE_FOUND = "found"
+    STATE_NEW = "new"
+    STATE_MISSING = "missing"
+    STATE_MOVED = "moved"
+
+    @staticmethod
+    def GetInstance():
+        """
+        Provides access to the singleton instance, creating the instance if it
+        does not already exist
+
+        Returns -- the instance of DiscoveryCache
+        """
+        # Static Access Method
+
+        if DiscoveryCache._instance is None:
+            DiscoveryCache()
+
+        return DiscoveryCache._instance
+
+    def __init__(self, ttl=_DEFAULT_TTL):
+        # the class instance initializer
+
+        if DiscoveryCache._instance is not None:
+            raise Exception("The DiscoveryCache class is a singleton!")
+
+        DiscoveryCache._instance = self
+        self._ttl = ttl
+        self._lock = thread.Lock()
+        self._entries = None
+
+    # Start of Public Methods and Properties
+
+    @property
+    def TimeToLive(self):
+        return self._ttl
+
+    def GetDevices(self, deviceType):
+        """
+        Get the unexpired cached device records for a device type
+
+        Positional arguments:
+        deviceType -- the device type of interest, e.g. 'telescope'
+
+        Returns -- a list of device record dictionaries, each marked with the
+                   'cached' state
+        """
+        with self._lock:
+            records = self._GetTypeEntries(deviceType.lower())
+            retval = []
+
+            for record in records.values():
+                record = dict(record)
+                record["State"] = self.STATE_CACHED
+                retval.append(record)
+
+        return retval
+
+    def Revalidate(self, deviceType, discovered):
+        """
+        Merge a fresh discovery result into the cache and save it. Cached
+        devices that were not rediscovered are marked as missing, those that
+        were found at a different address are marked as moved.
+
+        Positional arguments:
+        deviceType -- the device type of interest, e.g. 'telescope'
+        discovered -- a list of device record dictionaries from discovery
+
+        Returns -- the merged list of device record dictionaries, each with
+                   a 'State' entry
+        """
+        now = time.time()
+        retval = []
+
+        with self._lock:
+            records = self._GetTypeEntries(deviceType.lower())
+            seen = set()
+
+            for record in discovered:
+                key = self._GetKey(record)
+
+                if key in seen:
+                    continue
+
+                seen.add(key)
+                old = records.get(key)
+
+                # a device has only moved if its old address is no longer
+                # one of the addresses that it answered on
+
+                addresses = record.get("Addresses", [record["Address"]])
+
+                if old is None:
+                    state = self.STATE_NEW
+                elif old["Address"] not in addresses:
+                    state = self.STATE_MOVED
+                else:
+                    state = self.STATE_FOUND
+
+                record = dict(record)
+                record["LastSeen"] = now
+                records[key] = record
+
+                merged = dict(record)
+                merged["State"] = state
+                retval.append(merged)
+
+            # keep the devices that did not respond this time, until they
+            # expire
+
+            for key, record in records.items():
+                if key not in seen:
+                    merged = dict(record)
+                    merged["State"] = self.STATE_MISSING
+                    retval.append(merged)
+
+            self._Save()
+
+        return retval
+
+    def Clear(self, deviceType=None):
+        """
+        Remove cached devices, either for a single device type or all types.
+
+        Keyword arguments:
+        deviceType -- the device type to clear, or None to clear everything
+        """
+        with self._lock:
+            self._Load()
+
+            if deviceType is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(deviceType.lower(), None)
+
+            self._Save()
+
+    # End of Public Methods and Properties
+
+    # Start of Private Methods and Properties
+
+    def _GetKey(self, record):
+        # devices are identified by their Alpaca UniqueID, if available, so
+        # that an address change can be detected. Older servers do not
+        # provide a UniqueID so fall back to the name and device number.
+
+        uniqueId = record.get("UniqueID", "")
+
+        if uniqueId:
+            return uniqueId
+
+        return f"{record['Name']}:{record['DeviceNumber']}"
+
+    def _GetTypeEntries(self, deviceType):
+        # get the unexpired records for a device type, dropping any that
+        # have expired.
+
+        self._Load()
+
+        records = self._entries.setdefault(deviceType, {})
+        oldest = time.time() - self._ttl
+
+        for key in [k for k, v in records.items() if v["LastSeen"] < oldest]:
+            del records[key]
+
+        return records
+
+    def _GetFilename(self):
+        return os.environ.get("DISCOVERY_CACHE_FILE", self._DEFAULT_FILENAME)
+
+    def _Load(self):
+        # lazily read the cache file the first time that it is needed.
+        # An unreadable cache is treated as empty.
+
+        if self._entries is not None:
+            return
+
+        self._entries = {}
+        filename = self._GetFilename()
+
+        if exists(filename):
+            try:
+                with open(filename) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def _Save(self):
+        # write the cache file. The transient state values are never stored.
+
+        filename = self._GetFilename()
+
+        try:
+            with open(filename, "w") as f:
+                json.dump(
+                    self._entries, f, indent=4, separators=(", ", ": "), sort_keys=True
+                )
+        except OSError:
+            # the cache is only an optimization, so failing to save it
+            # is not an error.
+
+            pass
+
+    # End of Private Methods and Properties
@@ -1 +1,8 @@
-__all__ = ['focuser_mgr', 'focuser_parameters', 'focuser_status']
+__all__ = [
+    'focuser_autofocus',
+    'focuser_mgr',
+    'focuser_move_queue',
+    'focuser_parameters',
+    'focuser_status',
+    'focuser_temp_comp',
+]
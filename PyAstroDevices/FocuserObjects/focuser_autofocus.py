@@ -0,0 +1,303 @@
+import os
+import math
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+from pubsub import pub
+
+
+class FocusMetricSource(ABC):
+    """
+    Base class for the sources of the focus metric that is minimized by the
+    autofocus engine, e.g. the half flux radius (HFR) of the stars in an
+    image taken at the current focuser position. Derived classes override
+    the Measure method.
+    """
+
+    @abstractmethod
+    def Measure(self, position):
+        """
+        Measure the focus metric at the current focuser position
+
+        Positional arguments:
+        position -- the focuser position, relative to the start of the run
+                    for a relative focuser
+
+        Returns -- the focus metric; smaller is better focus
+        """
+
+
+class FunctionMetricSource(FocusMetricSource):
+    """
+    Focus metric source that calls a local function, such as an image
+    analysis routine or a model of the focus curve for testing.
+    """
+
+    def __init__(self, function):
+        """
+        Initializer method for the FunctionMetricSource class
+
+        Positional arguments:
+        function -- a callable that takes the focuser position and returns
+                    the focus metric
+        """
+        self._function = function
+
+    def Measure(self, position):
+        return float(self._function(position))
+
+
+class SyntheticMetricSource(FocusMetricSource):
+    """
+    Focus metric source that models a V-curve, for testing the autofocus
+    engine without a camera. The metric is a hyperbola with its minimum at
+    the best focus position, plus optional Gaussian noise.
+    """
+
+    def __init__(self, bestPosition, minimumHfr=2.0, stepsPerPixel=50.0, noise=0.0):
+        """
+        Initializer method for the SyntheticMetricSource class
+
+        Positional arguments:
+        bestPosition  -- the position of best focus
+
+        Keyword arguments:
+        minimumHfr    -- the metric at best focus
+        stepsPerPixel -- the number of steps for the metric to grow by one
+                         far from focus
+        noise         -- the standard deviation of the noise that is added
+        """
+        self._bestPosition = bestPosition
+        self._minimumHfr = minimumHfr
+        self._stepsPerPixel = stepsPerPixel
+        self._noise = noise
+        self._rng = np.random.default_rng()
+
+    def Measure(self, position):
+        offset = (position - self._bestPosition) / self._stepsPerPixel
+        hfr = math.hypot(self._minimumHfr, offset)
+
+        if self._noise > 0:
+            hfr += self._rng.normal(0.0, self._noise)
+
+        return hfr
+
+
+class FileMetricSource(FocusMetricSource):
+    """
+    Focus metric source that reads the metric from a file that is written by
+    another program, e.g. imaging software that measures the HFR of each
+    exposure. After each move the source waits for the file to be updated
+    and reads the last number in it.
+    """
+
+    _POLL_INTERVAL = 0.1  # seconds
+
+    def __init__(self, filename, timeout=120.0):
+        """
+        Initializer method for the FileMetricSource class
+
+        Positional arguments:
+        filename -- the name of the file that the metric is written to
+
+        Keyword arguments:
+        timeout  -- the longest wait for a new metric, in seconds
+        """
+        self._filename = filename
+        self._timeout = timeout
+
+    def Measure(self, position):
+        start = time.time()
+        deadline = time.monotonic() + self._timeout
+
+        while time.monotonic() < deadline:
+            try:
+                if os.path.getmtime(self._filename) >= start:
+                    value = self._ReadMetric()
+
+                    if value is not None:
+                        return value
+            except OSError:
+                pass
+
+            time.sleep(self._POLL_INTERVAL)
+
+        msg = f"No new focus metric was written to {self._filename}."
+        raise TimeoutError(msg)
+
+    def _ReadMetric(self):
+        # get the last number in the file, if any
+
+        with open(self._filename) as f:
+            words = f.read().replace(",", " ").split()
+
+        for word in reversed(words):
+            try:
+                return float(word)
+            except ValueError:
+                continue
+
+        return None
+
+
+class AutofocusResult(object):
+    """
+    Class to contain the outcome of an autofocus run.
+    """
+
+    def __init__(self):
+        self.Success = False
+        self.Message = ""
+        self.Model = None
+        self.Positions = []
+        self.Metrics = []
+        self.BestPosition = None
+        self.PredictedMetric = None
+        self.FinalMetric = None
+        self.MoveCount = 0
+        self.ElapsedTime = 0.0
+
+
+class AutofocusEngine(object):
+    """
+    Class to focus a focuser by fitting a curve to a few samples of a focus
+    metric, rather than by stepping through the whole focus range.
+
+    The metric is sampled at evenly spaced positions around the starting
+    position, always moving in the same direction. A hyperbola, or a
+    parabola, is fitted to the samples by linear least squares and the
+    focuser is moved straight to the predicted minimum. A hyperbola is
+    fitted as a parabola in the square of the metric.
+
+    Each run reports the number of moves and the elapsed time, and a
+    successful run is recorded as a focus point for temperature
+    compensation.
+    """
+
+    MODEL_HYPERBOLA = "hyperbola"
+    MODEL_PARABOLA = "parabola"
+
+    _MOVE_TIMEOUT = 120.0  # seconds
+
+    def __init__(self, focuserManager, metricSource):
+        """
+        Initializer method for the AutofocusEngine class
+
+        Positional arguments:
+        focuserManager -- the FocuserManager of the focuser to be focused
+        metricSource   -- the FocusMetricSource that measures the focus
+        """
+        self._mgr = focuserManager
+        self._source = metricSource
+        self._position = 0
+
+    def Run(self, stepSize, sampleCount=5, model=MODEL_HYPERBOLA, verify=True):
+        """
+        Run the autofocus. If the focus cannot be found the focuser is
+        returned to its starting position.
+
+        Positional arguments:
+        stepSize    -- the number of steps between the samples
+
+        Keyword arguments:
+        sampleCount -- the number of samples, at least 3
+        model       -- the curve to be fitted, MODEL_HYPERBOLA or
+                       MODEL_PARABOLA
+        verify      -- if True, measure the metric at the best position
+
+        Returns -- an AutofocusResult
+        """
+        result = AutofocusResult()
+        result.Model = model
+        startTime = time.monotonic()
+
+        sampleCount = max(3, sampleCount)
+        parms = self._mgr.Parameters
+
+        # an absolute focuser works in positions, a relative focuser in
+        # steps from the starting point
+
+        self._position = 0
+
+        if parms.Absolute:
+            self._position = self._mgr.Status.Position
+
+        start = self._position
+        offsets = (np.arange(sampleCount) - (sampleCount - 1) / 2.0) * stepSize
+        positions = np.rint(start + offsets).astype(int)
+
+        try:
+            for position in positions:
+                result.MoveCount += self._MoveTo(position)
+                result.Positions.append(int(position))
+                result.Metrics.append(self._source.Measure(self._position))
+
+            best, predicted = self._FitCurve(positions, result.Metrics, model)
+
+            lowest, highest = positions[0], positions[-1]
+
+            if best is None or best < lowest - stepSize or best > highest + stepSize:
+                result.Message = "No focus minimum was found within the samples."
+                result.MoveCount += self._MoveTo(start)
+            else:
+                result.BestPosition = int(round(best))
+                result.PredictedMetric = predicted
+                result.MoveCount += self._MoveTo(result.BestPosition)
+
+                if verify:
+                    result.FinalMetric = self._source.Measure(self._position)
+
+                result.Success = True
+                self._mgr.TemperatureCompensator.RecordFocusPoint()
+        except Exception as xcp:
+            result.Message = str(xcp)
+
+        result.ElapsedTime = time.monotonic() - startTime
+        pub.sendMessage(self._mgr.Topic("FocuserAutofocusCompleted"), result=result)
+
+        return result
+
+    def _MoveTo(self, position):
+        # move to a position and wait for the move to finish. Returns the
+        # number of moves that were made.
+
+        delta = int(position - self._position)
+
+        if delta == 0:
+            return 0
+
+        self._mgr.MoveFocuserBy(delta).result(timeout=self._MOVE_TIMEOUT)
+        self._position = position
+
+        return 1
+
+    def _FitCurve(self, positions, metrics, model):
+        # fit the model to the samples and return the position of the
+        # minimum and the predicted metric there, or None if the fitted
+        # curve has no minimum
+
+        x = np.asarray(positions, dtype=float)
+        y = np.asarray(metrics, dtype=float)
+
+        # center and scale the positions to keep the fit well conditioned
+
+        center = x.mean()
+        scale = max(np.ptp(x), 1.0)
+        u = (x - center) / scale
+
+        if model == self.MODEL_HYPERBOLA:
+            a, b, c = np.polyfit(u, y * y, 2)
+        else:
+            a, b, c = np.polyfit(u, y, 2)
+
+        if a <= 0:
+            return None, None
+
+        uBest = -b / (2.0 * a)
+        value = c - b * b / (4.0 * a)
+
+        if model == self.MODEL_HYPERBOLA:
+            value = math.sqrt(value) if value > 0 else 0.0
+
+        return center + uBest * scale, value
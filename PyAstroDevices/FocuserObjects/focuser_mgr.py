@@ -1,6 +1,5 @@
 import copy
-import threading as thread
-from tkinter import messagebox
+from time import monotonic
 
 from pubsub import pub
 
@@ -9,42 +8,48 @@ from alpaca.exceptions import *
 
 from focuser_parameters import FocuserParameters
 from focuser_status import FocuserStatus
+from focuser_move_queue import FocuserMoveQueue
+from focuser_temp_comp import TemperatureCompensator
+from app_settings import ApplicationSettings
 from exception_formatter import ExceptionFormatter
+from error_reporter import ErrorReporter
+from device_mgr import DeviceManager
+from connection_pool import AlpacaConnectionPool
 
 
-class FocuserManager:
+class FocuserManager(DeviceManager):
     """
     This class manages communication with the selected focuser driver. All the
     views call through this class to issue commands to the driver. This class
 	also handles periodic polling of the focuser.
 	"""
 
-    _POLLING_INTERVAL_FAST = 1.0  # once per second
-    _POLLING_INTERVAL_NORMAL = 5.0  # every 5 seconds
-    _POLLING_INTERVAL_SLOW = 10.0  # every 10 seconds
+    _STATUS_TOPIC = "FocuserStatusUpdate"
+    _POLLING_EXCEPTION_TOPIC = "FocuserPollingException"
 
-    def __init__(self):
+    def __init__(self, deviceId=None):
         # Initialize the instance level variables
+        #
+        # deviceId -- the ID that identifies this focuser's messages when
+        #             more than one focuser is in use
+
+        super().__init__(deviceId)
 
         self._status = FocuserStatus()
-        self._id = None
         self._focuser = None
-        self._isConnected = False
-        self._isPolling = False
-        self._stopPolling = False
-        self._pollingThread = None
+        self._address = None
+        self._protocol = None
         self._capabilities = None
         self._parameters = None
         self._connectError = None
         self._connectException = None
         self._reenableTempComp = False
+        self._unsupported = set()
+        self._moveQueue = FocuserMoveQueue(self._StartMove, self._MovesCompleted)
+        self._tempCompensator = TemperatureCompensator(self)
 
     # Public Properties
 
-    @property
-    def ID(self):
-        return self._id
-
     @property
     def IsConnected(self):
         return self._isConnected
@@ -65,6 +70,16 @@ class FocuserManager:
     def Parameters(self):
         return copy.copy(self._parameters)
 
+    @property
+    def IsBusy(self):
+        # True while queued moves have not finished
+
+        return self._moveQueue.IsBusy
+
+    @property
+    def TemperatureCompensator(self):
+        return self._tempCompensator
+
     # End of Public Properties
 
     # Start of Public Methods
@@ -86,6 +101,15 @@ class FocuserManager:
         try:
             if self._focuser is None:
                 self._focuser = Focuser(address, deviceNumber, protocol)
+
+                # share the HTTP connections with any other devices on the
+                # same Alpaca server
+
+                AlpacaConnectionPool.GetInstance().Attach(
+                    self._focuser, address, protocol
+                )
+                self._address = address
+                self._protocol = protocol
         except Exception as e:
             self._connectError = "Unable to create the focuser object."
             self._connectException = e
@@ -110,11 +134,16 @@ class FocuserManager:
                 possibleError = "Unable to determine the focuser's"
                 possibleError += ' configuration parameters'
                 self._parameters = FocuserParameters(self._focuser)
-                pub.sendMessage('FocuserParametersUpdate'
+                self._InitUnsupportedProperties()
+                self._moveQueue.SetMaxIncrement(self._parameters.MaxIncrement)
+                self._InitTravelLimits()
+                self._InitBacklashCompensation()
+                pub.sendMessage(self.Topic('FocuserParametersUpdate')
                                 , parms=self._parameters)
 
                 possibleError = 'Unable to get the focuser\'s status.'
-                pub.sendMessage('FocuserStatusUpdate', sts=self._status)
+                pub.sendMessage(self.Topic('FocuserStatusUpdate')
+                                , sts=self._status)
 
                 possibleError = "Unable to start the device polling.";
                 self._StartDevicePolling();
@@ -131,7 +160,7 @@ class FocuserManager:
 
     def Disconnect(self):
         """
-		This method stops the polling thread, sets the focuser's Connected
+		This method stops the device polling, sets the focuser's Connected
 		property to False, initializes the Parameters and Status objects to
 		their initialized state and sends them to any subscribers (the views).
 		"""
@@ -141,89 +170,67 @@ class FocuserManager:
 
             raise InvalidOperationException(msg)
 
-        if (self._pollingThread is not None):
-            self._stopPolling = True  # Terminate the polling thread
-            self._InterruptPollingSleep()  # Wake up the polling thread
-            self._pollingThread.join()  # Block until the polling thread is
-        #  terminated
+        # remove the focuser from the polling schedule and abandon any
+        # queued moves
+
+        self._tempCompensator.Stop()
+        self._StopDevicePolling()
+        self._moveQueue.Halt()
 
         # disconnect the focuser and release the driver
         self._focuser.Connected = False
         self._isConnected = False
         self._focuser = None
+        AlpacaConnectionPool.GetInstance().Release(self._address, self._protocol)
 
         # initialize the status and parameters objects
-        pub.sendMessage('FocuserStatusUpdate', sts=self._status)
+        pub.sendMessage(self.Topic('FocuserStatusUpdate'), sts=self._status)
         self._parameters = FocuserParameters()
-        pub.sendMessage('FocuserParametersUpdate', parms=self._parameters)
-
-    def ImmediateStatusUpdate(self):
-        """
-		This method interrupts the polling sleep cycle to allow the status 
-		update to occur immediately.
-		"""
-        if (self._focuser is not None and self._isConnected):
-            self._InterruptPollingSleep()
+        pub.sendMessage(self.Topic('FocuserParametersUpdate')
+                        , parms=self._parameters)
 
     def MoveFocuserBy(self, amount):
         """
 		Move the focuser by the specified amount.
-		If the focuser is an absolute focuser, the move amount is added to the 
-		current position to determine the new target position.
-
-		The value to be sent to the driver is clammped to prevent trying to move
-		the focuser too much or too far in a single move.
 
-		If necessary temperature compensation is temporarily disabled while the
-		focuser is being moved.
+		The move is added to the focuser's move queue. If the focuser is
+		already moving, it is merged with any other waiting moves into a
+		single move that is started when the current move has finished. A
+		move that is larger than MaxIncrement is made in several legs.
 
 		Positional arguments:
 		amount  -- the number of steps requested to be moved
-		"""
-        maxIncrement = self._parameters.MaxIncrement
-        maxStep = self._parameters.MaxStep
-        interfaceVersion = self._parameters.InterfaceVersion
-        tempCompOn = self._status.TempComp
-
-        # ensure that our move amount does not exceed the MaxIncrement
 
-        moveValue = self._Clamp(amount, -maxIncrement, maxIncrement)
+		Returns -- a concurrent.futures.Future that is resolved with the
+		           focuser position when the move has finished, or cancelled
+		           if the focuser is halted first
+		"""
+        if (self._focuser is None or not self._isConnected):
+            msg = 'FocuserManager.MoveFocuserBy() was called when no '
+            msg += 'Focuser is connected.'
+            raise InvalidOperationException(msg)
 
         # notify the view about how much we are moving to support keeping track
         # of accumulated moves.
 
-        pub.sendMessage('FocuserMoveUpdate', amount=moveValue)
-
-        if (self._parameters.Absolute):
-            moveValue += self._status.Position
-
-            # make sure that we do not exceed the maximum allowable position
-            # (either + or -).
-
-            moveValue = self._Clamp(moveValue, -maxStep, maxStep)
-
-        # if the driver is earlier than IFocuserV3 and temp comp is on then we
-        # need to disable it prior to the move
-
-        if (interfaceVersion < 3 and tempCompOn):
-            self._focuser.TempComp = False
-            self._reenableTempComp = True
-
-        # move the focuser. If the focuser is absolute, moveValue is the target
-        # position. If the focuser is not absolute, then move value is the steps
-        # to move.
+        pub.sendMessage(self.Topic('FocuserMoveUpdate'), amount=amount)
 
-        self._focuser.Move(moveValue)
+        future = self._moveQueue.Enqueue(amount)
         self.ImmediateStatusUpdate()
 
+        return future
+
     def HaltFocuser(self):
         """
-		Immediately abort focuser movement.
+		Immediately abort focuser movement and discard any queued moves.
 		"""
-        if (self._focuser.IsMoving):
+        wasBusy = self._moveQueue.IsBusy
+        self._moveQueue.Halt()
+
+        if (self._focuser.IsMoving or wasBusy):
             self._focuser.Halt()
             self.ImmediateStatusUpdate()
-            pub.sendMessage('FocuserMoveCompleted')
+            self._MovesCompleted()
 
     def SetTemperatureCompensation(self, state):
         """
@@ -237,87 +244,119 @@ class FocuserManager:
             self._focuser.TempComp = state
             self.ImmediateStatusUpdate()
 
+    def SetBacklashCompensation(self, steps, direction):
+        """
+		Change the backlash compensation for later moves, and keep it in the
+		settings for this focuser
+
+		Positional arguments:
+		steps     -- the overshoot, in steps, or 0 for no compensation
+		direction -- the direction of the final approach, 'out' or 'in'
+		"""
+        settings = ApplicationSettings.GetInstance()
+        settings.SetBacklashCompensation(self._id, steps, direction)
+        self._InitBacklashCompensation()
+
     # End of Public Methods
 
     # Start of Private Helper Methods
 
-    def _PollFocuserTask(self, stop):
-        # This method runs on a worker thread, until it is stopped.
-        # Every trip through the main processing loop it updates the
-        # focuser status and sends the fresh status to message subscribers.
-        # When finished with the status updates it goes to sleep to wait for
-        # the next cycle. It can be signaled to wake up, as needed to perform
-        # immediate status updates. It also sleeps for a shorter interval when
-        # the focuser is moving
+    def _ReadStatus(self):
+        # get fresh status from the focuser, skipping the properties that
+        # are not supported. The move queue uses it to detect the end of the
+        # current move and start the next.
+
+        readTime = monotonic()
+        status = FocuserStatus(self._focuser, self._unsupported)
+        self._status = status
+        self._moveQueue.StatusUpdated(status, readTime)
+
+        return status
+
+    def _StartMove(self, amount):
+        # start a single leg of a queued move. This is called by the move
+        # queue, either from the caller's thread or from the polling thread.
+
+        maxStep = self._parameters.MaxStep
+        interfaceVersion = self._parameters.InterfaceVersion
+        tempCompOn = self._status.TempComp
+
+        if (amount == 0):
+            return
 
-        # The stop argument is an anonymous method provided by the caller that
-        # is used to signal us to end the thread.
-        while True:
-            if (stop()):  # terminate and return
-                break
+        moveValue = amount
 
-            # get fresh status from the focuser
+        if (self._parameters.Absolute):
+            moveValue += self._status.Position
 
-            try:
-                self._status = FocuserStatus(self._focuser)
-            except Exception as xcp:
-                self._pollingException = xcp
+            # make sure that the target is between 0 and the maximum
+            # allowable position
 
-                pub.sendMessage('FocuserPollingException', xcp=xcp)
+            moveValue = self._Clamp(moveValue, 0, maxStep)
 
-                return
+        # if the driver is earlier than IFocuserV3 and temp comp is on then we
+        # need to disable it prior to the move
 
-            # send status update message
+        if (interfaceVersion < 3 and tempCompOn):
+            self._focuser.TempComp = False
+            self._reenableTempComp = True
 
-            pub.sendMessage('FocuserStatusUpdate', sts=self._status)
+        # move the focuser. If the focuser is absolute, moveValue is the target
+        # position. If the focuser is not absolute, then move value is the steps
+        # to move.
 
-            # set our sleep interval to normal or fast (if slewing)
+        self._focuser.Move(moveValue)
 
-            interval = self._POLLING_INTERVAL_NORMAL
+    def _MovesCompleted(self):
+        # called by the move queue when the last queued move has finished.
+        # Restore temperature compensation if it was disabled for the moves.
 
-            if (self._status.IsMoving):
-                interval = self._POLLING_INTERVAL_FAST
+        if (self._reenableTempComp):
+            self._reenableTempComp = False
+            self._focuser.TempComp = True
 
-            # wait until we are signaled or until the sleep interval has expired.
+        pub.sendMessage(self.Topic('FocuserMoveCompleted'))
 
-            flag = self._eventObj.wait(interval)
+    def _InitUnsupportedProperties(self):
+        # avoid reading the status properties that the parameters tell us
+        # are not supported. Others are added when they are first found to
+        # be not implemented.
 
-            # reset the event object so we can reuse it.
+        self._unsupported = set()
 
-            if (flag):
-                self._eventObj.clear()
+        if (not self._parameters.Absolute):
+            self._unsupported.add('Position')
 
-    def _StartDevicePolling(self):
-        # Starts the polling thread
+        if (not self._parameters.TempCompAvailable):
+            self._unsupported.add('TempComp')
 
-        # return if no connected focuser
+    def _InitTravelLimits(self):
+        # keep the moves of an absolute focuser between 0 and MaxStep
 
-        if (self._focuser is None or not self._isConnected):
-            return
+        if (self._parameters.Absolute):
+            self._moveQueue.SetTravelLimits(0, self._parameters.MaxStep)
+        else:
+            self._moveQueue.SetTravelLimits(None, None)
 
-        # return if already polling the focuser
+    def _InitBacklashCompensation(self):
+        # configure the move queue with this focuser's backlash settings
 
-        if (self._isPolling):
-            return
+        config = ApplicationSettings.GetInstance().GetDeviceConfiguration(self._id)
+        direction = -1 if (config.BacklashDirection == 'in') else 1
 
-        # subscribe to receive any unhandled exception raised by the
-        # polling thread
+        self._moveQueue.SetBacklashCompensation(config.BacklashSteps, direction)
 
-        pub.subscribe(self._MovingExceptionListener, 'FocuserMovingException')
+    def _GetPollingInterval(self, status):
+        # set our sleep interval to normal or fast (if moving)
 
-        # create a worker thread to poll the focuser
+        interval = self._POLLING_INTERVAL_NORMAL
 
-        self._eventObj = thread.Event()
-        self._stopPolling = False
-        self._pollingThread = thread.Thread(target=self._PollFocuserTask
-                                            , args=(lambda: self._stopPolling,))
-        self._pollingThread.start()
+        if (status.IsMoving or self._moveQueue.IsBusy):
+            interval = self._POLLING_INTERVAL_FAST
 
-    def _InterruptPollingSleep(self):
-        # Cause the polling cycle to wake immediately
-        self._eventObj.set()
+        return interval
 
-    def _MovingExceptionListener(self, xcp):
+    def _PollingExceptionListener(self, xcp):
         # Stop the polling loop in response to an error and report the error
         # to the user.
 
@@ -326,12 +365,8 @@ class FocuserManager:
         msg += 'Details follow:\r\n\r\n'
         formatter = ExceptionFormatter.GetInstance()
         msg += formatter.Format(xcp)
-        messagebox.showerror("Moving Error Occurred", msg)
+        ErrorReporter.GetInstance().Report("Moving Error Occurred", msg, xcp)
 
-        self._stopPolling = True
-        self._InterruptPollingSleep()
-        self.pollingThread.join()
-        self._pollingThread = None
         self.Disconnect()
 
     def _Clamp(self, amount, minValue, maxValue):
@@ -0,0 +1,307 @@
+import math
+import threading as thread
+from time import monotonic
+from concurrent.futures import Future, InvalidStateError
+
+
+class FocuserMoveQueue(object):
+    """
+    Class to merge the move requests for a focuser into as few driver moves
+    as possible.
+
+    Requests that arrive while the focuser is moving are added together into
+    a single net move that is started when the current move has finished,
+    so rapid clicks or scripted micro-steps do not send a stream of Move
+    commands with stale targets. A net move that is larger than the
+    focuser's MaxIncrement is made in several legs.
+
+    Optional backlash compensation makes every net move finish in a chosen
+    direction. A net move in the other direction is extended past its
+    target by the overshoot and followed by a final leg of the overshoot
+    in the approach direction. The requests are only resolved when the
+    final leg has finished, so they still see one logical move.
+
+    For an absolute focuser, the owner can set the travel limits. The
+    target of each net move is then kept inside them, and the overshoot is
+    shortened so that it does not pass the limit either.
+
+    Each request returns a concurrent.futures.Future that is resolved with
+    the focuser position when the move that includes it has finished, or
+    cancelled if the focuser is halted first. Scripts can wait on it
+    directly, or in asyncio with asyncio.wrap_future.
+
+    The owner supplies a method to start a single move leg and reports each
+    status update, from which the end of the leg is detected.
+    """
+
+    def __init__(self, moveMethod, idleMethod=None):
+        """
+        Initializer method for the FocuserMoveQueue class
+
+        Positional arguments:
+        moveMethod -- a callable that starts a move of a number of steps
+
+        Keyword arguments:
+        idleMethod -- an optional callable that is called when the last
+                      queued move has finished
+        """
+        self._moveMethod = moveMethod
+        self._idleMethod = idleMethod
+        self._lock = thread.Lock()
+        self._maxIncrement = None
+        self._backlashSteps = 0
+        self._approachDirection = 1
+        self._lowerLimit = None
+        self._upperLimit = None
+        self._position = float("nan")
+        self._finalLeg = 0
+        self._pending = 0
+        self._waiting = []
+        self._inFlight = []
+        self._isBusy = False
+        self._legStartTime = None
+
+    # Start of Public Properties
+
+    @property
+    def IsBusy(self):
+        return self._isBusy
+
+    @property
+    def PendingSteps(self):
+        return self._pending
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def SetMaxIncrement(self, maxIncrement):
+        """
+        Set the largest number of steps that may be moved in a single leg
+
+        Positional arguments:
+        maxIncrement -- the focuser's MaxIncrement, or None for no limit
+        """
+        with self._lock:
+            self._maxIncrement = maxIncrement
+
+    def SetBacklashCompensation(self, steps, direction):
+        """
+        Set the backlash compensation for later moves
+
+        Positional arguments:
+        steps     -- the overshoot, in steps, or 0 for no compensation
+        direction -- the direction of the final approach; 1 for outward
+                     (increasing position) or -1 for inward
+        """
+        with self._lock:
+            self._backlashSteps = abs(steps)
+            self._approachDirection = 1 if direction >= 0 else -1
+
+    def SetTravelLimits(self, lower, upper):
+        """
+        Set the range of positions that the focuser can move to
+
+        Positional arguments:
+        lower -- the lowest position, or None for a relative focuser
+        upper -- the highest position, or None for a relative focuser
+        """
+        with self._lock:
+            self._lowerLimit = lower
+            self._upperLimit = upper
+
+    def Enqueue(self, amount):
+        """
+        Request a move. The move is started immediately if the focuser is
+        idle, otherwise it is merged with any other waiting requests.
+
+        Positional arguments:
+        amount -- the number of steps to move, positive or negative
+
+        Returns -- a Future that is resolved with the focuser position when
+                   the move has finished
+        """
+        future = Future()
+
+        with self._lock:
+            self._pending += amount
+            self._waiting.append(future)
+            start = not self._isBusy
+            self._isBusy = True
+
+        if start:
+            self._StartNextLeg()
+
+        return future
+
+    def StatusUpdated(self, status, readTime):
+        """
+        Report a fresh focuser status. A leg has finished when a status that
+        was read after the leg was started shows that the focuser is not
+        moving. The next merged leg is then started.
+
+        Positional arguments:
+        status   -- the FocuserStatus
+        readTime -- the monotonic time at which the status read was begun
+        """
+        with self._lock:
+            self._position = status.Position
+
+            if self._legStartTime is None or readTime < self._legStartTime:
+                return
+
+            if status.IsMoving:
+                return
+
+            completed = self._inFlight
+            self._inFlight = []
+            self._legStartTime = None
+            isIdle = (
+                self._pending == 0 and self._finalLeg == 0 and len(self._waiting) == 0
+            )
+
+            if isIdle:
+                self._isBusy = False
+
+        for future in completed:
+            self._Resolve(future.set_result, status.Position)
+
+        if isIdle:
+            if self._idleMethod is not None:
+                self._idleMethod()
+        else:
+            try:
+                self._StartNextLeg()
+            except Exception:
+                # the error has been passed on to the waiting requests
+
+                pass
+
+    def Halt(self):
+        """
+        Discard all the queued moves. The requests that have not finished
+        are cancelled.
+        """
+        with self._lock:
+            cancelled = self._inFlight + self._waiting
+            self._inFlight = []
+            self._waiting = []
+            self._pending = 0
+            self._finalLeg = 0
+            self._isBusy = False
+            self._legStartTime = None
+
+        for future in cancelled:
+            future.cancel()
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _StartNextLeg(self):
+        # start the next leg of the net move. The caller must have set the
+        # busy flag.
+
+        with self._lock:
+            target = self._LimitNetMove()
+
+            # a new net move against the approach direction overshoots the
+            # target and then approaches it with a final leg
+
+            direction = self._approachDirection
+
+            if (
+                self._backlashSteps > 0
+                and self._finalLeg == 0
+                and self._pending * direction < 0
+            ):
+                overshoot = self._GetOvershoot(target)
+                self._pending -= direction * overshoot
+                self._finalLeg = direction * overshoot
+
+            # move the rest of the net move, then the final leg
+
+            if self._pending != 0:
+                leg = self._ClampLeg(self._pending)
+                self._pending -= leg
+            else:
+                leg = self._ClampLeg(self._finalLeg)
+                self._finalLeg -= leg
+
+            # the waiting requests are complete when the last leg of the net
+            # move has finished
+
+            if self._pending == 0 and self._finalLeg == 0:
+                self._inFlight.extend(self._waiting)
+                self._waiting = []
+
+        try:
+            self._moveMethod(leg)
+        except Exception as xcp:
+            with self._lock:
+                failed = self._inFlight + self._waiting
+                self._inFlight = []
+                self._waiting = []
+                self._pending = 0
+                self._finalLeg = 0
+                self._isBusy = False
+
+            for future in failed:
+                self._Resolve(future.set_exception, xcp)
+
+            raise
+
+        with self._lock:
+            # the leg has been started unless it was halted meanwhile
+
+            if self._isBusy:
+                self._legStartTime = monotonic()
+
+    def _Resolve(self, setter, value):
+        # resolve a request, which the caller may have cancelled. This is
+        # called from the polling loop, so it must never raise.
+
+        try:
+            setter(value)
+        except InvalidStateError:
+            pass
+
+    def _LimitNetMove(self):
+        # keep the target of the net move inside the travel limits. The
+        # caller must hold the lock.
+        #
+        # Returns -- the target position, or None if it is not known
+
+        if self._lowerLimit is None or not math.isfinite(self._position):
+            return None
+
+        target = self._position + self._pending + self._finalLeg
+        limited = max(self._lowerLimit, min(target, self._upperLimit))
+        self._pending += limited - target
+
+        return limited
+
+    def _GetOvershoot(self, target):
+        # get the overshoot past a target, shortened so that it stays inside
+        # the travel limits. The caller must hold the lock.
+
+        if target is None:
+            return self._backlashSteps
+
+        if self._approachDirection > 0:
+            room = target - self._lowerLimit
+        else:
+            room = self._upperLimit - target
+
+        return max(0, min(self._backlashSteps, room))
+
+    def _ClampLeg(self, amount):
+        # limit a leg to the largest single move. The caller must hold the
+        # lock.
+
+        if self._maxIncrement is None:
+            return amount
+
+        return max(-self._maxIncrement, min(amount, self._maxIncrement))
+
+    # End of Private Helper Methods
@@ -1,4 +1,5 @@
 from alpaca.focuser import *
+from alpaca.exceptions import NotImplementedException
 
 
 class FocuserStatus:
@@ -8,8 +9,17 @@ class FocuserStatus:
     create an empty instance, or one with values read from the driver.
     """
 
-    def __init__(self, focuser=None):
+    def __init__(self, focuser=None, unsupported=None):
         # Initialize the object instance
+        #
+        # unsupported -- an optional set of the names of the properties that
+        #                the focuser is known not to support. They are not
+        #                read, and any property that is found to be not
+        #                implemented is added to the set so that later
+        #                instances do not try to read it again.
+
+        if unsupported is None:
+            unsupported = set()
 
         if focuser:
             # populate this instance with values read from the focuser driver
@@ -20,26 +30,23 @@ class FocuserStatus:
             # reading the Position will raise an error if the focuser
             # is not Absolute
 
-            try:
-                self._position = focuser.Position
-            except:
-                self._position = float("nan")
+            self._position = self._ReadOptional(
+                focuser, "Position", float("nan"), unsupported
+            )
 
             # reading TemperatureCompensation will raise an error if
             # the focuser does not support temp comp
 
-            try:
-                self._tempComp = focuser.TempComp
-            except:
-                self._tempComp = False
+            self._tempComp = self._ReadOptional(
+                focuser, "TempComp", False, unsupported
+            )
 
             # readint the Temperature will raise an exception if the
             # focuser does not support this capability.
 
-            try:
-                self._temperature = focuser.Temperature
-            except:
-                self._temperature = float("nan")
+            self._temperature = self._ReadOptional(
+                focuser, "Temperature", float("nan"), unsupported
+            )
         else:
             # create an instance populated with initial/default values
 
@@ -68,3 +75,34 @@ class FocuserStatus:
     @property
     def Temperature(self):
         return self._temperature
+
+    def _ReadOptional(self, focuser, name, default, unsupported):
+        # read a property that the focuser may not support, returning the
+        # default value if it is not supported. Other errors are not
+        # remembered since they may be temporary.
+
+        if name in unsupported:
+            return default
+
+        try:
+            return getattr(focuser, name)
+        except NotImplementedException:
+            unsupported.add(name)
+        except:
+            pass
+
+        return default
+
+    def ToDict(self):
+        """
+        Get the status values, e.g. for sending to another process
+
+        Returns -- a dictionary of the status property values
+        """
+        return {
+            "Connected": self._connected,
+            "IsMoving": self._isMoving,
+            "Position": self._position,
+            "TempComp": self._tempComp,
+            "Temperature": self._temperature,
+        }
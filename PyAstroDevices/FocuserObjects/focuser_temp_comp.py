@@ -0,0 +1,326 @@
+import math
+import threading as thread
+
+import numpy as np
+from pubsub import pub
+
+from error_reporter import ErrorReporter
+from exception_formatter import ExceptionFormatter
+
+
+class TemperatureFit(object):
+    """
+    Class to contain the result of fitting focus positions against
+    temperature. The model is Position = Intercept + StepsPerDegree * T.
+    """
+
+    def __init__(self, stepsPerDegree, intercept, rSquared, sampleCount):
+        self._stepsPerDegree = stepsPerDegree
+        self._intercept = intercept
+        self._rSquared = rSquared
+        self._sampleCount = sampleCount
+
+    @property
+    def StepsPerDegree(self):
+        return self._stepsPerDegree
+
+    @property
+    def Intercept(self):
+        return self._intercept
+
+    @property
+    def RSquared(self):
+        return self._rSquared
+
+    @property
+    def SampleCount(self):
+        return self._sampleCount
+
+    def PredictPosition(self, temperature):
+        """
+        Get the predicted focus position at a temperature
+
+        Positional arguments:
+        temperature -- the focuser temperature, in degrees C
+
+        Returns -- the predicted position, in steps
+        """
+        return self._intercept + self._stepsPerDegree * temperature
+
+
+class TemperatureCompensator(object):
+    """
+    Class to provide host-side temperature compensation for a focuser.
+
+    Focus points, pairs of temperature and in-focus position, are recorded
+    after the focuser has been focused, e.g. by an autofocus run. A least
+    squares fit of the points gives the focus shift in steps per degree.
+
+    While compensation is running the focuser's status updates are
+    followed. The temperature is smoothed over the last few updates and a
+    correction is only made when the predicted shift reaches the
+    hysteresis threshold, so the focuser makes occasional larger moves
+    instead of hunting after every small change. Corrections go through
+    the focuser's move queue, and are skipped while it is busy.
+
+    The driver's own temperature compensation is turned off while this
+    compensation is running.
+    """
+
+    _CAPACITY = 1000  # the most recent focus points that are kept
+    _MIN_SAMPLES = 3
+    _MIN_TEMPERATURE_RANGE = 1.0  # degrees C
+    _SMOOTHING_COUNT = 5  # status updates
+
+    def __init__(self, focuserManager):
+        """
+        Initializer method for the TemperatureCompensator class
+
+        Positional arguments:
+        focuserManager -- the FocuserManager of the focuser to compensate
+        """
+        self._mgr = focuserManager
+        self._lock = thread.Lock()
+        self._temperatures = np.empty(self._CAPACITY)
+        self._positions = np.empty(self._CAPACITY)
+        self._count = 0
+        self._next = 0
+        self._fit = None
+        self._stepsPerDegree = None
+        self._threshold = 10
+        self._isRunning = False
+        self._recent = []
+        self._referenceTemperature = None
+
+    # Start of Public Properties
+
+    @property
+    def IsRunning(self):
+        return self._isRunning
+
+    @property
+    def SampleCount(self):
+        return self._count
+
+    @property
+    def Fit(self):
+        return self._fit
+
+    @property
+    def StepsPerDegree(self):
+        return self._stepsPerDegree
+
+    @StepsPerDegree.setter
+    def StepsPerDegree(self, value):
+        self._stepsPerDegree = value
+
+    @property
+    def Threshold(self):
+        return self._threshold
+
+    @Threshold.setter
+    def Threshold(self, value):
+        self._threshold = max(1, int(value))
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def AddFocusPoint(self, temperature, position):
+        """
+        Record an in-focus position. Points without a valid temperature or
+        position are ignored.
+
+        Positional arguments:
+        temperature -- the focuser temperature, in degrees C
+        position    -- the in-focus position, in steps
+
+        Returns -- True if the point was recorded
+        """
+        if not (math.isfinite(temperature) and math.isfinite(position)):
+            return False
+
+        with self._lock:
+            self._temperatures[self._next] = temperature
+            self._positions[self._next] = position
+            self._next = (self._next + 1) % self._CAPACITY
+            self._count = min(self._count + 1, self._CAPACITY)
+
+        return True
+
+    def RecordFocusPoint(self):
+        """
+        Record the focuser's current temperature and position as an
+        in-focus point.
+
+        Returns -- True if the point was recorded
+        """
+        sts = self._mgr.Status
+
+        if sts is None or sts.IsMoving:
+            return False
+
+        return self.AddFocusPoint(sts.Temperature, sts.Position)
+
+    def ClearFocusPoints(self):
+        """
+        Discard all the recorded focus points
+        """
+        with self._lock:
+            self._count = 0
+            self._next = 0
+
+    def SaveFocusPoints(self, filename):
+        """
+        Write the recorded focus points to a CSV file, oldest first
+
+        Positional arguments:
+        filename -- the name of the file
+        """
+        with self._lock:
+            order = np.arange(self._next - self._count, self._next) % self._CAPACITY
+            points = np.column_stack(
+                (self._temperatures[order], self._positions[order])
+            )
+
+        np.savetxt(
+            filename, points, fmt="%.3f", delimiter=",", header="Temperature,Position"
+        )
+
+    def LoadFocusPoints(self, filename):
+        """
+        Add the focus points from a CSV file that was written by
+        SaveFocusPoints
+
+        Positional arguments:
+        filename -- the name of the file
+
+        Returns -- the number of points that were added
+        """
+        points = np.loadtxt(filename, delimiter=",", ndmin=2)
+        added = 0
+
+        for temperature, position in points:
+            if self.AddFocusPoint(float(temperature), float(position)):
+                added += 1
+
+        return added
+
+    def FitModel(self):
+        """
+        Fit the focus shift per degree to the recorded focus points. The
+        fitted slope is used for later corrections.
+
+        Returns -- a TemperatureFit, or None if there are too few points or
+                   they do not cover a wide enough range of temperature
+        """
+        with self._lock:
+            temps = self._temperatures[: self._count].copy()
+            positions = self._positions[: self._count].copy()
+
+        if len(temps) < self._MIN_SAMPLES:
+            return None
+
+        if np.ptp(temps) < self._MIN_TEMPERATURE_RANGE:
+            return None
+
+        design = np.column_stack((temps, np.ones_like(temps)))
+        solution, _, _, _ = np.linalg.lstsq(design, positions, rcond=None)
+        slope, intercept = solution
+
+        residuals = positions - design @ solution
+        total = np.sum((positions - positions.mean()) ** 2)
+        rSquared = 1.0 - np.sum(residuals**2) / total if total > 0 else 1.0
+
+        self._fit = TemperatureFit(
+            float(slope), float(intercept), float(rSquared), len(temps)
+        )
+        self._stepsPerDegree = self._fit.StepsPerDegree
+
+        return self._fit
+
+    def Start(self):
+        """
+        Start compensating. The current temperature becomes the reference
+        from which the corrections are calculated.
+        """
+        if self._isRunning:
+            return
+
+        if not self._stepsPerDegree:
+            raise ValueError("The focus shift per degree is not known.")
+
+        # the driver's compensation would fight with ours
+
+        parms = self._mgr.Parameters
+
+        if parms is not None and parms.TempCompAvailable:
+            self._mgr.SetTemperatureCompensation(False)
+
+        self._recent = []
+        self._referenceTemperature = None
+        self._isRunning = True
+        pub.subscribe(self._StatusListener, self._mgr.Topic("FocuserStatusUpdate"))
+
+    def Stop(self):
+        """
+        Stop compensating
+        """
+        if not self._isRunning:
+            return
+
+        pub.unsubscribe(self._StatusListener, self._mgr.Topic("FocuserStatusUpdate"))
+        self._isRunning = False
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _StatusListener(self, sts):
+        # follow the temperature and make a correction when the predicted
+        # focus shift reaches the threshold
+
+        if not sts.Connected:
+            self.Stop()
+            return
+
+        if not math.isfinite(sts.Temperature):
+            return
+
+        self._recent.append(sts.Temperature)
+        self._recent = self._recent[-self._SMOOTHING_COUNT :]
+        temperature = float(np.median(self._recent))
+
+        if self._referenceTemperature is None:
+            self._referenceTemperature = temperature
+            return
+
+        # do not add to, or interrupt, a move that is in progress
+
+        if sts.IsMoving or self._mgr.IsBusy:
+            return
+
+        shift = self._stepsPerDegree * (temperature - self._referenceTemperature)
+        correction = int(round(shift))
+
+        if abs(correction) < self._threshold:
+            return
+
+        try:
+            self._mgr.MoveFocuserBy(correction)
+        except Exception as xcp:
+            self.Stop()
+
+            msg = "Temperature compensation has been stopped because a "
+            msg += "correction could not be made. Details follow:\r\n\r\n"
+            msg += ExceptionFormatter.GetInstance().Format(xcp)
+            ErrorReporter.GetInstance().Report("Temperature Compensation", msg, xcp)
+
+            return
+
+        # move the reference by the temperature change that was corrected,
+        # so that rounding errors do not build up
+
+        self._referenceTemperature += correction / self._stepsPerDegree
+
+    # End of Private Helper Methods
@@ -8,6 +8,7 @@ from PIL import Image, ImageTk
 from pubsub import pub
 from alpaca.focuser import *  # Multiple Classes including Enumerations
 
+from app_settings import ApplicationSettings
 from exception_formatter import ExceptionFormatter
 from focuser_status import FocuserStatus
 from integer_entry_widget import IntegerEntry
@@ -50,12 +51,18 @@ class FocuserControlView:
         self._movementStatusDisplay = tk.StringVar(master=None)
         self._movementStatusDisplay.set(nd)
 
+        config = ApplicationSettings.GetInstance().GetDeviceConfiguration(self._mgr.ID)
+        self._backlashStepsDisplay = tk.IntVar(master=None)
+        self._backlashStepsDisplay.set(config.BacklashSteps)
+        self._backlashDirectionDisplay = tk.StringVar(master=None)
+        self._backlashDirectionDisplay.set(config.BacklashDirection)
+
         self._moveAmount = 1000
 
-        pub.subscribe(self._ParmsListener, "FocuserParametersUpdate")
-        pub.subscribe(self._StatusListener, "FocuserStatusUpdate")
-        pub.subscribe(self._MoveAmountListener, "FocuserMoveUpdate")
-        pub.subscribe(self._DisconnectListener, "FocuserDisconnect")
+        pub.subscribe(self._ParmsListener, self._mgr.Topic("FocuserParametersUpdate"))
+        pub.subscribe(self._StatusListener, self._mgr.Topic("FocuserStatusUpdate"))
+        pub.subscribe(self._MoveAmountListener, self._mgr.Topic("FocuserMoveUpdate"))
+        pub.subscribe(self._DisconnectListener, self._mgr.Topic("FocuserDisconnect"))
 
         self._CreateWidgets()
 
@@ -82,6 +89,7 @@ class FocuserControlView:
         controlFrame.grid_rowconfigure(5, weight=1)
         controlFrame.grid_rowconfigure(6, weight=1)
         controlFrame.grid_rowconfigure(7, weight=1)
+        controlFrame.grid_rowconfigure(8, weight=1)
         controlFrame.grid_columnconfigure(0, weight=1)
 
         # connected status label
@@ -318,6 +326,26 @@ class FocuserControlView:
         self._moveToPositionBtn.pack(side=tk.LEFT, padx=4)
         moveToFrame.grid(row=6, column=0, sticky="w")
 
+        # create the backlash compensation overshoot and approach direction
+
+        backlashFrame = tk.Frame(controlFrame)
+        ttk.Label(backlashFrame, text="Backlash:").pack(side=tk.LEFT, padx=4)
+        IntegerEntry(
+            backlashFrame, width=8, textvariable=self._backlashStepsDisplay
+        ).pack(side=tk.LEFT, padx=4)
+        ttk.Label(backlashFrame, text="steps, approach").pack(side=tk.LEFT)
+        ttk.Combobox(
+            backlashFrame,
+            width=4,
+            state="readonly",
+            values=("out", "in"),
+            textvariable=self._backlashDirectionDisplay,
+        ).pack(side=tk.LEFT, padx=4)
+        ttk.Button(
+            backlashFrame, text="Set", width=4, command=self._OnSetBacklashClick
+        ).pack(side=tk.LEFT, padx=4)
+        backlashFrame.grid(row=7, column=0, sticky="w")
+
         # create the movement status widgets and add them to the grid
 
         moveStatusFrame = tk.Frame(controlFrame)
@@ -332,7 +360,7 @@ class FocuserControlView:
         )
         stateValue.pack(side=tk.LEFT, padx=(4, 0))
 
-        moveStatusFrame.grid(row=7, column=0, pady=(4, 0))
+        moveStatusFrame.grid(row=8, column=0, pady=(4, 0))
 
         # position the control frame
 
@@ -373,6 +401,21 @@ class FocuserControlView:
         delta = target - self._status.Position
         self._RequestFocuserMove(delta)
 
+    def _OnSetBacklashClick(self):
+        # click handler for the backlash Set button. The compensation is
+        # used for the following moves and saved with the settings.
+
+        try:
+            steps = self._backlashStepsDisplay.get()
+        except tk.TclError:
+            msg = "The backlash overshoot is not a valid number of steps."
+            messagebox.showerror(self._ERROR_TITLE, msg, parent=self._parent)
+            return
+
+        direction = self._backlashDirectionDisplay.get()
+        self._mgr.SetBacklashCompensation(abs(steps), direction)
+        ApplicationSettings.GetInstance().SaveSettings()
+
     def _OnUnitsChanged(self):
         # handler for changes to the temperature units radio buttons
 
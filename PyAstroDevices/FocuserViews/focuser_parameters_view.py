@@ -6,6 +6,7 @@ from pubsub import pub
 from alpaca.focuser import *  # Multiple Classes including Enumerations
 
 from focuser_parameters import FocuserParameters
+from device_topic import DeviceTopic
 
 
 class FocuserParametersView:
@@ -14,10 +15,11 @@ class FocuserParametersView:
     Focuser Static Properties tab page
     """
 
-    def __init__(self, parentFrame):
+    def __init__(self, parentFrame, deviceId=None):
         # instance initializer
 
         self._parent = parentFrame
+        self._deviceId = deviceId
 
         # create the variables that are bound to the U/I
 
@@ -39,7 +41,8 @@ class FocuserParametersView:
         parms = FocuserParameters()
         self._ParmsListener(parms)
 
-        pub.subscribe(self._ParmsListener, "FocuserParametersUpdate")
+        topic = DeviceTopic.Format("FocuserParametersUpdate", self._deviceId)
+        pub.subscribe(self._ParmsListener, topic)
 
     # Start of Public Properties and Methods
 
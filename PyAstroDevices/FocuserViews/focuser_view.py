@@ -9,6 +9,7 @@ from focuser_mgr import FocuserManager
 from focuser_status import FocuserStatus
 from focuser_parameters import FocuserParameters
 from exception_formatter import ExceptionFormatter
+from device_topic import DeviceTopic
 
 from focuser_control_view import FocuserControlView
 from focuser_parameters_view import FocuserParametersView
@@ -23,12 +24,19 @@ class FocuserView:
     that contains both the Control and Static Properties views.
     """
 
-    def __init__(self, parentFrame):
+    def __init__(self, parentFrame, deviceId=None):
         # the instance initializer
+        #
+        # deviceId -- the ID of the focuser instance that this view
+        #             controls. The default is the first focuser.
+
+        if deviceId is None:
+            deviceId = DeviceTopic.MakeDeviceId("focuser", 1)
 
         self._parent = parentFrame
+        self._deviceId = deviceId
         self._isConnected = False
-        self._mgr = FocuserManager()
+        self._mgr = FocuserManager(deviceId)
         self._parms = FocuserParameters()
         self._status = FocuserStatus()
         self._connectButtonText = tk.StringVar(master=None)
@@ -37,7 +45,7 @@ class FocuserView:
 
         self._settings = ApplicationSettings.GetInstance()
         self._settings.InitFromSettingsFile()
-        name = self._settings.FocuserDriverName
+        name = self._settings.GetDeviceConfiguration(deviceId).DriverName
 
         if len(name) > 0:
             name = f"({name})"
@@ -56,6 +64,10 @@ class FocuserView:
     def set_IsConnected(self, value):
         self._isConnected = value
 
+    @property
+    def DeviceId(self):
+        return self._deviceId
+
     # End of Public Properties and Methods
 
     # Start of Private Properties and Methods
@@ -66,7 +78,7 @@ class FocuserView:
 
         # subscribe to get parameter updates
 
-        pub.subscribe(self._ParmsListener, "FocuserParameterUpdate")
+        pub.subscribe(self._ParmsListener, self._mgr.Topic("FocuserParameterUpdate"))
 
         # enable the wait cursor in case connection takes some time
 
@@ -74,10 +86,11 @@ class FocuserView:
 
         # connect the driver to the device
 
+        config = self._settings.GetDeviceConfiguration(self._deviceId)
         success = self._mgr.Connect(
-            self._settings.FocuserAddress,
-            self._settings.FocuserDeviceNumber,
-            self._settings.FocuserProtocol,
+            config.Address,
+            config.DeviceNumber,
+            config.Protocol,
         )
 
         # go back to the arrow cursor
@@ -117,7 +130,7 @@ class FocuserView:
 
         # let the child views know that we have disconnected
 
-        pub.sendMessage("FocuserDisconnect")
+        pub.sendMessage(self._mgr.Topic("FocuserDisconnect"))
 
     def _CreateWidgets(self):
         # add controls to the Focuser tab page
@@ -134,7 +147,7 @@ class FocuserView:
             row0Frame, textvariable=self._connectButtonText, width=20
         )
         state = tk.NORMAL
-        if self._settings.FocuserAddress == "":
+        if self._settings.GetDeviceConfiguration(self._deviceId).Address == "":
             state = tk.DISABLED
         self._focuserConnect_btn.config(command=self._OnConnectButtonClick, state=state)
         self._focuserConnect_btn.grid(row=0, column=0, padx=4, pady=4)
@@ -170,7 +183,7 @@ class FocuserView:
         parametersTab = ttk.Frame(focusNotebook)
 
         self._controlView = FocuserControlView(controlTab, self._mgr)
-        self._parmsview = FocuserParametersView(parametersTab)
+        self._parmsview = FocuserParametersView(parametersTab, self._deviceId)
 
         focusNotebook.add(controlTab, text="Control")
         focusNotebook.add(parametersTab, text="Static Properties")
@@ -217,7 +230,12 @@ class FocuserView:
         # Update the settings with the selected device and save them
 
         self._settings.SetDeviceConfiguration(
-            "focuser", device.Name, device.Address, device.DeviceNumber, device.Protocol
+            "focuser",
+            device.Name,
+            device.Address,
+            device.DeviceNumber,
+            device.Protocol,
+            deviceId=self._deviceId,
         )
         self._settings.SaveSettings()
 
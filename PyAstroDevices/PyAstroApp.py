@@ -7,6 +7,9 @@ from tkinter import messagebox
 from pubsub import pub
 
 from app_settings import ApplicationSettings
+from error_reporter import ErrorReporter
+from status_server import StatusServer
+from status_memory import StatusMemoryPublisher
 from scope_view import TelescopeView
 from focuser_view import FocuserView
 
@@ -19,6 +22,9 @@ class Application(tk.Frame):
     It uses a private SETTINGS_FILE environment variable to make the name
     of the JSON settings file, settings.json, available to the
     ApplicationSettings class.
+
+    A tab page is created for each telescope and focuser instance that is
+    configured in the settings file.
     """
 
     def __init__(self, parent, settings):
@@ -35,12 +41,29 @@ class Application(tk.Frame):
         self._settings = settings
         pub.subscribe(self._ChangeCursorListener, "change_cursor")
 
+        # show errors reported by the device managers in a message box
+
+        ErrorReporter.GetInstance().AddHandler(self._ShowErrorHandler)
+
         # define the shutdown handler
 
         parent.protocol("WM_DELETE_WINDOW", self._Shutdown)
 
         self._CreateWidgets()
 
+        # share the status updates with other local tools, if configured
+
+        if settings.StatusServerPort > 0:
+            try:
+                StatusServer.GetInstance().Start(settings.StatusServerPort)
+            except OSError as e:
+                msg = "Unable to start the status server on port "
+                msg += f"{settings.StatusServerPort}.\r\n\r\n{e}"
+                messagebox.showwarning("Status Server", msg, parent=self)
+
+        if settings.StatusSharedMemory:
+            StatusMemoryPublisher.GetInstance().Start()
+
     def _CreateWidgets(self):
         # create top level user interface
 
@@ -54,16 +77,30 @@ class Application(tk.Frame):
         height = self._settings.WindowHeight
         width = self._settings.WindowWidth
 
-        scopeTab = ttk.Frame(devicesNotebook, height=height, width=width)
-        focuserTab = ttk.Frame(devicesNotebook, height=height, width=width)
+        self._scopeViews = []
+        self._focuserViews = []
+
+        deviceIds = self._settings.GetDeviceIds("telescope")
+
+        for n, deviceId in enumerate(deviceIds, start=1):
+            scopeTab = ttk.Frame(devicesNotebook, height=height, width=width)
+            text = "Telescope" if n == 1 else f"Telescope {n}"
+            devicesNotebook.add(scopeTab, text=text)
+
+            # add the device view to the tab page
+
+            self._scopeViews.append(TelescopeView(scopeTab, deviceId))
 
-        devicesNotebook.add(scopeTab, text="Telescope")
-        devicesNotebook.add(focuserTab, text="Focuser")
+        deviceIds = self._settings.GetDeviceIds("focuser")
 
-        # add the device views to the tab pages
+        for n, deviceId in enumerate(deviceIds, start=1):
+            focuserTab = ttk.Frame(devicesNotebook, height=height, width=width)
+            text = "Focuser" if n == 1 else f"Focuser {n}"
+            devicesNotebook.add(focuserTab, text=text)
 
-        self._scopeView = TelescopeView(scopeTab)
-        self._focuserView = FocuserView(focuserTab)
+            # add the device view to the tab page
+
+            self._focuserViews.append(FocuserView(focuserTab, deviceId))
 
     def _ChangeCursorListener(self, wait):
         # change the application cursor between the hourglass and the arrow
@@ -76,35 +113,42 @@ class Application(tk.Frame):
         self.config(cursor=cursor)
         self.update()
 
+    def _ShowErrorHandler(self, title, message, xcp):
+        # error handler that reports device manager errors to the user
+
+        messagebox.showerror(title, message, parent=self)
+
     def _Shutdown(self):
         # shut down the application in preparation for an orderly exit.
 
         # allow graceful disconnect before shutting down
 
-        scopeConnected = self._scopeView.IsConnected
-        focuserConnected = self._focuserView.IsConnected
+        connectedScopes = [v for v in self._scopeViews if v.IsConnected]
+        connectedFocusers = [v for v in self._focuserViews if v.IsConnected]
 
-        if scopeConnected or focuserConnected:
+        if len(connectedScopes) > 0 or len(connectedFocusers) > 0:
             msg = "You are currently connected to "
 
-            if scopeConnected and focuserConnected:
-                msg += "a telescope and a focuser"
-            elif scopeConnected:
-                msg += "a telescope"
-            else:
-                msg += "a focuser"
+            devices = []
+
+            if len(connectedScopes) > 0:
+                devices.append(self._CountDevices(len(connectedScopes), "telescope"))
 
+            if len(connectedFocusers) > 0:
+                devices.append(self._CountDevices(len(connectedFocusers), "focuser"))
+
+            msg += " and ".join(devices)
             msg += ".\r\n\r\nAre you sure that you want to disconnect and exit?"
 
             if messagebox.askokcancel("Okay to continue", msg):
-                if scopeConnected:
-                    self._scopeView.DisconnectTelescope()
-                if focuserConnected:
-                    # self._focuserView.DisconnectFocuser()
-                    pass
+                for scopeView in connectedScopes:
+                    scopeView.DisconnectTelescope()
             else:
                 return
 
+        StatusServer.GetInstance().Stop()
+        StatusMemoryPublisher.GetInstance().Stop()
+
         # update the application settings with the current window size and
         # position
 
@@ -117,6 +161,15 @@ class Application(tk.Frame):
 
         root.destroy()
 
+    def _CountDevices(self, count, devType):
+        # describe a number of connected devices, e.g. 'a telescope' or
+        # '2 focusers'
+
+        if count == 1:
+            return f"a {devType}"
+
+        return f"{count} {devType}s"
+
 
 if __name__ == "__main__":
     """
@@ -133,6 +186,7 @@ if __name__ == "__main__":
     # add the name of our app settings file to the local environment
 
     os.environ["SETTINGS_FILE"] = "settings.json"
+    os.environ["DISCOVERY_CACHE_FILE"] = "discovery_cache.json"
 
     # create a settings object and initialize it from any existing settings file
 
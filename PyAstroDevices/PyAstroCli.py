@@ -0,0 +1,675 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import CancelledError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# the business objects use flat imports, so add their folders to the module
+# search path, just as the GUI project does.
+
+_APP_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+for _folder in ("BusinessObjects", "ScopeObjects", "FocuserObjects"):
+    sys.path.insert(0, os.path.join(_APP_FOLDER, _folder))
+
+from app_settings import ApplicationSettings
+from device_topic import DeviceTopic
+from error_reporter import ErrorReporter
+from exception_formatter import ExceptionFormatter
+from status_server import StatusServer
+from status_memory import StatusMemoryPublisher
+from scope_mgr import TelescopeManager
+from scope_sequencer import TargetSequencer
+from scope_guider import GuideFeed
+from scope_gamepad import GamepadJog
+from scope_catalog import ObjectCatalog, CatalogBuilder
+from focuser_mgr import FocuserManager
+
+
+class HeadlessSession(object):
+    """
+    This class drives the telescope and focuser managers without any user
+    interface. It reads the connection settings from the settings file,
+    allows them to be overridden, and collects the errors that are reported
+    by the managers so that a script can act on them.
+
+    It can be used from the command line, through the main entry point
+    below, or imported by automation scripts.
+    """
+
+    def __init__(self, settings):
+        """
+        Initializer method for the HeadlessSession class
+
+        Positional arguments:
+        settings -- instance of the ApplicationSettings object
+        """
+        self._settings = settings
+        self._managers = []
+        self._errors = []
+        ErrorReporter.GetInstance().AddHandler(self._ErrorHandler)
+
+    # Start of Public Properties
+
+    @property
+    def Errors(self):
+        return list(self._errors)
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def ConnectTelescope(
+        self, deviceId=None, address=None, deviceNumber=None, protocol=None
+    ):
+        """
+        Create a telescope manager and connect to the telescope.
+
+        Keyword arguments:
+        deviceId     -- the ID of the configured telescope instance; the
+                        first instance by default
+        address      -- the Alpaca address, overriding the settings file
+        deviceNumber -- the Alpaca device number, overriding the settings file
+        protocol     -- the protocol, overriding the settings file
+
+        Returns -- the connected TelescopeManager instance
+        """
+        if deviceId is None:
+            deviceId = DeviceTopic.MakeDeviceId("telescope", 1)
+
+        return self._Connect(
+            TelescopeManager(deviceId), address, deviceNumber, protocol
+        )
+
+    def ConnectFocuser(
+        self, deviceId=None, address=None, deviceNumber=None, protocol=None
+    ):
+        """
+        Create a focuser manager and connect to the focuser.
+
+        Keyword arguments:
+        deviceId     -- the ID of the configured focuser instance; the first
+                        instance by default
+        address      -- the Alpaca address, overriding the settings file
+        deviceNumber -- the Alpaca device number, overriding the settings file
+        protocol     -- the protocol, overriding the settings file
+
+        Returns -- the connected FocuserManager instance
+        """
+        if deviceId is None:
+            deviceId = DeviceTopic.MakeDeviceId("focuser", 1)
+
+        return self._Connect(FocuserManager(deviceId), address, deviceNumber, protocol)
+
+    def Close(self):
+        """
+        Disconnect every device that was connected by this session.
+        """
+        for mgr in self._managers:
+            if mgr.IsConnected:
+                try:
+                    mgr.Disconnect()
+                except Exception:
+                    pass
+
+        self._managers = []
+        ErrorReporter.GetInstance().RemoveHandler(self._ErrorHandler)
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _Connect(self, mgr, address, deviceNumber, protocol):
+        # connect a manager using the configured settings, unless they are
+        # overridden
+
+        config = self._settings.GetDeviceConfiguration(mgr.ID)
+
+        if address is None:
+            address = config.Address
+
+        if deviceNumber is None:
+            deviceNumber = config.DeviceNumber
+
+        if protocol is None:
+            protocol = config.Protocol
+
+        if not address:
+            raise ValueError(f"No address is configured for {mgr.ID}.")
+
+        if not mgr.Connect(address, deviceNumber, protocol):
+            msg = mgr.ConnectionError
+
+            if mgr.ConnectException is not None:
+                formatter = ExceptionFormatter.GetInstance()
+                msg += "\n" + formatter.Format(mgr.ConnectException)
+
+            raise ConnectionError(msg)
+
+        self._managers.append(mgr)
+
+        return mgr
+
+    def _ErrorHandler(self, title, message, xcp):
+        # collect errors that are reported by the managers and echo them to
+        # stderr
+
+        self._errors.append((title, message, xcp))
+        sys.stderr.write(f"{title}: {message}\n")
+
+    # End of Private Helper Methods
+
+
+# Start of Command Handlers
+
+
+def _PrintStatus(sts, names):
+    # print the requested status properties, one per line
+
+    for name in names:
+        try:
+            value = getattr(sts, name)
+        except Exception:
+            value = "n/a"
+
+        print(f"{name}: {value}")
+
+    sys.stdout.flush()
+
+
+_TELESCOPE_STATUS = [
+    "RightAscension",
+    "Declination",
+    "Azimuth",
+    "Altitude",
+    "SiderealTime",
+    "SideOfPier",
+    "Tracking",
+    "Slewing",
+    "AtPark",
+    "AtHome",
+]
+
+_FOCUSER_STATUS = ["Position", "IsMoving", "TempComp", "Temperature"]
+
+
+def _WaitForStatus(mgr):
+    # get the most recent status, waiting for the first poll if necessary
+
+    if mgr.Status is None or not mgr.Status.Connected:
+        mgr.WaitForStatusUpdate(timeout=10.0)
+
+    return mgr.Status
+
+
+def _WatchStatus(mgr, names, args):
+    # print each new status until interrupted or polling is stopped. The
+    # status can also be shared with other local tools.
+
+    interval = args.interval
+
+    if args.serve is not None:
+        port = StatusServer.GetInstance().Start(args.serve)
+        sys.stderr.write(f"Serving status updates on 127.0.0.1:{port}\n")
+
+    if args.shared_memory:
+        StatusMemoryPublisher.GetInstance().Start()
+
+    while True:
+        sts = mgr.WaitForStatusUpdate(timeout=interval)
+
+        if sts is None:
+            if not mgr.IsConnected:
+                return 1
+
+            continue
+
+        print(f"--- {time.strftime('%H:%M:%S')}")
+        _PrintStatus(sts, names)
+
+
+def _WaitForMotion(future, timeout, description):
+    # wait for a motion future to be resolved. Returns the exit code.
+
+    if future is None:
+        return 0
+
+    try:
+        future.result(timeout=timeout)
+    except (TimeoutError, FutureTimeoutError):
+        sys.stderr.write(f"The {description} did not finish in time.\n")
+        return 1
+    except CancelledError:
+        sys.stderr.write(f"The {description} was cancelled.\n")
+        return 1
+
+    return 0
+
+
+def _RunSequence(mgr, args):
+    # visit the targets in a CSV file. Returns the exit code.
+
+    sequencer = TargetSequencer(mgr)
+    count = sequencer.LoadTargets(args.file)
+    _WaitForStatus(mgr)
+
+    if args.order:
+        estimate = sequencer.OrderTargets()
+        print(f"Estimated slew time for {count} targets: {estimate:.0f} s")
+
+    def arrived(target):
+        print(f"{time.strftime('%H:%M:%S')} arrived at {target.Name}")
+
+    try:
+        visited = sequencer.Run(onArrival=arrived)
+    except KeyboardInterrupt:
+        sequencer.Stop()
+        raise
+
+    return 0 if visited == count else 1
+
+
+def _RunGuider(mgr, args):
+    # send the guiding corrections from a UDP port or a file to the
+    # telescope until interrupted. Returns the exit code.
+
+    _WaitForStatus(mgr)
+    guider = mgr.Guider
+    guider.Start()
+    feed = GuideFeed(guider)
+
+    if args.file:
+        feed.StartFile(args.file)
+        print(f"Guiding from the lines added to {args.file}")
+    else:
+        port = feed.StartSocket(args.port)
+        print(f"Guiding from UDP port {port}")
+
+    try:
+        while guider.IsRunning:
+            time.sleep(args.interval)
+            stats = guider.GetLatencyStatistics()
+            print(
+                f"{time.strftime('%H:%M:%S')} {stats['Count']} pulses, "
+                f"{guider.MergedCount} merged, latency mean "
+                f"{stats['MeanCommandLatency'] * 1000.0:.0f} ms, max "
+                f"{stats['MaxCommandLatency'] * 1000.0:.0f} ms"
+            )
+    finally:
+        feed.Stop()
+        guider.Stop()
+
+    return 1
+
+
+def _RunGamepad(mgr, args):
+    # nudge the telescope from a gamepad until interrupted. Returns the exit
+    # code.
+
+    _WaitForStatus(mgr)
+    gamepad = GamepadJog(mgr)
+    gamepad.Start(args.gamepad)
+    controller = mgr.NudgeController
+    print(f"Nudging from {gamepad.DeviceName}")
+
+    try:
+        while gamepad.IsRunning:
+            time.sleep(args.interval)
+            stats = controller.GetLatencyStatistics()
+            print(
+                f"{time.strftime('%H:%M:%S')} {stats['Count']} commands, "
+                f"{controller.ExpiredCount} expired, latency mean start "
+                f"{stats['MeanStartLatency'] * 1000.0:.0f} ms, stop "
+                f"{stats['MeanStopLatency'] * 1000.0:.0f} ms"
+            )
+    finally:
+        gamepad.Stop()
+
+    return 1
+
+
+def _RunPointingModel(mgr, args):
+    # show, clear, or turn on or off the pointing model, and save any change
+    # to the settings file. Returns the exit code.
+
+    if args.action == "clear":
+        mgr.ClearPointingModel()
+    elif args.action in ("on", "off"):
+        mgr.SetPointingModelEnabled(args.action == "on")
+
+    if args.action != "show":
+        ApplicationSettings.GetInstance().SaveSettings()
+
+    model = mgr.PointingModel
+    state = "on" if model.IsEnabled else "off"
+    print(f"Pointing model {state}, {model.PointCount} points")
+
+    if model.PointCount > 0:
+        terms = ", ".join(f'{t} {v:+.1f}"' for t, v in model.Terms.items())
+        print(f'{terms}, RMS {model.RmsError:.1f}"')
+
+    return 0
+
+
+def _TelescopeCommand(session, args):
+    # run one of the telescope commands
+
+    mgr = session.ConnectTelescope(
+        args.device, args.address, args.number, args.protocol
+    )
+    future = None
+
+    if args.command == "status":
+        if args.watch:
+            return _WatchStatus(mgr, _TELESCOPE_STATUS, args)
+
+        _PrintStatus(_WaitForStatus(mgr), _TELESCOPE_STATUS)
+    elif args.command == "slew":
+        future = mgr.SlewToCoordinatesAsync(args.ra, args.dec, timeout=args.timeout)
+    elif args.command == "slewaltaz":
+        future = mgr.SlewToAltAzAsync(args.az, args.alt, timeout=args.timeout)
+    elif args.command == "sync":
+        _WaitForStatus(mgr)
+        mgr.SyncToCoordinates(args.ra, args.dec)
+        ApplicationSettings.GetInstance().SaveSettings()
+    elif args.command == "pointing":
+        return _RunPointingModel(mgr, args)
+    elif args.command == "sequence":
+        return _RunSequence(mgr, args)
+    elif args.command == "guide":
+        return _RunGuider(mgr, args)
+    elif args.command == "jog":
+        return _RunGamepad(mgr, args)
+    elif args.command == "park":
+        future = mgr.SlewToPark(timeout=args.timeout)
+    elif args.command == "unpark":
+        mgr.SetUnparkedState()
+    elif args.command == "abort":
+        mgr.AbortSlew()
+    elif args.command == "tracking":
+        mgr.SetTracking(args.state == "on")
+
+    if getattr(args, "wait", False):
+        return _WaitForMotion(future, args.timeout, "telescope motion")
+
+    return 0
+
+
+def _FocuserCommand(session, args):
+    # run one of the focuser commands
+
+    mgr = session.ConnectFocuser(args.device, args.address, args.number, args.protocol)
+    future = None
+
+    if args.command == "status":
+        if args.watch:
+            return _WatchStatus(mgr, _FOCUSER_STATUS, args)
+
+        _PrintStatus(_WaitForStatus(mgr), _FOCUSER_STATUS)
+    elif args.command == "move":
+        _WaitForStatus(mgr)
+        future = mgr.MoveFocuserBy(args.amount)
+    elif args.command == "halt":
+        _WaitForStatus(mgr)
+        mgr.HaltFocuser()
+    elif args.command == "tempcomp":
+        mgr.SetTemperatureCompensation(args.state == "on")
+
+    if getattr(args, "wait", False):
+        return _WaitForMotion(future, args.timeout, "focuser move")
+
+    return 0
+
+
+def _CatalogCommand(session, args):
+    # build the object catalog or look up objects in it
+
+    if args.command == "build":
+        builder = CatalogBuilder()
+        builder.AddSeed()
+
+        for filename in args.openngc or []:
+            builder.AddOpenNgc(filename)
+
+        for filename in args.csv or []:
+            builder.AddCsv(filename)
+
+        output = args.output or CatalogBuilder.GetDefaultCatalogFile(build=False)
+        builder.Write(output)
+        print(f"Wrote {builder.Count} objects to {output}")
+
+        return 0
+
+    catalog = ObjectCatalog.GetInstance()
+
+    if args.command == "find":
+        obj = catalog.FindByName(args.name)
+
+        if obj is None:
+            sys.stderr.write(f"'{args.name}' was not found in the catalog.\n")
+            return 1
+
+        found = [(obj, 0.0)]
+    else:
+        found = catalog.FindNearest(args.ra, args.dec, args.radius, args.limit)
+
+    for obj, separation in found:
+        aliases = ", ".join(obj.Aliases)
+        print(
+            f"{obj.Name:<12} {obj.ObjectType:<6} RA {obj.RightAscension:9.5f} "
+            f"Dec {obj.Declination:+9.5f} Mag {obj.Magnitude:5.1f} "
+            f"Sep {separation:6.3f}  {aliases}"
+        )
+
+    return 0
+
+
+# End of Command Handlers
+
+
+def _AddCommand(commands, name, help=None):
+    # add a command parser with the arguments that select and override the
+    # device connection
+
+    parser = commands.add_parser(name, help=help)
+    parser.add_argument(
+        "--device", help="the configured device ID, e.g. Telescope2 or Focuser"
+    )
+    parser.add_argument("--address", help="the Alpaca address, e.g. 127.0.0.1:11111")
+    parser.add_argument("--number", type=int, help="the Alpaca device number")
+    parser.add_argument("--protocol", choices=["http", "https"])
+
+    return parser
+
+
+def _AddWaitArguments(parser):
+    # add the arguments for commands that can wait for motion to finish
+
+    parser.add_argument(
+        "--wait", action="store_true", help="wait for the motion to finish"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=300.0, help="the maximum wait, in seconds"
+    )
+
+
+def _AddStatusArguments(parser):
+    # add the arguments for the status commands
+
+    parser.add_argument(
+        "--watch", action="store_true", help="print each status update"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=30.0,
+        help="the longest wait for an update while watching, in seconds",
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        metavar="PORT",
+        help="while watching, share the status with local tools on this port",
+    )
+    parser.add_argument(
+        "--shared-memory",
+        action="store_true",
+        help="while watching, also write the status to shared memory",
+    )
+
+
+def _CreateParser():
+    # create the command line parser
+
+    parser = argparse.ArgumentParser(
+        prog="PyAstroCli",
+        description="Control Alpaca telescopes and focusers without the GUI.",
+    )
+    parser.add_argument(
+        "--settings", default="settings.json", help="the JSON settings file"
+    )
+    devices = parser.add_subparsers(dest="deviceType", required=True)
+
+    # telescope commands
+
+    scope = devices.add_parser("telescope")
+    commands = scope.add_subparsers(dest="command", required=True)
+    _AddStatusArguments(_AddCommand(commands, "status"))
+    cmd = _AddCommand(commands, "slew", "slew to RA (hours) and Dec (degrees)")
+    cmd.add_argument("ra", type=float)
+    cmd.add_argument("dec", type=float)
+    _AddWaitArguments(cmd)
+    cmd = _AddCommand(commands, "slewaltaz", "slew to Az and Alt (degrees)")
+    cmd.add_argument("az", type=float)
+    cmd.add_argument("alt", type=float)
+    _AddWaitArguments(cmd)
+    cmd = _AddCommand(commands, "sync", "sync on RA (hours) and Dec (degrees)")
+    cmd.add_argument("ra", type=float)
+    cmd.add_argument("dec", type=float)
+    cmd = _AddCommand(commands, "pointing", "show or change the pointing model")
+    cmd.add_argument("action", choices=["show", "clear", "on", "off"])
+    cmd = _AddCommand(commands, "sequence", "slew to each target in a CSV file")
+    cmd.add_argument("file", help="a CSV file with Name, RA, Dec and Dwell columns")
+    cmd.add_argument(
+        "--no-order",
+        dest="order",
+        action="store_false",
+        help="visit the targets in the order of the file",
+    )
+    cmd = _AddCommand(commands, "guide", "send guide pulses from another program")
+    cmd.add_argument(
+        "--port",
+        type=int,
+        default=0,
+        help="the UDP port for lines of 'RA Dec' pulses in milliseconds",
+    )
+    cmd.add_argument("--file", help="read the pulse lines as they are added to a file")
+    cmd.add_argument(
+        "--interval",
+        type=float,
+        default=10.0,
+        help="the time between latency reports, in seconds",
+    )
+    cmd = _AddCommand(commands, "jog", "nudge the telescope from a gamepad")
+    cmd.add_argument(
+        "--gamepad", help="the input device path, instead of the first gamepad"
+    )
+    cmd.add_argument(
+        "--interval",
+        type=float,
+        default=10.0,
+        help="the time between latency reports, in seconds",
+    )
+    _AddWaitArguments(_AddCommand(commands, "park"))
+    _AddCommand(commands, "unpark")
+    _AddCommand(commands, "abort")
+    cmd = _AddCommand(commands, "tracking")
+    cmd.add_argument("state", choices=["on", "off"])
+    scope.set_defaults(handler=_TelescopeCommand)
+
+    # focuser commands
+
+    focuser = devices.add_parser("focuser")
+    commands = focuser.add_subparsers(dest="command", required=True)
+    _AddStatusArguments(_AddCommand(commands, "status"))
+    cmd = _AddCommand(commands, "move", "move by a number of steps")
+    cmd.add_argument("amount", type=int)
+    _AddWaitArguments(cmd)
+    _AddCommand(commands, "halt")
+    cmd = _AddCommand(commands, "tempcomp")
+    cmd.add_argument("state", choices=["on", "off"])
+    focuser.set_defaults(handler=_FocuserCommand)
+
+    # object catalog commands
+
+    catalog = devices.add_parser("catalog")
+    commands = catalog.add_subparsers(dest="command", required=True)
+    cmd = commands.add_parser("build", help="build the object catalog file")
+    cmd.add_argument(
+        "--openngc", action="append", help="an OpenNGC NGC.csv file to include"
+    )
+    cmd.add_argument(
+        "--csv",
+        action="append",
+        help="a CSV file with Name, Aliases, Type, RA, Dec and Mag columns",
+    )
+    cmd.add_argument("--output", help="the catalog file to write")
+    cmd = commands.add_parser("find", help="look up an object by name")
+    cmd.add_argument("name")
+    cmd = commands.add_parser("near", help="list the objects near a position")
+    cmd.add_argument("ra", type=float)
+    cmd.add_argument("dec", type=float)
+    cmd.add_argument("--radius", type=float, default=1.0, help="in degrees")
+    cmd.add_argument("--limit", type=int, default=10)
+    catalog.set_defaults(handler=_CatalogCommand)
+
+    return parser
+
+
+def Main(argv=None):
+    """
+    Run a single command line request
+
+    Keyword arguments:
+    argv -- the command line arguments, or None to use sys.argv
+
+    Returns -- the process exit code
+    """
+    args = _CreateParser().parse_args(argv)
+
+    # add the name of our app settings file to the local environment
+
+    os.environ["SETTINGS_FILE"] = args.settings
+
+    settings = ApplicationSettings.GetInstance()
+    settings.InitFromSettingsFile()
+
+    session = HeadlessSession(settings)
+
+    try:
+        retval = args.handler(session, args)
+    except KeyboardInterrupt:
+        retval = 130
+    except (ConnectionError, ValueError) as xcp:
+        sys.stderr.write(f"{xcp}\n")
+        retval = 1
+    except Exception as xcp:
+        sys.stderr.write(ExceptionFormatter.GetInstance().Format(xcp) + "\n")
+        retval = 1
+    finally:
+        session.Close()
+        StatusServer.GetInstance().Stop()
+        StatusMemoryPublisher.GetInstance().Stop()
+
+    if retval == 0 and len(session.Errors) > 0:
+        retval = 1
+
+    return retval
+
+
+if __name__ == "__main__":
+    """
+    Main entry point to the command line interface
+    """
+    sys.exit(Main())
@@ -1,8 +1,20 @@
 
 __all__ = [
     "scope_capabilities",
+    "scope_catalog",
+    "scope_ephemeris",
+    "scope_forecast",
+    "scope_gamepad",
+    "scope_guider",
     "scope_helpers",
     "scope_mgr",
+    "scope_nudge_controller",
     "scope_parameters",
+    "scope_pointing_model",
+    "scope_sequencer",
+    "scope_slew_estimator",
+    "scope_slew_limits",
+    "scope_slew_monitor",
     "scope_status",
+    "scope_transforms",
 ]
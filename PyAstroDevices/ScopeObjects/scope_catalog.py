@@ -0,0 +1,890 @@
+import os
+import re
+import csv
+import math
+import struct
+
+import numpy as np
+
+from scope_helpers import Formatter
+
+
+class CatalogObject(object):
+    """
+    Class to contain a single star or deep sky object from the catalog.
+    """
+
+    def __init__(
+        self, name, aliases, objectType, rightAscension, declination, magnitude
+    ):
+        self._name = name
+        self._aliases = aliases
+        self._objectType = objectType
+        self._rightAscension = rightAscension
+        self._declination = declination
+        self._magnitude = magnitude
+
+    @property
+    def Name(self):
+        return self._name
+
+    @property
+    def Aliases(self):
+        return list(self._aliases)
+
+    @property
+    def ObjectType(self):
+        return self._objectType
+
+    @property
+    def RightAscension(self):
+        return self._rightAscension
+
+    @property
+    def Declination(self):
+        return self._declination
+
+    @property
+    def Magnitude(self):
+        return self._magnitude
+
+
+class SkyGrid(object):
+    """
+    Class to divide the sky into cells of roughly equal area, in the manner
+    of the HEALPix ring scheme. The sky is cut into declination bands of
+    equal height and each band into a number of right ascension cells that
+    shrinks towards the poles, so that a cell can be found from a position
+    with a little arithmetic and the cells near a position can be listed
+    without searching.
+    """
+
+    def __init__(self, bandCount):
+        """
+        Initializer method for the SkyGrid class
+
+        Positional arguments:
+        bandCount -- the number of declination bands
+        """
+        self._bandCount = bandCount
+        self._bandHeight = 180.0 / bandCount
+
+        centers = -90.0 + (np.arange(bandCount) + 0.5) * self._bandHeight
+        widths = np.cos(np.radians(centers)) * 360.0 / self._bandHeight
+        self._cellCounts = np.maximum(1, np.rint(widths)).astype(np.int64)
+        self._bandStarts = np.concatenate(([0], np.cumsum(self._cellCounts)))
+
+    @property
+    def BandCount(self):
+        return self._bandCount
+
+    @property
+    def CellCount(self):
+        return int(self._bandStarts[-1])
+
+    def GetCells(self, rightAscension, declination):
+        """
+        Get the cells that contain positions
+
+        Positional arguments:
+        rightAscension -- the right ascensions, in hours
+        declination    -- the declinations, in degrees
+
+        Returns -- an array of cell numbers
+        """
+        dec = np.asarray(declination, dtype=float)
+        band = np.floor((dec + 90.0) / self._bandHeight).astype(np.int64)
+        band = np.clip(band, 0, self._bandCount - 1)
+
+        fraction = (np.asarray(rightAscension, dtype=float) % 24.0) / 24.0
+        count = self._cellCounts[band]
+        cell = np.minimum(np.floor(fraction * count).astype(np.int64), count - 1)
+
+        return self._bandStarts[band] + cell
+
+    def GetCellRanges(self, rightAscension, declination, radius):
+        """
+        Get the cells that may contain positions within a radius of a
+        position. Adjacent cells are merged into ranges.
+
+        Positional arguments:
+        rightAscension -- the right ascension, in hours
+        declination    -- the declination, in degrees
+        radius         -- the search radius, in degrees
+
+        Returns -- a list of (first, last + 1) cell ranges
+        """
+        low = max(-90.0, declination - radius)
+        high = min(90.0, declination + radius)
+        firstBand = min(int((low + 90.0) / self._bandHeight), self._bandCount - 1)
+        lastBand = min(int((high + 90.0) / self._bandHeight), self._bandCount - 1)
+        sinRadius = math.sin(math.radians(min(radius, 90.0)))
+        ranges = []
+
+        for band in range(firstBand, lastBand + 1):
+            start = int(self._bandStarts[band])
+            count = int(self._cellCounts[band])
+
+            # the widest right ascension range is at the band edge that is
+            # nearest a pole
+
+            edge = -90.0 + band * self._bandHeight
+            edge = max(abs(edge), abs(edge + self._bandHeight))
+            cosEdge = math.cos(math.radians(edge))
+
+            if cosEdge <= sinRadius or radius >= 90.0:
+                ranges.append((start, start + count))
+                continue
+
+            halfWidth = math.degrees(math.asin(sinRadius / cosEdge)) / 15.0
+            first = math.floor((rightAscension - halfWidth) / 24.0 * count)
+            last = math.floor((rightAscension + halfWidth) / 24.0 * count)
+
+            if last - first + 1 >= count:
+                ranges.append((start, start + count))
+            elif first < 0:
+                ranges.append((start + first % count, start + count))
+                ranges.append((start, start + last + 1))
+            elif last >= count:
+                ranges.append((start + first, start + count))
+                ranges.append((start, start + last % count + 1))
+            else:
+                ranges.append((start + first, start + last + 1))
+
+        return ranges
+
+
+class CatalogNameIndex(object):
+    """
+    Class to find catalog objects by name, or by the start of a name for
+    type-ahead completion.
+
+    Every name and alias is stored with its normalized form in an array
+    that is sorted by the normalized form, so all the names that start
+    with some text lie together and are found with two binary searches.
+    The normalized forms are stored at the width of the longest one, and
+    the names themselves as their numbers in the catalog's string table.
+    The index is built once from the catalog and cached in a file beside
+    it, which is memory mapped, so later sessions open it without
+    rebuilding it.
+    """
+
+    _FIELDS = ("key", "name", "index")
+    _SUFFIX = ".names.npy"
+
+    def __init__(self, entries, getString):
+        """
+        Initializer method for the CatalogNameIndex class
+
+        Positional arguments:
+        entries   -- the sorted array of index entries
+        getString -- a callable that gets a string from the catalog's
+                     string table by its number
+        """
+        self._entries = entries
+        self._keys = entries["key"]
+        self._keyWidth = entries.dtype["key"].itemsize
+        self._getString = getString
+
+    @classmethod
+    def Open(cls, catalogFilename, records, aliases, getString):
+        """
+        Open the cached index of a catalog, building it first if the cache
+        is missing or older than the catalog
+
+        Positional arguments:
+        catalogFilename -- the name of the catalog file
+        records         -- the catalog's object records
+        aliases         -- the catalog's alias records
+        getString       -- a callable that gets a string from the catalog's
+                           string table by its number
+
+        Returns -- the CatalogNameIndex
+        """
+        cacheFilename = catalogFilename + cls._SUFFIX
+
+        try:
+            if os.path.getmtime(cacheFilename) >= os.path.getmtime(catalogFilename):
+                entries = np.load(cacheFilename, mmap_mode="r")
+
+                if entries.dtype.names == cls._FIELDS:
+                    return cls(entries, getString)
+        except (OSError, ValueError):
+            pass
+
+        entries = cls._BuildEntries(records, aliases, getString)
+
+        # the index still works if the cache cannot be written
+
+        try:
+            temporaryFile = cacheFilename + ".tmp.npy"
+            np.save(temporaryFile, entries)
+            os.replace(temporaryFile, cacheFilename)
+        except OSError:
+            pass
+
+        return cls(entries, getString)
+
+    @property
+    def Count(self):
+        return len(self._entries)
+
+    def Find(self, name):
+        """
+        Find an object by its exact name or alias
+
+        Positional arguments:
+        name -- the name, in any capitalization and spacing
+
+        Returns -- the record number of the object, or None
+        """
+        key = self._Encode(ObjectCatalog.NormalizeName(name))
+
+        # a key that is wider than the index would be cut by the search
+
+        if len(key) > self._keyWidth:
+            return None
+
+        position = np.searchsorted(self._keys, key)
+
+        if position < len(self._keys) and self._keys[position] == key:
+            return int(self._entries["index"][position])
+
+        return None
+
+    def Complete(self, prefix, limit=10):
+        """
+        Get the names that start with some text. Shorter names, which are
+        closer to what has been typed, come first.
+
+        Positional arguments:
+        prefix -- the start of the name, in any capitalization and spacing
+
+        Keyword arguments:
+        limit  -- the largest number of names to return
+
+        Returns -- a list of (name, record number) tuples
+        """
+        key = self._Encode(ObjectCatalog.NormalizeName(prefix))
+
+        if len(key) == 0 or len(key) > self._keyWidth:
+            return []
+
+        # the keys that start with the prefix sort before the prefix padded
+        # with the highest byte to the full width
+
+        first = np.searchsorted(self._keys, key, side="left")
+        last = np.searchsorted(
+            self._keys, key.ljust(self._keyWidth, b"\xff"), side="right"
+        )
+
+        # rank the whole range by key length, so the shortest names are
+        # found however many names share the prefix. Only the lengths are
+        # read for the whole range.
+
+        lengths = np.char.str_len(self._keys[first:last])
+        order = np.argsort(lengths, kind="stable")
+        results = []
+        seen = set()
+
+        for position in order:
+            entry = self._entries[first + position]
+            index = int(entry["index"])
+
+            if index not in seen:
+                seen.add(index)
+                results.append((self._getString(int(entry["name"])), index))
+
+                if len(results) == limit:
+                    break
+
+        return results
+
+    @classmethod
+    def _BuildEntries(cls, records, aliases, getString):
+        # make the sorted array of the names and aliases of all the objects
+
+        names = [(int(name), i) for i, name in enumerate(records["name"])]
+        names += [
+            (int(alias), int(index))
+            for alias, index in zip(aliases["alias"], aliases["index"])
+        ]
+        keys = [
+            cls._Encode(ObjectCatalog.NormalizeName(getString(n))) for n, _ in names
+        ]
+        width = max([len(key) for key in keys] + [1])
+        entryType = np.dtype([("key", f"S{width}"), ("name", "<u4"), ("index", "<i4")])
+
+        entries = np.zeros(len(names), dtype=entryType)
+        entries["key"] = keys
+        entries["name"] = [n for n, _ in names]
+        entries["index"] = [i for _, i in names]
+
+        # a primary name comes before an alias with the same key, so that
+        # an exact lookup finds the object that has the name
+
+        return entries[np.argsort(entries["key"], kind="stable")]
+
+    @staticmethod
+    def _Encode(text):
+        # encode a normalized name as it is stored in the index
+
+        return text.encode()
+
+
+class ObjectCatalog(object):
+    """
+    Class to look up stars and deep sky objects in an offline catalog.
+
+    The catalog is a single binary file that is memory mapped, so it opens
+    instantly and only the parts that are used are read from disk. The
+    objects are stored in fixed size records, sorted by their SkyGrid cell,
+    with a table of the first record of each cell. The objects near a
+    position are found by reading only the records of the nearby cells.
+    The names and aliases are stored whole, as UTF-8, in a string table
+    that the records refer to by number.
+
+    The names and aliases of the objects are looked up in a
+    CatalogNameIndex, which also completes partial names.
+
+    The catalog file is written by the CatalogBuilder class.
+    """
+
+    _MAGIC = b"PADC"
+    _VERSION = 2
+    _HEADER = struct.Struct("<4sHHIIIII")
+
+    # the name and the alias are numbers in the string table
+
+    RECORD_TYPE = np.dtype(
+        [
+            ("name", "<u4"),
+            ("type", "S8"),
+            ("ra", "<f8"),
+            ("dec", "<f8"),
+            ("mag", "<f4"),
+        ]
+    )
+    ALIAS_TYPE = np.dtype([("alias", "<u4"), ("index", "<i4")])
+
+    _instance = None
+
+    @classmethod
+    def GetInstance(cls):
+        """
+        Get the catalog that is bundled with the application, building it
+        from the seed list on first use
+
+        Returns -- the ObjectCatalog instance
+        """
+        if cls._instance is None:
+            cls._instance = ObjectCatalog(CatalogBuilder.GetDefaultCatalogFile())
+
+        return cls._instance
+
+    def __init__(self, filename):
+        """
+        Initializer method for the ObjectCatalog class
+
+        Positional arguments:
+        filename -- the name of the catalog file
+        """
+        header = self._ReadHeader(filename)
+
+        if header is None:
+            raise ValueError(f"{filename} is not a catalog file.")
+
+        _, _, bandCount, recordCount, aliasCount, cellCount = header[:6]
+        stringCount, stringSize = header[6:]
+
+        self._grid = SkyGrid(bandCount)
+
+        offset = self._HEADER.size
+        self._cellStarts = np.memmap(
+            filename, dtype="<i4", mode="r", offset=offset, shape=(cellCount + 1,)
+        )
+        offset += self._cellStarts.nbytes
+        self._records = np.memmap(
+            filename,
+            dtype=self.RECORD_TYPE,
+            mode="r",
+            offset=offset,
+            shape=(recordCount,),
+        )
+        offset += self._records.nbytes
+        self._aliases = np.memmap(
+            filename,
+            dtype=self.ALIAS_TYPE,
+            mode="r",
+            offset=offset,
+            shape=(aliasCount,),
+        )
+        offset += self._aliases.nbytes
+        self._stringStarts = np.memmap(
+            filename, dtype="<u4", mode="r", offset=offset, shape=(stringCount + 1,)
+        )
+        offset += self._stringStarts.nbytes
+        self._strings = np.memmap(
+            filename, dtype=np.uint8, mode="r", offset=offset, shape=(stringSize,)
+        )
+
+        self._aliasIndexes = np.asarray(self._aliases["index"])
+        self._names = CatalogNameIndex.Open(
+            filename, self._records, self._aliases, self._GetString
+        )
+
+    # Start of Public Properties
+
+    @property
+    def Count(self):
+        return len(self._records)
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    @classmethod
+    def IsCatalogFile(cls, filename):
+        """
+        Check whether a file is a catalog in the current format
+
+        Positional arguments:
+        filename -- the name of the file
+
+        Returns -- True if the file can be opened as a catalog
+        """
+        try:
+            return cls._ReadHeader(filename) is not None
+        except OSError:
+            return False
+
+    @staticmethod
+    def NormalizeName(name):
+        """
+        Get the form of a name that is used for lookup, so that e.g.
+        "m31", "M 31" and "M31" all match
+
+        Positional arguments:
+        name -- the object name
+
+        Returns -- the normalized name
+        """
+        return re.sub(r"[\s_]+", "", name).upper()
+
+    def GetObject(self, index):
+        """
+        Get an object by its position in the catalog
+
+        Positional arguments:
+        index -- the record number
+
+        Returns -- the CatalogObject
+        """
+        record = self._records[index]
+
+        # the aliases are stored in record order
+
+        first = np.searchsorted(self._aliasIndexes, index, side="left")
+        last = np.searchsorted(self._aliasIndexes, index, side="right")
+        aliases = [self._GetString(int(a)) for a in self._aliases["alias"][first:last]]
+
+        return CatalogObject(
+            self._GetString(int(record["name"])),
+            aliases,
+            record["type"].decode(),
+            float(record["ra"]),
+            float(record["dec"]),
+            float(record["mag"]),
+        )
+
+    def FindByName(self, name):
+        """
+        Look up an object by its name or one of its aliases
+
+        Positional arguments:
+        name -- the name, in any capitalization and spacing
+
+        Returns -- the CatalogObject, or None if the name is not known
+        """
+        index = self._names.Find(name)
+
+        if index is None:
+            return None
+
+        return self.GetObject(index)
+
+    def CompleteName(self, prefix, limit=10):
+        """
+        Get the object names and aliases that start with some text, for
+        type-ahead completion
+
+        Positional arguments:
+        prefix -- the start of the name, in any capitalization and spacing
+
+        Keyword arguments:
+        limit  -- the largest number of names to return
+
+        Returns -- a list of names, one per object
+        """
+        return [name for name, _ in self._names.Complete(prefix, limit)]
+
+    def FindNearest(self, rightAscension, declination, radius=1.0, limit=10):
+        """
+        Find the objects nearest to a position
+
+        Positional arguments:
+        rightAscension -- the right ascension, in hours
+        declination    -- the declination, in degrees
+
+        Keyword arguments:
+        radius         -- the largest separation, in degrees
+        limit          -- the largest number of objects to return
+
+        Returns -- a list of (CatalogObject, separation in degrees) tuples,
+                   nearest first
+        """
+        ranges = self._grid.GetCellRanges(rightAscension, declination, radius)
+        slices = [
+            np.arange(self._cellStarts[first], self._cellStarts[last])
+            for first, last in ranges
+        ]
+
+        if len(slices) == 0:
+            return []
+
+        indexes = np.concatenate(slices)
+
+        if len(indexes) == 0:
+            return []
+
+        candidates = self._records[indexes]
+        separation = self._Separation(
+            rightAscension, declination, candidates["ra"], candidates["dec"]
+        )
+        inside = separation <= radius
+        indexes = indexes[inside]
+        separation = separation[inside]
+        order = np.argsort(separation)[:limit]
+
+        return [(self.GetObject(int(indexes[i])), float(separation[i])) for i in order]
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    @classmethod
+    def _ReadHeader(cls, filename):
+        # read the header of a catalog file, or None if it is not a catalog
+        # in the current format
+
+        with open(filename, "rb") as f:
+            data = f.read(cls._HEADER.size)
+
+        if len(data) != cls._HEADER.size or data[:4] != cls._MAGIC:
+            return None
+
+        header = cls._HEADER.unpack(data)
+
+        return header if header[1] == cls._VERSION else None
+
+    def _GetString(self, number):
+        # get a name from the string table
+
+        start, end = self._stringStarts[number : number + 2]
+
+        return self._strings[start:end].tobytes().decode()
+
+    def _Separation(self, ra1, dec1, ra2, dec2):
+        # the angular separations, in degrees, by the haversine formula
+
+        ra1 = math.radians(ra1 * 15.0)
+        dec1 = math.radians(dec1)
+        ra2 = np.radians(ra2 * 15.0)
+        dec2 = np.radians(dec2)
+
+        h = np.sin((dec2 - dec1) / 2.0) ** 2
+        h += math.cos(dec1) * np.cos(dec2) * np.sin((ra2 - ra1) / 2.0) ** 2
+
+        return np.degrees(2.0 * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0))))
+
+    # End of Private Helper Methods
+
+
+class CatalogBuilder(object):
+    """
+    Class to build a catalog file from lists of objects.
+
+    Objects can be added from CSV files with the columns Name, Aliases,
+    Type, RA, Dec and Mag, such as the seed list that is bundled with the
+    application or a bright star list, and from the OpenNGC database,
+    which covers the NGC and IC objects and the Messier cross references.
+    Objects that are added twice under the same name are kept once.
+    """
+
+    _DEFAULT_BAND_COUNT = 90
+    _SEED_FILE = os.path.join("Assets", "catalog_seed.csv")
+    _CATALOG_FILE = "catalog.bin"
+
+    def __init__(self):
+        self._objects = {}
+
+    @classmethod
+    def GetDefaultCatalogFile(cls, build=True):
+        """
+        Get the name of the application's catalog file. It is built from
+        the bundled seed list if it does not exist or is older than the
+        seed list.
+
+        Keyword arguments:
+        build -- if False, only get the name
+
+        Returns -- the name of the catalog file
+        """
+        catalogFile = os.path.join(cls._GetAppFolder(), cls._CATALOG_FILE)
+        seedFile = os.path.join(cls._GetAppFolder(), cls._SEED_FILE)
+
+        if not build:
+            return catalogFile
+
+        if not ObjectCatalog.IsCatalogFile(catalogFile) or (
+            os.path.getmtime(catalogFile) < os.path.getmtime(seedFile)
+        ):
+            builder = CatalogBuilder()
+            builder.AddSeed()
+            builder.Write(catalogFile)
+
+        return catalogFile
+
+    # Start of Public Properties
+
+    @property
+    def Count(self):
+        return len(self._objects)
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def AddObject(
+        self, name, aliases, objectType, rightAscension, declination, magnitude
+    ):
+        """
+        Add an object
+
+        Positional arguments:
+        name           -- the primary designation, e.g. "M 31"
+        aliases        -- a list of other names
+        objectType     -- a short type code, e.g. "G" or "Star"
+        rightAscension -- the right ascension, in hours
+        declination    -- the declination, in degrees
+        magnitude      -- the visual magnitude, or NaN if not known
+        """
+        key = ObjectCatalog.NormalizeName(name)
+
+        if key in self._objects:
+            known = self._objects[key][1]
+            known.extend(a for a in aliases if a not in known)
+
+            return
+
+        self._objects[key] = (
+            name,
+            list(aliases),
+            objectType,
+            rightAscension,
+            declination,
+            magnitude,
+        )
+
+    def AddSeed(self):
+        """
+        Add the objects from the seed list that is bundled with the
+        application
+
+        Returns -- the number of objects that were read
+        """
+        return self.AddCsv(os.path.join(self._GetAppFolder(), self._SEED_FILE))
+
+    def AddCsv(self, filename):
+        """
+        Add the objects from a CSV file with a header line. The Aliases
+        column separates the names with semicolons. RA and Dec may be
+        decimal hours and degrees or in sexagesimal form.
+
+        Positional arguments:
+        filename -- the name of the CSV file
+
+        Returns -- the number of rows that were read
+        """
+        count = 0
+
+        with open(filename, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                aliases = [a.strip() for a in row.get("Aliases", "").split(";")]
+                self.AddObject(
+                    row["Name"].strip(),
+                    [a for a in aliases if a],
+                    row.get("Type", "").strip(),
+                    Formatter.ParseSexagesimal(row["RA"]),
+                    Formatter.ParseSexagesimal(row["Dec"]),
+                    self._ParseMagnitude(row.get("Mag")),
+                )
+                count += 1
+
+        return count
+
+    def AddOpenNgc(self, filename):
+        """
+        Add the objects from the OpenNGC database file, NGC.csv, which is
+        semicolon separated. Duplicate and nonexistent entries are skipped.
+        Objects with a Messier number are named by it.
+
+        Positional arguments:
+        filename -- the name of the OpenNGC file
+
+        Returns -- the number of objects that were added
+        """
+        count = 0
+
+        with open(filename, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f, delimiter=";"):
+                objectType = row.get("Type", "")
+
+                if objectType in ("Dup", "NonEx") or not row.get("RA"):
+                    continue
+
+                designation = self._FormatDesignation(row["Name"])
+                aliases = []
+                messier = row.get("M", "").strip()
+
+                if messier:
+                    aliases.append(designation)
+                    designation = f"M {int(messier)}"
+
+                for column, prefix in (("NGC", "NGC"), ("IC", "IC")):
+                    for number in row.get(column, "").split(","):
+                        if number.strip():
+                            aliases.append(f"{prefix} {number.strip().lstrip('0')}")
+
+                for name in row.get("Common names", "").split(","):
+                    if name.strip():
+                        aliases.append(name.strip())
+
+                magnitude = row.get("V-Mag") or row.get("B-Mag")
+
+                self.AddObject(
+                    designation,
+                    aliases,
+                    objectType,
+                    Formatter.ParseSexagesimal(row["RA"]),
+                    Formatter.ParseSexagesimal(row["Dec"]),
+                    self._ParseMagnitude(magnitude),
+                )
+                count += 1
+
+        return count
+
+    def Write(self, filename, bandCount=_DEFAULT_BAND_COUNT):
+        """
+        Write the catalog file
+
+        Positional arguments:
+        filename  -- the name of the catalog file
+
+        Keyword arguments:
+        bandCount -- the number of declination bands of the SkyGrid
+        """
+        grid = SkyGrid(bandCount)
+        objects = list(self._objects.values())
+
+        # the string table holds each name, then the aliases of every object
+
+        strings = [o[0].encode() for o in objects]
+        strings += [alias.encode() for o in objects for alias in o[1]]
+        stringStarts = np.cumsum([0] + [len(text) for text in strings])
+        aliasNumbers = iter(range(len(objects), len(strings)))
+        objectAliases = [[next(aliasNumbers) for _ in o[1]] for o in objects]
+
+        records = np.zeros(len(objects), dtype=ObjectCatalog.RECORD_TYPE)
+        records["name"] = np.arange(len(objects))
+        records["type"] = [self._ClipType(o[2]) for o in objects]
+        records["ra"] = [o[3] % 24.0 for o in objects]
+        records["dec"] = [o[4] for o in objects]
+        records["mag"] = [o[5] for o in objects]
+
+        # sort the records by cell and then by brightness
+
+        cells = grid.GetCells(records["ra"], records["dec"])
+        order = np.lexsort((records["mag"], cells))
+        records = records[order]
+        cells = cells[order]
+        cellStarts = np.searchsorted(cells, np.arange(grid.CellCount + 1))
+
+        aliases = [
+            (alias, newIndex)
+            for newIndex, oldIndex in enumerate(order)
+            for alias in objectAliases[oldIndex]
+        ]
+        aliasRecords = np.array(aliases, dtype=ObjectCatalog.ALIAS_TYPE)
+
+        header = ObjectCatalog._HEADER.pack(
+            ObjectCatalog._MAGIC,
+            ObjectCatalog._VERSION,
+            bandCount,
+            len(records),
+            len(aliasRecords),
+            grid.CellCount,
+            len(strings),
+            int(stringStarts[-1]),
+        )
+
+        # write to a temporary file so that a catalog that is open is not
+        # changed under it
+
+        temporaryFile = filename + ".tmp"
+
+        with open(temporaryFile, "wb") as f:
+            f.write(header)
+            f.write(cellStarts.astype("<i4").tobytes())
+            f.write(records.tobytes())
+            f.write(aliasRecords.tobytes())
+            f.write(stringStarts.astype("<u4").tobytes())
+            f.write(b"".join(strings))
+
+        os.replace(temporaryFile, filename)
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    @classmethod
+    def _GetAppFolder(cls):
+        # the application folder, which holds the seed list and the catalog
+
+        return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def _FormatDesignation(self, name):
+        # turn an OpenNGC name such as NGC0224 or IC0434 into NGC 224
+
+        match = re.match(r"^(NGC|IC)0*(\d+)(.*)$", name.strip())
+
+        if match is None:
+            return name.strip()
+
+        return f"{match.group(1)} {match.group(2)}{match.group(3)}"
+
+    def _ClipType(self, objectType):
+        # the type code is a short fixed size field, so clip it without
+        # splitting a character
+
+        return objectType.encode()[:8].decode(errors="ignore").encode()
+
+    def _ParseMagnitude(self, text):
+        # get a magnitude, or NaN if it is missing
+
+        try:
+            return float(text)
+        except (TypeError, ValueError):
+            return float("nan")
+
+    # End of Private Helper Methods
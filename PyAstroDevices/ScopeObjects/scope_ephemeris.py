@@ -0,0 +1,647 @@
+import math
+import re
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from pubsub import pub
+
+from exception_formatter import ExceptionFormatter
+from error_reporter import ErrorReporter
+
+
+class CubicSpline(object):
+    """
+    Class to interpolate tabulated values with a natural cubic spline, whose
+    value, slope and curvature are continuous through every table point and
+    whose curvature is zero at the ends.
+    """
+
+    def __init__(self, x, y):
+        """
+        Initializer method for the CubicSpline class
+
+        Positional arguments:
+        x -- the table arguments, in increasing order
+        y -- the table values
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        if len(x) < 2:
+            raise ValueError("A spline needs at least two points.")
+
+        if np.any(np.diff(x) <= 0.0):
+            raise ValueError("The spline arguments must be in increasing order.")
+
+        self._x = x
+        self._y = y
+        self._m = self._GetCurvatures(x, y)
+
+    @property
+    def Start(self):
+        return float(self._x[0])
+
+    @property
+    def End(self):
+        return float(self._x[-1])
+
+    def Value(self, x):
+        """
+        Get the interpolated values
+
+        Positional arguments:
+        x -- the arguments
+
+        Returns -- the values of the spline
+        """
+        i, h, a, b = self._Locate(x)
+        m = self._m
+        y = self._y
+
+        return (
+            a * y[i]
+            + b * y[i + 1]
+            + ((a**3 - a) * m[i] + (b**3 - b) * m[i + 1]) * h**2 / 6.0
+        )
+
+    def Slope(self, x):
+        """
+        Get the first derivative of the spline
+
+        Positional arguments:
+        x -- the arguments
+
+        Returns -- the slopes of the spline
+        """
+        i, h, a, b = self._Locate(x)
+        m = self._m
+        y = self._y
+
+        return (y[i + 1] - y[i]) / h + (
+            (1.0 - 3.0 * a**2) * m[i] + (3.0 * b**2 - 1.0) * m[i + 1]
+        ) * h / 6.0
+
+    def _Locate(self, x):
+        # find the table interval of each argument, and the weights of its
+        # end points
+
+        x = np.asarray(x, dtype=float)
+        i = np.clip(np.searchsorted(self._x, x) - 1, 0, len(self._x) - 2)
+        h = self._x[i + 1] - self._x[i]
+        b = (x - self._x[i]) / h
+
+        return i, h, 1.0 - b, b
+
+    def _GetCurvatures(self, x, y):
+        # solve the tridiagonal equations for the second derivatives at the
+        # table points
+
+        n = len(x)
+        m = np.zeros(n)
+
+        if n < 3:
+            return m
+
+        h = np.diff(x)
+        rhs = 6.0 * np.diff(np.diff(y) / h)
+        diagonal = 2.0 * (h[:-1] + h[1:])
+        upper = h[1:-1].copy()
+
+        # the Thomas algorithm, forward elimination then back substitution
+
+        for k in range(1, n - 2):
+            w = h[k] / diagonal[k - 1]
+            diagonal[k] -= w * upper[k - 1]
+            rhs[k] -= w * rhs[k - 1]
+
+        inner = np.zeros(n - 2)
+        inner[-1] = rhs[-1] / diagonal[-1]
+
+        for k in range(n - 4, -1, -1):
+            inner[k] = (rhs[k] - upper[k] * inner[k + 1]) / diagonal[k]
+
+        m[1:-1] = inner
+
+        return m
+
+
+class EphemerisTable(object):
+    """
+    Class to contain the ephemeris of a moving object, e.g. a comet or an
+    asteroid, and to interpolate its position and rates at any time within
+    the table.
+
+    The table is read from a JPL Horizons observer table, saved as text.
+    The right ascension and declination (quantity 1 or 2) must be in
+    sexagesimal form. The rates (quantity 3) are used if the column headings
+    show them directly after the position, otherwise the rates are found
+    from the positions. For a nearby object
+    the table should be for the observing site, so that it includes the
+    parallax.
+    """
+
+    _MONTHS = (
+        "Jan",
+        "Feb",
+        "Mar",
+        "Apr",
+        "May",
+        "Jun",
+        "Jul",
+        "Aug",
+        "Sep",
+        "Oct",
+        "Nov",
+        "Dec",
+    )
+    _DATE_PATTERN = re.compile(
+        r"(\d{4})-([A-Za-z]{3})-(\d{2})\s+(\d{2}):(\d{2})(?::(\d{2}(?:\.\d+)?))?"
+    )
+    _ANGLE = r"[+-]?\d{1,3}\s+\d{2}\s+\d{2}(?:\.\d*)?"
+    _RATE = r"[+-]?\d*\.\d+(?:[Ee][+-]?\d+)?"
+    _POSITION_PATTERN = re.compile(rf"(?P<ra>{_ANGLE})[\s,]+(?P<dec>{_ANGLE})")
+    _RATES_PATTERN = re.compile(
+        rf"[\s,]+(?P<raRate>{_RATE})[\s,]+(?P<decRate>{_RATE})(?=[\s,]|$)"
+    )
+
+    def __init__(
+        self, times, rightAscensions, declinations, raRates=None, decRates=None
+    ):
+        """
+        Initializer method for the EphemerisTable class
+
+        Positional arguments:
+        times           -- the times of the table rows, in seconds since the
+                           Unix epoch
+        rightAscensions -- the right ascensions, in hours
+        declinations    -- the declinations, in degrees
+
+        Keyword arguments:
+        raRates         -- the rates of motion in right ascension on the sky,
+                           dRA*cos(Dec), in arcseconds per hour, or None
+        decRates        -- the rates of motion in declination, in arcseconds
+                           per hour, or None
+        """
+        times = np.asarray(times, dtype=float)
+
+        # remove the wrap at 24 hours so the spline is continuous
+
+        ra = np.degrees(np.unwrap(np.radians(np.asarray(rightAscensions) * 15.0)))
+        ra /= 15.0
+
+        self._raSpline = CubicSpline(times, ra)
+        self._decSpline = CubicSpline(times, declinations)
+        self._raRateSpline = None
+        self._decRateSpline = None
+
+        if raRates is not None and decRates is not None:
+            self._raRateSpline = CubicSpline(times, raRates)
+            self._decRateSpline = CubicSpline(times, decRates)
+
+        self._count = len(times)
+
+    @classmethod
+    def Load(cls, filename):
+        """
+        Read a JPL Horizons observer table, in either its plain or its CSV
+        format
+
+        Positional arguments:
+        filename -- the name of the file
+
+        Returns -- an EphemerisTable
+        """
+        times = []
+        ras = []
+        decs = []
+        raRates = []
+        decRates = []
+        inTable = False
+        heading = ""
+
+        with open(filename) as f:
+            for line in f:
+                if line.startswith("$$SOE"):
+                    inTable = True
+                    hasRates = cls._HasRateColumns(heading)
+                    continue
+                elif line.startswith("$$EOE"):
+                    break
+
+                if not inTable:
+                    # the column headings are on the line with the date
+                    # heading, before the start of the table
+
+                    if "Date_" in line:
+                        heading = line
+
+                    continue
+
+                row = cls._ParseRow(line, hasRates)
+
+                if row is not None:
+                    times.append(row[0])
+                    ras.append(row[1])
+                    decs.append(row[2])
+                    raRates.append(row[3])
+                    decRates.append(row[4])
+
+        if len(times) < 2:
+            msg = f"{filename} does not contain a Horizons table of at least "
+            msg += "two rows between the $$SOE and $$EOE markers."
+            raise ValueError(msg)
+
+        if None in raRates or None in decRates:
+            raRates = None
+            decRates = None
+
+        return cls(times, ras, decs, raRates, decRates)
+
+    # Start of Public Properties
+
+    @property
+    def StartTime(self):
+        return self._raSpline.Start
+
+    @property
+    def EndTime(self):
+        return self._raSpline.End
+
+    @property
+    def RowCount(self):
+        return self._count
+
+    @property
+    def HasRates(self):
+        return self._raRateSpline is not None
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def Contains(self, when):
+        """
+        Check whether a time is within the table
+
+        Positional arguments:
+        when -- the time, in seconds since the Unix epoch
+
+        Returns -- True if the table covers the time
+        """
+        return self.StartTime <= when <= self.EndTime
+
+    def GetPosition(self, when):
+        """
+        Get the object's position at a time
+
+        Positional arguments:
+        when -- the time, in seconds since the Unix epoch
+
+        Returns -- a tuple of the right ascension, in hours, and the
+                   declination, in degrees
+        """
+        ra = float(self._raSpline.Value(when)) % 24.0
+        dec = float(self._decSpline.Value(when))
+
+        return ra, dec
+
+    def GetRates(self, when):
+        """
+        Get the object's rates of motion at a time, in the JPL Horizons
+        units
+
+        Positional arguments:
+        when -- the time, in seconds since the Unix epoch
+
+        Returns -- a tuple of the rate in right ascension on the sky,
+                   dRA*cos(Dec), and the rate in declination, both in
+                   arcseconds per hour
+        """
+        if self.HasRates:
+            return (
+                float(self._raRateSpline.Value(when)),
+                float(self._decRateSpline.Value(when)),
+            )
+
+        # the slopes are in hours and degrees per second
+
+        dec = float(self._decSpline.Value(when))
+        raRate = float(self._raSpline.Slope(when)) * 15.0 * 3600.0 * 3600.0
+        raRate *= math.cos(math.radians(dec))
+        decRate = float(self._decSpline.Slope(when)) * 3600.0 * 3600.0
+
+        return raRate, decRate
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    @classmethod
+    def _HasRateColumns(cls, heading):
+        # check that the columns that follow the position are the rates.
+        # Other quantities, e.g. the magnitudes, must not be taken as rates.
+
+        names = [name for name in re.split(r"[\s,]+", heading) if name]
+        positions = [
+            i for i, name in enumerate(names) if name.startswith(("R.A.", "DEC"))
+        ]
+
+        if len(positions) == 0:
+            return False
+
+        following = names[positions[-1] + 1 : positions[-1] + 3]
+
+        return following == ["dRA*cosD", "d(DEC)/dt"]
+
+    @classmethod
+    def _ParseRow(cls, line, hasRates):
+        # parse one row of the table into the time, position and rates. The
+        # rates follow the last position, as the astrometric and apparent
+        # positions may both be present.
+
+        match = cls._DATE_PATTERN.search(line)
+
+        if match is None or match.group(2).title() not in cls._MONTHS:
+            return None
+
+        # the month names are in English whatever the locale
+
+        year, month, day, hour, minute, second = match.groups()
+        when = datetime(
+            int(year),
+            cls._MONTHS.index(month.title()) + 1,
+            int(day),
+            int(hour),
+            int(minute),
+            tzinfo=timezone.utc,
+        )
+        seconds = when.timestamp() + float(second or 0.0)
+
+        # the solar and lunar presence flags may follow the date
+
+        text = line[match.end() :]
+        rows = list(cls._POSITION_PATTERN.finditer(text))
+
+        if len(rows) == 0:
+            return None
+
+        ra = cls._ParseAngle(rows[0].group("ra"))
+        dec = cls._ParseAngle(rows[0].group("dec"))
+        raRate = None
+        decRate = None
+        rates = cls._RATES_PATTERN.match(text, rows[-1].end())
+
+        if hasRates and rates is not None:
+            raRate = float(rates.group("raRate"))
+            decRate = float(rates.group("decRate"))
+
+        return seconds, ra, dec, raRate, decRate
+
+    @staticmethod
+    def _ParseAngle(text):
+        # convert a sexagesimal angle to decimal units
+
+        fields = text.split()
+        value = abs(float(fields[0])) + float(fields[1]) / 60.0
+        value += float(fields[2]) / 3600.0
+
+        return -value if fields[0].startswith("-") else value
+
+    # End of Private Helper Methods
+
+
+class EphemerisTracker(object):
+    """
+    Class to make the telescope follow a moving object by updating its
+    tracking rate offsets from an ephemeris as the object's motion changes.
+
+    The rates are checked after each status update, and are only sent to
+    the driver when they differ from the rates that were last sent by more
+    than the threshold. This keeps the object centered without writing the
+    rates to the driver on every update.
+
+    The tracker stops, and clears the offsets, when the time passes the end
+    of the ephemeris or the telescope is disconnected. A
+    TelescopeEphemerisUpdate message is sent each time that the rates are
+    sent to the driver, and when the tracker stops.
+    """
+
+    _SI_SECONDS_PER_SIDEREAL_SECOND = 0.997269566334879
+
+    def __init__(self, telescopeManager):
+        """
+        Initializer method for the EphemerisTracker class
+
+        Positional arguments:
+        telescopeManager -- the TelescopeManager of the telescope
+        """
+        self._mgr = telescopeManager
+        self._table = None
+        self._threshold = 0.5
+        self._isRunning = False
+        self._sentRates = None
+        self._updateCount = 0
+
+    # Start of Public Properties
+
+    @property
+    def Table(self):
+        return self._table
+
+    @property
+    def IsRunning(self):
+        return self._isRunning
+
+    @property
+    def Threshold(self):
+        # the change in either rate that causes the rates to be sent, in
+        # arcseconds per hour
+
+        return self._threshold
+
+    @Threshold.setter
+    def Threshold(self, value):
+        self._threshold = value
+
+    @property
+    def SentRates(self):
+        # the rates that were last sent, in the JPL Horizons units, or None
+
+        return self._sentRates
+
+    @property
+    def UpdateCount(self):
+        # the number of times that the rates have been sent to the driver
+
+        return self._updateCount
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def Load(self, filename):
+        """
+        Read the ephemeris to follow from a JPL Horizons observer table
+
+        Positional arguments:
+        filename -- the name of the file
+
+        Returns -- the EphemerisTable
+        """
+        table = EphemerisTable.Load(filename)
+        self.SetTable(table)
+
+        return table
+
+    def SetTable(self, table):
+        """
+        Set the ephemeris to follow. The tracker is stopped if it is
+        running.
+
+        Positional arguments:
+        table -- an EphemerisTable
+        """
+        self.Stop()
+        self._table = table
+
+    def Start(self):
+        """
+        Start following the object, sending its current rates at once
+        """
+        if self._isRunning:
+            return
+
+        if self._table is None:
+            msg = "EphemerisTracker.Start was called before an ephemeris "
+            msg += "was loaded."
+            raise RuntimeError(msg)
+
+        if not self._table.Contains(time.time()):
+            raise ValueError("The current time is outside the ephemeris.")
+
+        self._sentRates = None
+        self._updateCount = 0
+        self._isRunning = True
+        pub.subscribe(self._StatusListener, self._mgr.Topic("TelescopeStatusUpdate"))
+        self.Update()
+
+    def Stop(self):
+        """
+        Stop following the object and clear the tracking rate offsets
+        """
+        if not self._isRunning:
+            return
+
+        pub.unsubscribe(self._StatusListener, self._mgr.Topic("TelescopeStatusUpdate"))
+        self._isRunning = False
+        self._sentRates = None
+
+        if self._mgr.IsConnected:
+            self._mgr.SetOffsetTrackingRates(0.0, 0.0)
+
+        self._SendUpdate()
+
+    def Update(self, when=None):
+        """
+        Send the object's rates to the driver if they have changed by more
+        than the threshold since they were last sent
+
+        Keyword arguments:
+        when -- the time, in seconds since the Unix epoch, or None for now
+
+        Returns -- True if the rates were sent
+        """
+        if not self._isRunning:
+            return False
+
+        when = time.time() if when is None else when
+
+        if not self._table.Contains(when):
+            self.Stop()
+
+            return False
+
+        rates = self._table.GetRates(when)
+
+        if self._sentRates is not None:
+            raChange = abs(rates[0] - self._sentRates[0])
+            decChange = abs(rates[1] - self._sentRates[1])
+
+            if max(raChange, decChange) <= self._threshold:
+                return False
+
+        _, dec = self._table.GetPosition(when)
+        self._mgr.SetOffsetTrackingRates(*self.ToAscomRates(rates, dec))
+        self._sentRates = rates
+        self._updateCount += 1
+        self._SendUpdate()
+
+        return True
+
+    def ToAscomRates(self, rates, declination):
+        """
+        Convert rates from the JPL Horizons units to the units of the
+        telescope's tracking rate offsets
+
+        Positional arguments:
+        rates       -- a tuple of the rate in right ascension on the sky,
+                       dRA*cos(Dec), and the rate in declination, both in
+                       arcseconds per hour
+        declination -- the object's declination, in degrees
+
+        Returns -- a tuple of the right ascension rate, in seconds of right
+                   ascension per sidereal second, and the declination rate,
+                   in arcseconds per SI second
+        """
+        raRate, decRate = rates
+
+        # the RA rate on the sky is larger, in time, away from the equator
+
+        cosDec = max(math.cos(math.radians(declination)), 1e-6)
+        raRate = raRate / cosDec / 15.0 / 3600.0
+        raRate *= self._SI_SECONDS_PER_SIDEREAL_SECOND
+
+        return raRate, decRate / 3600.0
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _StatusListener(self, sts):
+        # check the rates after each status update
+
+        if not sts.Connected:
+            self._Abandon()
+
+            return
+
+        try:
+            self.Update()
+        except Exception as xcp:
+            self._Abandon()
+
+            msg = "The telescope stopped following the ephemeris because "
+            msg += "the tracking rates could not be set. Details follow:\r\n\r\n"
+            msg += ExceptionFormatter.GetInstance().Format(xcp)
+            ErrorReporter.GetInstance().Report("Ephemeris Tracking Error", msg, xcp)
+
+    def _Abandon(self):
+        # stop without clearing the offsets, which the driver cannot accept
+
+        if not self._isRunning:
+            return
+
+        pub.unsubscribe(self._StatusListener, self._mgr.Topic("TelescopeStatusUpdate"))
+        self._isRunning = False
+        self._sentRates = None
+        self._SendUpdate()
+
+    def _SendUpdate(self):
+        pub.sendMessage(
+            self._mgr.Topic("TelescopeEphemerisUpdate"),
+            isRunning=self._isRunning,
+            rates=self._sentRates,
+        )
+
+    # End of Private Helper Methods
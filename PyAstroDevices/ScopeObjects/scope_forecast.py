@@ -0,0 +1,305 @@
+import math
+from time import monotonic
+
+from pubsub import pub
+
+from alpaca.telescope import AlignmentModes, PierSide
+
+
+class TelescopeForecast(object):
+    """
+    Class to contain the times until the next events for the telescope's
+    current pointing. The times are in seconds from the status update that
+    the forecast was made for. A time is NaN if the event cannot be
+    forecast, and infinite if it will not happen, e.g. a circumpolar target
+    never reaches the horizon.
+    """
+
+    def __init__(
+        self,
+        timeToMeridian=float("nan"),
+        timeToFlipLimit=float("nan"),
+        timeToHorizon=float("nan"),
+        timeToRise=float("nan"),
+    ):
+        self._timeToMeridian = timeToMeridian
+        self._timeToFlipLimit = timeToFlipLimit
+        self._timeToHorizon = timeToHorizon
+        self._timeToRise = timeToRise
+
+    @property
+    def TimeToMeridian(self):
+        return self._timeToMeridian
+
+    @property
+    def TimeToFlipLimit(self):
+        return self._timeToFlipLimit
+
+    @property
+    def TimeToHorizon(self):
+        return self._timeToHorizon
+
+    @property
+    def TimeToRise(self):
+        return self._timeToRise
+
+    def ToDict(self):
+        """
+        Get the forecast values, e.g. for sending to another process
+
+        Returns -- a dictionary of the forecast property values
+        """
+        return {
+            "TimeToMeridian": self._timeToMeridian,
+            "TimeToFlipLimit": self._timeToFlipLimit,
+            "TimeToHorizon": self._timeToHorizon,
+            "TimeToRise": self._timeToRise,
+        }
+
+
+class MeridianForecaster(object):
+    """
+    Class to forecast when the telescope's current pointing will cross the
+    meridian, reach the meridian flip limit and set below the horizon.
+
+    The events are found in closed form from the hour angle, declination
+    and site latitude. The hour angle of each event is fixed for a given
+    pointing, so the events are converted to monotonic clock times once,
+    when the pointing changes. Each later status update only subtracts the
+    current time.
+
+    The forecast is sent as a TelescopeForecastUpdate message after each
+    status update, so views and sequences can plan flips without polling
+    the telescope themselves.
+    """
+
+    _SIDEREAL_RATE = 1.00273790935  # sidereal hours per solar hour
+    _POINTING_TOLERANCE = 1.0 / 3600.0  # degrees
+
+    def __init__(self, telescopeManager):
+        """
+        Initializer method for the MeridianForecaster class
+
+        Positional arguments:
+        telescopeManager -- the TelescopeManager of the telescope
+        """
+        self._mgr = telescopeManager
+        self._flipLimit = 0.0
+        self._minimumAltitude = 0.0
+        self._isRunning = False
+        self._forecast = TelescopeForecast()
+        self._pointing = None
+        self._eventTimes = None
+
+    # Start of Public Properties
+
+    @property
+    def Forecast(self):
+        return self._forecast
+
+    @property
+    def FlipLimit(self):
+        # the hour angle past the meridian at which the flip must be made,
+        # in hours
+
+        return self._flipLimit
+
+    @FlipLimit.setter
+    def FlipLimit(self, value):
+        self._flipLimit = value
+        self._pointing = None
+
+    @property
+    def MinimumAltitude(self):
+        # the altitude of the horizon, in degrees
+
+        return self._minimumAltitude
+
+    @MinimumAltitude.setter
+    def MinimumAltitude(self, value):
+        self._minimumAltitude = value
+        self._pointing = None
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def Start(self):
+        """
+        Start forecasting from the telescope's status updates
+        """
+        if self._isRunning:
+            return
+
+        self._pointing = None
+        self._isRunning = True
+        pub.subscribe(self._StatusListener, self._mgr.Topic("TelescopeStatusUpdate"))
+
+    def Stop(self):
+        """
+        Stop forecasting
+        """
+        if not self._isRunning:
+            return
+
+        pub.unsubscribe(self._StatusListener, self._mgr.Topic("TelescopeStatusUpdate"))
+        self._isRunning = False
+        self._forecast = TelescopeForecast()
+
+    def GetEventHourAngles(self, declination, latitude, pierSide, isGem):
+        """
+        Get the hour angles of the events for a pointing
+
+        Positional arguments:
+        declination -- the declination, in degrees
+        latitude    -- the site latitude, in degrees
+        pierSide    -- the telescope's PierSide
+        isGem       -- True for a German equatorial mount
+
+        Returns -- a tuple of the hour angles of the meridian, the flip limit,
+                   setting and rising, in hours. The flip limit is None if
+                   no flip is needed, and setting and rising are None if the
+                   pointing never sets or never rises.
+        """
+        flip = None
+
+        if isGem:
+            # a mount on the west side of the pier becomes counterweight up
+            # when the pointing crosses the meridian, and one on the east
+            # side when it crosses below the pole
+
+            if pierSide == PierSide.pierWest:
+                flip = self._flipLimit
+            elif pierSide == PierSide.pierEast:
+                flip = 12.0 + self._flipLimit
+
+        # the hour angle at which the altitude equals the horizon
+
+        lat = math.radians(latitude)
+        dec = math.radians(declination)
+        denominator = math.cos(lat) * math.cos(dec)
+        setting = None
+        rising = None
+
+        if denominator > 1e-12:
+            cosH = math.sin(math.radians(self._minimumAltitude))
+            cosH = (cosH - math.sin(lat) * math.sin(dec)) / denominator
+
+            if abs(cosH) <= 1.0:
+                setting = math.degrees(math.acos(cosH)) / 15.0
+                rising = -setting
+
+        return 0.0, flip, setting, rising
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _StatusListener(self, sts):
+        # forecast the events for a status update
+
+        parms = self._mgr.Parameters
+
+        if not sts.Connected or parms is None:
+            return
+
+        now = monotonic()
+        hourAngle = sts.HourAngle
+
+        if not (math.isfinite(hourAngle) and math.isfinite(sts.Declination)):
+            self._forecast = TelescopeForecast()
+        elif not math.isfinite(parms.SiteLatitude):
+            self._forecast = TelescopeForecast()
+        else:
+            pointing = (sts.RightAscension, sts.Declination, sts.SideOfPier)
+
+            if self._PointingChanged(pointing):
+                self._pointing = pointing
+                self._eventTimes = self._GetEventTimes(sts, parms, now)
+
+            self._forecast = self._GetForecast(sts, now)
+
+        pub.sendMessage(
+            self._mgr.Topic("TelescopeForecastUpdate"), forecast=self._forecast
+        )
+
+    def _PointingChanged(self, pointing):
+        # check whether the telescope has been moved to a new pointing
+
+        if self._pointing is None:
+            return True
+
+        ra, dec, side = self._pointing
+
+        if side != pointing[2]:
+            return True
+
+        return (
+            abs(ra - pointing[0]) * 15.0 > self._POINTING_TOLERANCE
+            or abs(dec - pointing[1]) > self._POINTING_TOLERANCE
+        )
+
+    def _GetEventTimes(self, sts, parms, now):
+        # convert the event hour angles to monotonic clock times
+
+        isGem = parms.AlignmentMode == AlignmentModes.algGermanPolar
+        angles = self.GetEventHourAngles(
+            sts.Declination, parms.SiteLatitude, sts.SideOfPier, isGem
+        )
+        times = []
+
+        for angle in angles:
+            if angle is None:
+                times.append(None)
+            else:
+                times.append(now + self._TimeToHourAngle(sts.HourAngle, angle))
+
+        return times
+
+    def _GetForecast(self, sts, now):
+        # get the times until the events
+
+        meridian, flip, setting, rising = self._eventTimes
+        remaining = []
+
+        for eventTime in (meridian, flip, setting, rising):
+            remaining.append(math.inf if eventTime is None else eventTime - now)
+
+        timeToMeridian, timeToFlip, timeToSet, timeToRise = remaining
+
+        if not sts.Tracking:
+            # the pointing does not follow the sky
+
+            return TelescopeForecast()
+
+        if sts.IsCounterWeightUp and timeToFlip > 12.0 * 3600.0:
+            # the flip limit has been passed, so the flip is overdue
+
+            timeToFlip = 0.0
+
+        if setting is not None and timeToRise < timeToSet:
+            # the pointing is below the horizon
+
+            timeToSet = 0.0
+
+        if setting is None and not self._IsAboveHorizon(sts):
+            timeToSet = 0.0
+
+        if timeToSet > 0.0:
+            timeToRise = 0.0
+
+        return TelescopeForecast(timeToMeridian, timeToFlip, timeToSet, timeToRise)
+
+    def _IsAboveHorizon(self, sts):
+        # check whether a pointing that neither rises nor sets is up
+
+        return not math.isfinite(sts.Altitude) or sts.Altitude > self._minimumAltitude
+
+    def _TimeToHourAngle(self, hourAngle, target):
+        # the time, in seconds, until the hour angle next reaches the target
+
+        hours = (target - hourAngle) % 24.0
+
+        return hours / self._SIDEREAL_RATE * 3600.0
+
+    # End of Private Helper Methods
@@ -0,0 +1,288 @@
+import select
+import threading as thread
+
+try:
+    import evdev
+    from evdev import ecodes
+except ImportError:
+    # evdev is only available on Linux, where it is an optional package
+
+    evdev = None
+
+from scope_helpers import NudgeDirection, NudgeRates
+from exception_formatter import ExceptionFormatter
+from error_reporter import ErrorReporter
+
+
+class GamepadJog(object):
+    """
+    Class to nudge the telescope from a gamepad, read with evdev on Linux.
+
+    The left stick, or the direction pad, nudges the telescope. Up and down
+    are North and South, and left and right are West and East, as on the
+    nudge buttons. The further the stick is pushed, the faster of the nudge
+    rates is used. The direction pad always uses the slowest rate.
+
+    Every nudge holds a short lease on its axis in the manager's nudge
+    controller. The reader thread renews the leases each time it wakes,
+    which is at least every poll interval, so if the gamepad is unplugged or
+    the thread stops, the axes that it moves are stopped once the leases run
+    out. Nudges on the other axis, e.g. from the nudge buttons, continue.
+    """
+
+    _POLL_INTERVAL = 0.1  # seconds between renewals of the lease
+    _LEASE = 0.5  # seconds that a nudge continues without a renewal
+    _DEAD_ZONE = 0.2  # the stick deflection that is ignored
+
+    def __init__(self, mgr):
+        """
+        Initializer method for the GamepadJog class
+
+        Positional arguments:
+        mgr -- the telescope manager
+        """
+        self._mgr = mgr
+        self._device = None
+        self._readThread = None
+        self._isRunning = False
+        self._nudgeRates = []
+        self._stick = [0.0, 0.0]
+        self._pad = [0, 0]
+        self._commands = [None, None]
+
+    # Start of Public Properties
+
+    @property
+    def IsRunning(self):
+        return self._isRunning
+
+    @property
+    def DeviceName(self):
+        # the name of the gamepad that is being read, or None
+
+        device = self._device
+
+        return None if device is None else device.name
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    @classmethod
+    def IsAvailable(cls):
+        """
+        Returns -- True if the evdev package could be imported
+        """
+        return evdev is not None
+
+    @classmethod
+    def FindGamepads(cls):
+        """
+        Find the input devices that look like gamepads
+
+        Returns -- a list of the device paths
+        """
+        if evdev is None:
+            return []
+
+        paths = []
+
+        for path in evdev.list_devices():
+            try:
+                device = evdev.InputDevice(path)
+            except OSError:
+                # the device cannot be opened by this user
+
+                continue
+
+            if cls._IsGamepad(device):
+                paths.append(path)
+
+            device.close()
+
+        return paths
+
+    def Start(self, path=None):
+        """
+        Start nudging the telescope from a gamepad
+
+        Keyword arguments:
+        path -- the path of the input device, or None to use the first
+                gamepad that is found
+        """
+        if self._isRunning:
+            return
+
+        if evdev is None:
+            msg = "Gamepad input needs the evdev package, which is only "
+            msg += "available on Linux."
+            raise RuntimeError(msg)
+
+        if path is None:
+            paths = self.FindGamepads()
+
+            if len(paths) == 0:
+                raise RuntimeError("No gamepad was found.")
+
+            path = paths[0]
+
+        if not self._mgr.IsConnected:
+            raise RuntimeError("No telescope is connected.")
+
+        caps = self._mgr.Capabilities
+        nudgeRates = NudgeRates.FromAxisRates(caps.PrimaryAxisRates)
+
+        if not nudgeRates:
+            msg = "The telescope does not support MoveAxis for the primary "
+            msg += "and secondary axes."
+            raise RuntimeError(msg)
+
+        self._nudgeRates = sorted(nudgeRates, key=lambda r: r.Rate)
+        self._device = evdev.InputDevice(path)
+        self._stick = [0.0, 0.0]
+        self._pad = [0, 0]
+        self._commands = [None, None]
+        self._isRunning = True
+
+        self._readThread = thread.Thread(
+            target=self._ReadTask, name="GamepadJog", daemon=True
+        )
+        self._readThread.start()
+
+    def Stop(self):
+        """
+        Stop reading the gamepad, and stop any nudge that it started
+        """
+        if not self._isRunning:
+            return
+
+        self._isRunning = False
+
+        if self._readThread is not thread.current_thread():
+            self._readThread.join()
+
+        self._readThread = None
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    @classmethod
+    def _IsGamepad(cls, device):
+        # a gamepad has a stick or a direction pad, and a gamepad button
+
+        events = device.capabilities()
+        axes = events.get(ecodes.EV_ABS, [])
+        axes = [a[0] if isinstance(a, tuple) else a for a in axes]
+        buttons = events.get(ecodes.EV_KEY, [])
+        hasStick = ecodes.ABS_X in axes and ecodes.ABS_Y in axes
+        hasPad = ecodes.ABS_HAT0X in axes and ecodes.ABS_HAT0Y in axes
+
+        return (hasStick or hasPad) and ecodes.BTN_GAMEPAD in buttons
+
+    def _ReadTask(self):
+        # read the gamepad events and nudge the telescope until stopped
+
+        device = self._device
+
+        try:
+            while self._isRunning:
+                ready, _, _ = select.select([device.fd], [], [], self._POLL_INTERVAL)
+
+                if ready:
+                    for event in device.read():
+                        self._ReadEvent(device, event)
+
+                self._UpdateNudges()
+        except Exception as xcp:
+            if self._isRunning:
+                self._isRunning = False
+                msg = "Nudging from the gamepad was stopped. "
+                msg += "Details follow:\r\n\r\n"
+                msg += ExceptionFormatter.GetInstance().Format(xcp)
+                ErrorReporter.GetInstance().Report("Gamepad Error", msg, xcp)
+        finally:
+            self._StopNudges()
+            self._device = None
+            device.close()
+
+    def _ReadEvent(self, device, event):
+        # keep the position of the stick or the direction pad
+
+        if event.type != ecodes.EV_ABS:
+            return
+
+        if event.code in (ecodes.ABS_X, ecodes.ABS_Y):
+            index = 0 if event.code == ecodes.ABS_X else 1
+            info = device.absinfo(event.code)
+            middle = (info.max + info.min) / 2.0
+            value = (event.value - middle) / max((info.max - info.min) / 2.0, 1.0)
+            self._stick[index] = max(-1.0, min(1.0, value))
+        elif event.code in (ecodes.ABS_HAT0X, ecodes.ABS_HAT0Y):
+            index = 0 if event.code == ecodes.ABS_HAT0X else 1
+            self._pad[index] = event.value
+
+    def _UpdateNudges(self):
+        # send the nudges for the stick or the direction pad, and renew
+        # the lease while the telescope is being nudged
+
+        axes = (
+            (NudgeDirection.East, NudgeDirection.West),
+            (NudgeDirection.South, NudgeDirection.North),
+        )
+
+        for index, (positive, negative) in enumerate(axes):
+            command = self._GetCommand(
+                self._stick[index], self._pad[index], positive, negative
+            )
+
+            if command == self._commands[index]:
+                continue
+
+            if command is None:
+                direction = self._commands[index][0]
+                self._mgr.StopNudgeScope(direction)
+            else:
+                self._mgr.StartNudgeScope(*command, lease=self._LEASE)
+
+            self._commands[index] = command
+
+        directions = [c[0] for c in self._commands if c is not None]
+
+        if directions:
+            self._mgr.KeepNudgeAlive(directions, self._LEASE)
+
+    def _GetCommand(self, stick, pad, positive, negative):
+        # get the direction and rate for one axis, or None to stop. The
+        # evdev axes increase to the right and downwards.
+
+        if pad != 0:
+            direction = positive if pad > 0 else negative
+
+            return direction, self._nudgeRates[0].Rate
+
+        if abs(stick) < self._DEAD_ZONE:
+            return None
+
+        direction = positive if stick > 0 else negative
+        deflection = (abs(stick) - self._DEAD_ZONE) / (1.0 - self._DEAD_ZONE)
+        count = len(self._nudgeRates)
+        ndx = min(int(deflection * count), count - 1)
+
+        return direction, self._nudgeRates[ndx].Rate
+
+    def _StopNudges(self):
+        # stop the nudges that the gamepad started, and only those
+
+        commands = [c for c in self._commands if c is not None]
+        self._commands = [None, None]
+
+        try:
+            for direction, _ in commands:
+                self._mgr.StopNudgeScope(direction)
+        except Exception:
+            # the telescope has been disconnected
+
+            pass
+
+    # End of Private Helper Methods
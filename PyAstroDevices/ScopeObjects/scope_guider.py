@@ -0,0 +1,522 @@
+import os
+import socket
+import threading as thread
+from collections import deque
+from time import monotonic, sleep
+
+from pubsub import pub
+
+from alpaca.telescope import GuideDirections
+from alpaca.exceptions import InvalidOperationException
+
+from exception_formatter import ExceptionFormatter
+from error_reporter import ErrorReporter
+
+
+class PulseGuider(object):
+    """
+    Class to send guiding corrections to the telescope as pulse guide
+    commands.
+
+    Corrections are submitted as signed pulse durations for each axis, in
+    milliseconds. A positive RA correction is a pulse to the east and a
+    positive Dec correction is a pulse to the north. Each axis has its own
+    worker thread. Corrections that arrive while an axis is still pulsing
+    are added together, so the next pulse carries their net effect and a
+    guide cadence that is faster than the mount never builds a backlog.
+
+    The two axes are pulsed at the same time unless the driver refuses, in
+    which case the guider falls back to pulsing one axis at a time.
+
+    The delay between the submission of a correction and the start of its
+    pulse, and the time that each pulse takes beyond its duration, are kept
+    for the most recent pulses. A TelescopeGuidePulse message is sent after
+    each pulse.
+    """
+
+    RA = 0
+    DEC = 1
+
+    _MAXIMUM_PULSE = 5000  # milliseconds
+    _HISTORY_LENGTH = 200  # pulses
+    _COMPLETION_TIMEOUT = 1.0  # seconds past the pulse duration
+    _COMPLETION_POLL_INTERVAL = 0.01  # seconds
+
+    def __init__(self, telescopeManager):
+        """
+        Initializer method for the PulseGuider class
+
+        Positional arguments:
+        telescopeManager -- the TelescopeManager of the telescope
+        """
+        self._mgr = telescopeManager
+        self._condition = thread.Condition()
+        self._pending = [0.0, 0.0]
+        self._submitTimes = [None, None]
+        self._active = [False, False]
+        self._isConcurrent = True
+        self._isRunning = False
+        self._workers = []
+        self._maximumPulse = self._MAXIMUM_PULSE
+        self._history = deque(maxlen=self._HISTORY_LENGTH)
+        self._mergedCount = 0
+
+    # Start of Public Properties
+
+    @property
+    def IsRunning(self):
+        return self._isRunning
+
+    @property
+    def IsConcurrent(self):
+        # False once the driver has refused to pulse both axes at once
+
+        return self._isConcurrent
+
+    @property
+    def MaximumPulse(self):
+        # the longest pulse that is sent, in milliseconds. Longer merged
+        # corrections are cut to this length.
+
+        return self._maximumPulse
+
+    @MaximumPulse.setter
+    def MaximumPulse(self, value):
+        self._maximumPulse = value
+
+    @property
+    def PulseCount(self):
+        return len(self._history)
+
+    @property
+    def MergedCount(self):
+        # the number of corrections that were merged into a later pulse
+
+        return self._mergedCount
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def Start(self):
+        """
+        Start the axis workers, so that corrections can be submitted
+        """
+        if self._isRunning:
+            return
+
+        caps = self._mgr.Capabilities
+
+        if caps is None or not caps.CanPulseGuide:
+            msg = "PulseGuider.Start was called for a telescope that cannot "
+            msg += "pulse guide."
+            raise InvalidOperationException(msg)
+
+        with self._condition:
+            self._pending = [0.0, 0.0]
+            self._submitTimes = [None, None]
+            self._active = [False, False]
+            self._isRunning = True
+
+        self._isConcurrent = True
+        self._mergedCount = 0
+        self._history.clear()
+        self._workers = [
+            thread.Thread(target=self._AxisTask, args=(axis,), name=name, daemon=True)
+            for axis, name in ((self.RA, "GuideRA"), (self.DEC, "GuideDec"))
+        ]
+
+        for worker in self._workers:
+            worker.start()
+
+    def Stop(self):
+        """
+        Stop the axis workers, discarding any corrections that have not been
+        sent. A pulse that is in progress is allowed to finish.
+        """
+        if not self._isRunning:
+            return
+
+        with self._condition:
+            self._isRunning = False
+            self._condition.notify_all()
+
+        for worker in self._workers:
+            if worker is not thread.current_thread():
+                worker.join()
+
+        self._workers = []
+
+    def Submit(self, raDuration, decDuration):
+        """
+        Submit a guiding correction
+
+        Positional arguments:
+        raDuration  -- the RA pulse, in milliseconds. Positive is east.
+        decDuration -- the Dec pulse, in milliseconds. Positive is north.
+        """
+        if not self._isRunning:
+            msg = "PulseGuider.Submit was called when the guider is not "
+            msg += "running."
+            raise InvalidOperationException(msg)
+
+        now = monotonic()
+
+        with self._condition:
+            for axis, duration in ((self.RA, raDuration), (self.DEC, decDuration)):
+                if duration == 0:
+                    continue
+
+                if self._pending[axis] != 0.0:
+                    self._mergedCount += 1
+
+                self._pending[axis] += duration
+
+                # measure the latency from the oldest unsent correction
+
+                if self._pending[axis] == 0.0:
+                    self._submitTimes[axis] = None
+                elif self._submitTimes[axis] is None:
+                    self._submitTimes[axis] = now
+
+            self._condition.notify_all()
+
+    def GetLatencyStatistics(self):
+        """
+        Get the latency statistics of the most recent pulses
+
+        Returns -- a dictionary with the number of pulses, and the mean and
+                   largest command latency and completion overhead, in
+                   seconds. The command latency is from the submission of a
+                   correction to the start of its pulse. The completion
+                   overhead is the time that a pulse took beyond its
+                   duration.
+        """
+        history = list(self._history)
+        count = len(history)
+        stats = {"Count": count}
+
+        for index, name in ((2, "CommandLatency"), (3, "CompletionOverhead")):
+            values = [h[index] for h in history]
+            stats[f"Mean{name}"] = sum(values) / count if count else float("nan")
+            stats[f"Max{name}"] = max(values) if count else float("nan")
+
+        return stats
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _AxisTask(self, axis):
+        # send the pulses for one axis until the guider is stopped
+
+        other = self.DEC if axis == self.RA else self.RA
+
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: not self._isRunning
+                    or (
+                        self._pending[axis] != 0.0
+                        and (self._isConcurrent or not self._active[other])
+                    )
+                )
+
+                if not self._isRunning:
+                    return
+
+                correction = self._pending[axis]
+                submitTime = self._submitTimes[axis]
+                self._pending[axis] = 0.0
+                self._submitTimes[axis] = None
+                self._active[axis] = True
+
+            try:
+                record = self._Pulse(axis, correction, submitTime)
+            except InvalidOperationException as xcp:
+                if not self._RetrySerially(axis, other, correction, submitTime):
+                    self._Fail(axis, xcp)
+
+                    return
+
+                continue
+            except Exception as xcp:
+                self._Fail(axis, xcp)
+
+                return
+
+            with self._condition:
+                self._active[axis] = False
+                self._condition.notify_all()
+
+            self._history.append(record)
+            pub.sendMessage(
+                self._mgr.Topic("TelescopeGuidePulse"),
+                direction=record[0],
+                duration=record[1],
+                latency=record[2],
+            )
+
+    def _Pulse(self, axis, correction, submitTime):
+        # send one pulse and wait for it to finish
+
+        if axis == self.RA:
+            direction = GuideDirections.guideEast
+            if correction < 0.0:
+                direction = GuideDirections.guideWest
+        else:
+            direction = GuideDirections.guideNorth
+            if correction < 0.0:
+                direction = GuideDirections.guideSouth
+
+        duration = int(round(min(abs(correction), self._maximumPulse)))
+        startTime = monotonic()
+        self._mgr.PulseGuide(direction, duration)
+        endTime = self._WaitForPulse(axis, startTime, duration)
+
+        overhead = max(0.0, endTime - startTime - duration / 1000.0)
+
+        return direction, duration, startTime - submitTime, overhead
+
+    def _WaitForPulse(self, axis, startTime, duration):
+        # wait for a pulse to finish. A driver whose PulseGuide returns
+        # before the pulse ends is asked when it has finished, unless the
+        # other axis is also pulsing, when the answer would not tell which
+        # pulse is guiding.
+
+        endTime = startTime + duration / 1000.0
+        now = monotonic()
+
+        if now >= endTime:
+            # the driver waited for the pulse to finish
+
+            return now
+
+        sleep(endTime - now)
+        deadline = endTime + self._COMPLETION_TIMEOUT
+
+        while monotonic() < deadline:
+            with self._condition:
+                otherActive = self._active[self.DEC if axis == self.RA else self.RA]
+
+            if otherActive or not self._mgr.GetIsPulseGuiding():
+                break
+
+            sleep(self._COMPLETION_POLL_INTERVAL)
+
+        return monotonic()
+
+    def _RetrySerially(self, axis, other, correction, submitTime):
+        # the driver refused a pulse. If the other axis was pulsing, pulse
+        # one axis at a time from now on and try the correction again.
+
+        with self._condition:
+            self._active[axis] = False
+
+            if not self._isConcurrent or not self._active[other]:
+                return False
+
+            self._isConcurrent = False
+            self._pending[axis] += correction
+            self._submitTimes[axis] = submitTime
+            self._condition.notify_all()
+
+        return True
+
+    def _Fail(self, axis, xcp):
+        # stop guiding after an error and report it
+
+        with self._condition:
+            self._active[axis] = False
+            self._isRunning = False
+            self._condition.notify_all()
+
+        msg = "Guiding was stopped because a guide pulse could not be sent "
+        msg += "to the telescope. Details follow:\r\n\r\n"
+        msg += ExceptionFormatter.GetInstance().Format(xcp)
+        ErrorReporter.GetInstance().Report("Guiding Error", msg, xcp)
+
+    # End of Private Helper Methods
+
+
+class GuideFeed(object):
+    """
+    Class to read guiding corrections from another program and submit them
+    to a PulseGuider.
+
+    Each correction is a line of text with the RA and Dec pulse durations,
+    in milliseconds, separated by spaces or a comma, e.g. "120 -40". Lines
+    that start with # are ignored. The corrections are read either from UDP
+    datagrams on the loopback interface, or from lines that are appended to
+    a file.
+    """
+
+    _POLL_INTERVAL = 0.05  # seconds
+
+    def __init__(self, guider):
+        """
+        Initializer method for the GuideFeed class
+
+        Positional arguments:
+        guider -- the PulseGuider to submit the corrections to
+        """
+        self._guider = guider
+        self._isRunning = False
+        self._feedThread = None
+        self._socket = None
+        self._port = None
+        self._badLineCount = 0
+
+    # Start of Public Properties
+
+    @property
+    def IsRunning(self):
+        return self._isRunning
+
+    @property
+    def Port(self):
+        return self._port
+
+    @property
+    def BadLineCount(self):
+        return self._badLineCount
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def StartSocket(self, port):
+        """
+        Start reading corrections from UDP datagrams
+
+        Positional arguments:
+        port -- the UDP port on the loopback interface, or 0 to have the
+                system choose one
+
+        Returns -- the port number that is being listened on
+        """
+        if self._isRunning:
+            return self._port
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind(("127.0.0.1", port))
+        self._socket.settimeout(self._POLL_INTERVAL)
+        self._port = self._socket.getsockname()[1]
+        self._StartThread(self._SocketTask)
+
+        return self._port
+
+    def StartFile(self, filename, fromStart=False):
+        """
+        Start reading corrections from the lines that are appended to a
+        file
+
+        Positional arguments:
+        filename  -- the name of the file
+
+        Keyword arguments:
+        fromStart -- if True, also submit the lines already in the file
+        """
+        if self._isRunning:
+            return
+
+        f = open(filename)
+
+        if not fromStart:
+            f.seek(0, os.SEEK_END)
+
+        self._StartThread(self._FileTask, f)
+
+    def Stop(self):
+        """
+        Stop reading corrections
+        """
+        if self._feedThread is None:
+            return
+
+        self._isRunning = False
+        self._feedThread.join()
+        self._feedThread = None
+
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            self._port = None
+
+    def SubmitLine(self, line):
+        """
+        Submit the correction in one line of text
+
+        Positional arguments:
+        line -- the line
+
+        Returns -- True if the line held a correction
+        """
+        line = line.strip()
+
+        if line == "" or line.startswith("#"):
+            return False
+
+        try:
+            fields = line.replace(",", " ").split()
+            raDuration = float(fields[0])
+            decDuration = float(fields[1])
+        except (IndexError, ValueError):
+            self._badLineCount += 1
+
+            return False
+
+        self._guider.Submit(raDuration, decDuration)
+
+        return True
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _StartThread(self, target, *args):
+        self._badLineCount = 0
+        self._isRunning = True
+        self._feedThread = thread.Thread(
+            target=target, args=args, name="GuideFeed", daemon=True
+        )
+        self._feedThread.start()
+
+    def _SocketTask(self):
+        # read the datagrams until stopped
+
+        while self._isRunning and self._guider.IsRunning:
+            try:
+                data, _ = self._socket.recvfrom(4096)
+            except socket.timeout:
+                continue
+
+            for line in data.decode("utf-8", "replace").splitlines():
+                self.SubmitLine(line)
+
+        self._isRunning = False
+
+    def _FileTask(self, f):
+        # read the lines as they are appended to the file until stopped
+
+        partial = ""
+
+        with f:
+            while self._isRunning and self._guider.IsRunning:
+                text = f.readline()
+
+                if text == "":
+                    sleep(self._POLL_INTERVAL)
+                    continue
+
+                # a line that is still being written is kept until it ends
+
+                partial += text
+
+                if partial.endswith("\n"):
+                    self.SubmitLine(partial)
+                    partial = ""
+
+        self._isRunning = False
+
+    # End of Private Helper Methods
@@ -1,3 +1,4 @@
+import re
 import math
 import locale
 from enum import Enum
@@ -342,6 +343,31 @@ class Formatter:
 
         return f'{degrees*sign:.0f}{chr(176)} {minutes:.0f}\' {seconds:.0f}"'
 
+    @staticmethod
+    def ParseSexagesimal(text: str):
+        """
+        Convert a string in sexagesimal form, such as 05:35:17.3, -05 23 28
+        or 5h 35m 17s, or a plain decimal string, to a floating point value
+
+        Positional arguments:
+        text -- the string to be converted
+
+        Returns -- the value, in the units of the first field
+        """
+        text = text.strip()
+        sign = -1.0 if text.startswith("-") else 1.0
+        fields = re.findall(r"\d+(?:\.\d*)?|\.\d+", text)
+
+        if len(fields) == 0:
+            raise ValueError(f"'{text}' is not a valid sexagesimal value.")
+
+        value = 0.0
+
+        for n, field in enumerate(fields[:3]):
+            value += float(field) / (60.0**n)
+
+        return sign * value
+
 class Validator:
     @staticmethod
     def InRange(fValue, fMinValue, bMinEqual, fMaxValue, bMaxEqual):
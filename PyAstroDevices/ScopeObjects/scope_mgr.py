@@ -1,7 +1,6 @@
 import math
 import copy
-import threading as thread
-from tkinter import messagebox
+from time import monotonic
 
 from pubsub import pub
 
@@ -12,42 +11,96 @@ from scope_capabilities import TelescopeCapabilities
 from scope_parameters import TelescopeParameters
 from scope_status import TelescopeStatus
 from scope_helpers import SlewDirection, NudgeDirection
+from scope_slew_monitor import SlewMonitor
+from scope_forecast import MeridianForecaster
+from scope_ephemeris import EphemerisTracker
+from scope_guider import PulseGuider
+from scope_nudge_controller import NudgeController
+from scope_pointing_model import PointingModel
+from scope_slew_estimator import SlewTimeEstimator
+from scope_slew_limits import SlewLimits
+from scope_transforms import CoordinateTransform
 from exception_formatter import ExceptionFormatter
+from error_reporter import ErrorReporter
+from device_mgr import DeviceManager
+from app_settings import ApplicationSettings
+from connection_pool import AlpacaConnectionPool
 
 
-class TelescopeManager:
+class TelescopeManager(DeviceManager):
     """
     This class manages communication with the selected telescope driver. All
     the views call through this class to issue commands to the driver. This
     class also handles periodic polling of the telescope.
     """
 
-    _POLLING_INTERVAL_FAST = 1.0  # once per second
-    _POLLING_INTERVAL_NORMAL = 5.0  # every 5 seconds
-    _POLLING_INTERVAL_SLOW = 10.0  # every 10 seconds
+    _STATUS_TOPIC = "TelescopeStatusUpdate"
+    _POLLING_EXCEPTION_TOPIC = "TelescopePollingException"
+    _TARGET_PROBE_POLLS = 12  # polls between attempts to read an unset target
 
-    def __init__(self):
+    def __init__(self, deviceId=None):
         # Initialize the instance level variables
+        #
+        # deviceId -- the ID that identifies this telescope's messages when
+        #             more than one telescope is in use
+
+        super().__init__(deviceId)
 
-        self._id = None
         self._telescope = None
-        self._isConnected = False
-        self._isPolling = False
-        self._stopPolling = False
-        self._pollingThread = None
+        self._address = None
+        self._protocol = None
         self._capabilities = None
         self._parameters = None
         self._connectError = None
         self._connectException = None
 
+        # the status properties that are not to be read until they are
+        # known to be available, and the target coordinates that have not
+        # been set
+
+        self._unsupported = set()
+        self._targetsNotSet = set()
+        self._wasSlewing = False
+        self._pollsSinceProbe = 0
+
+        # the futures for the motions that have been started
+
+        self._slewMonitor = SlewMonitor()
+
+        # the forecast of the meridian flip and horizon crossing times
+
+        self._forecaster = MeridianForecaster(self)
+
+        # the slew times, learned from the slews that have been seen
+
+        self._slewEstimator = SlewTimeEstimator(self)
+
+        # the tracking rate offsets that follow a comet or an asteroid
+
+        self._ephemerisTracker = EphemerisTracker(self)
+
+        # the pipeline that sends guiding corrections as guide pulses
+
+        self._guider = PulseGuider(self)
+
+        # the worker that sends the MoveAxis commands for nudges
+
+        self._nudgeController = NudgeController(
+            self._MoveAxis, self._InterruptPollingSleep
+        )
+
+        # the model of the pointing errors, fitted from the sync points
+
+        self._pointingModel = PointingModel()
+
+        # the limits that slew targets are checked against
+
+        self._slewLimits = SlewLimits()
+
         self._SetSlewDirections()
 
     # Start of Public Properties
 
-    @property
-    def ID(self):
-        return self._id
-
     @property
     def IsConnected(self):
         return self._isConnected
@@ -72,6 +125,41 @@ class TelescopeManager:
     def SlewDirections(self):
         return copy.copy(self._slewDirections)
 
+    @property
+    def IsBusy(self):
+        # True while a motion that was started by this manager has not
+        # finished
+
+        return self._slewMonitor.IsBusy
+
+    @property
+    def Forecaster(self):
+        return self._forecaster
+
+    @property
+    def SlewEstimator(self):
+        return self._slewEstimator
+
+    @property
+    def EphemerisTracker(self):
+        return self._ephemerisTracker
+
+    @property
+    def NudgeController(self):
+        return self._nudgeController
+
+    @property
+    def Guider(self):
+        return self._guider
+
+    @property
+    def PointingModel(self):
+        return self._pointingModel
+
+    @property
+    def SlewLimits(self):
+        return self._slewLimits
+
     # End of Public Properties
 
     # Start of Public Methods
@@ -95,7 +183,15 @@ class TelescopeManager:
         try:
             if self._telescope is None:
                 self._telescope = Telescope(address, deviceNumber, protocol)
-                # _id = (address, deviceNumber, protocol)
+
+                # share the HTTP connections with any other devices on the
+                # same Alpaca server
+
+                AlpacaConnectionPool.GetInstance().Attach(
+                    self._telescope, address, protocol
+                )
+                self._address = address
+                self._protocol = protocol
         except Exception as e:
             self._connectError = "Unable to create the telescope object."
             self._connectException = e
@@ -123,7 +219,9 @@ class TelescopeManager:
                 possibleError = "Unable to determine the telescope's "
                 possibleError += "capabilities"
                 self._capabilities = TelescopeCapabilities(self._telescope)
-                pub.sendMessage("TelescopeCapabilitiesUpdate", caps=self._capabilities)
+                pub.sendMessage(
+                    self.Topic("TelescopeCapabilitiesUpdate"), caps=self._capabilities
+                )
 
                 possibleError = "Unable to determine the telescope's "
                 possibleError += "configuration parameters"
@@ -136,7 +234,26 @@ class TelescopeManager:
                 possibleError = "Unable to set the slew directions"
                 self._SetSlewDirections()
 
-                pub.sendMessage("TelescopeParametersUpdate", parms=self._parameters)
+                possibleError = "Unable to read the slew limits"
+                self._slewLimits = self._CreateSlewLimits()
+
+                possibleError = "Unable to read the pointing model"
+                self._pointingModel = self._CreatePointingModel()
+
+                pub.sendMessage(
+                    self.Topic("TelescopeParametersUpdate"), parms=self._parameters
+                )
+
+                # the target coordinates cannot be read until they have
+                # been set, which is learned from the first attempt
+
+                self._unsupported = set()
+                self._targetsNotSet = set()
+                self._wasSlewing = False
+                self._pollsSinceProbe = 0
+                self._forecaster.Start()
+                self._slewEstimator.Start()
+                self._nudgeController.Start()
 
                 possibleError = "Unable to start the device polling."
                 self._StartDevicePolling()
@@ -153,7 +270,7 @@ class TelescopeManager:
 
     def Disconnect(self):
         """
-        This method stops the polling thread, sets the scope's Connected
+        This method stops the device polling, sets the scope's Connected
         property to False, initializes the Parameters, Capabilities, and
         Status objects to their initialized state and sends them to any
         subscribers (the views).
@@ -163,31 +280,36 @@ class TelescopeManager:
             msg += "has been created."
             raise InvalidOperationException(msg)
 
-        if self._pollingThread is not None:
-            self._stopPolling = True
-            self._InterruptPollingSleep()
-            self._pollingThread.join()
+        # clear the ephemeris rates, if the driver can still be reached
+
+        try:
+            self._ephemerisTracker.Stop()
+        except Exception:
+            pass
+
+        self._guider.Stop()
+        self._nudgeController.Stop()
+        self._StopDevicePolling()
+        self._slewMonitor.CancelAll()
+        self._forecaster.Stop()
+        self._slewEstimator.Stop()
 
         self._telescope.Connected = False
         self._isConnected = False
         self._telescope = None
+        AlpacaConnectionPool.GetInstance().Release(self._address, self._protocol)
 
         self._status = TelescopeStatus()
-        pub.sendMessage("TelescopeStatusUpdate", sts=self._status)
+        pub.sendMessage(self.Topic("TelescopeStatusUpdate"), sts=self._status)
 
         self._capabilities = TelescopeCapabilities()
-        pub.sendMessage("TelescopeCapabilitiesUpdate", caps=self._capabilities)
+        pub.sendMessage(
+            self.Topic("TelescopeCapabilitiesUpdate"), caps=self._capabilities
+        )
 
-        self._parameters = TelescopeParameters()
+        self._parameters = TelescopeParameters(deviceId=self._id)
         self._SetSlewDirections()
-        pub.sendMessage("TelescopeParametersUpdate", parms=self._parameters)
- 
-    def ImmediateStatusUpdate(self):
-        """
-        Wake the polling loop to cause an immediate status update to occur.
-        """
-        if self._telescope is not None and self._isConnected:
-            self._InterruptPollingSleep()
+        pub.sendMessage(self.Topic("TelescopeParametersUpdate"), parms=self._parameters)
 
     def SetTracking(self, tracking):
         """
@@ -201,9 +323,15 @@ class TelescopeManager:
                 self._telescope.Tracking = tracking
                 self._InterruptPollingSleep()
 
-    def SlewToPark(self):
+    def SlewToPark(self, timeout=None):
         """
         Park the telescope
+
+        Keyword arguments:
+        timeout -- the longest time that parking may take, in seconds
+
+        Returns -- a Future that is resolved when the telescope is parked,
+                   or None if not connected
         """
         if self._telescope is not None and self._isConnected:
             if self._telescope.Slewing:
@@ -211,8 +339,13 @@ class TelescopeManager:
                 msg += "telescope was already slewing."
                 raise InvalidOperationException(msg)
             self._telescope.Park()
+            future = self._slewMonitor.Add(SlewMonitor.PARK, timeout)
             self._InterruptPollingSleep()
 
+            return future
+
+        return None
+
     def SetUnparkedState(self):
         """
         Unpark the telescope
@@ -298,7 +431,7 @@ class TelescopeManager:
         if forceUpdate:
             self.ImmediateStatusUpdate()
 
-    def StartNudgeScope(self, direction, rate):
+    def StartNudgeScope(self, direction, rate, lease=None):
         """
         Start a nudge operation
 
@@ -306,21 +439,27 @@ class TelescopeManager:
         direction -- the nudge direction (member of the NudgeRates
                                 enumeration)
         rate	  -- the requested nudge rate, in degrees per second
+
+        Keyword arguments:
+        lease     -- the number of seconds that the nudge continues unless
+                     it is renewed with KeepNudgeAlive, or None to continue
+                     until it is stopped
         """
         if self._telescope is None or not self._isConnected:
             msg = "TelescopeManager.StartNudgeScope() was called when no "
             msg += "Telescope is connected."
             raise InvalidOperationException(msg)
 
-        if self._telescope.Slewing:
+        # use the cached status and capabilities, rather than asking the
+        # driver on every button press
+
+        if self._status is not None and self._status.Slewing:
             msg = "TelescopeManager is unable to call MoveAxis() when the "
-            msg = "telescope is slewing"
+            msg += "telescope is slewing"
             raise InvalidOperationException(msg)
 
-        if self._telescope.CanMoveAxis(
-            TelescopeAxes.axisPrimary
-        ) and self._telescope.CanMoveAxis(TelescopeAxes.axisSecondary):
-            self._StartNudgeMoveAxis(direction, rate)
+        if self._CanNudge():
+            self._StartNudgeMoveAxis(direction, rate, lease)
         else:
             msg = "The telescope does not support MoveAxis for the primary "
             msg += "and secondary axes."
@@ -338,18 +477,66 @@ class TelescopeManager:
             msg += "Telescope is connected."
             raise InvalidOperationException(msg)
 
-        if self._telescope.CanMoveAxis(
-            TelescopeAxes.axisPrimary
-        ) and self._telescope.CanMoveAxis(TelescopeAxes.axisSecondary):
+        if self._CanNudge():
             self._StopNudgeMoveAxis(direction)
 
-    def SlewToCoordinatesAsync(self, ra, dec):
+    def KeepNudgeAlive(self, directions, lease):
+        """
+        Renew the leases of nudges that were started with a lease. The
+        nudges on other axes are not affected.
+
+        Positional arguments:
+        directions -- the directions of the nudges to renew
+        lease      -- the number of seconds that the nudges continue from now
+        """
+        axes = [self._GetNudgeAxis(d) for d in directions]
+        self._nudgeController.KeepAlive(lease, [a for a in axes if a is not None])
+
+    def PulseGuide(self, direction, duration):
+        """
+        Move the telescope in a direction for a time, at the guide rate
+
+        Positional arguments:
+        direction -- the direction (member of the GuideDirections
+                     enumeration)
+        duration  -- the length of the pulse, in milliseconds
+        """
+        if self._telescope is None or not self._isConnected:
+            msg = "TelescopeManager.PulseGuide() was called when no "
+            msg += "Telescope is connected."
+            raise InvalidOperationException(msg)
+
+        if not self._capabilities.CanPulseGuide:
+            msg = "The telescope does not support PulseGuide."
+            raise InvalidOperationException(msg)
+
+        self._telescope.PulseGuide(direction, duration)
+
+    def GetIsPulseGuiding(self):
+        """
+        Read whether a guide pulse is in progress, directly from the driver
+        rather than from the last status update
+
+        Returns -- True if the telescope is pulse guiding
+        """
+        if self._telescope is None or not self._isConnected:
+            return False
+
+        return self._telescope.IsPulseGuiding
+
+    def SlewToCoordinatesAsync(self, ra, dec, timeout=None):
         """
         Perform an asynchronous slew to the requested equatorial coordinates
 
         Positional arguments:
-        ra  -- the destination right ascension
-        dec -- the destination declination
+        ra      -- the destination right ascension
+        dec     -- the destination declination
+
+        Keyword arguments:
+        timeout -- the longest time that the slew may take, in seconds
+
+        Returns -- a Future that is resolved when the slew has finished, or
+                   None if not connected
         """
         if self._telescope is not None and self._isConnected:
             if self._telescope.Slewing:
@@ -357,16 +544,102 @@ class TelescopeManager:
                 msg += "slew while the telescope is already slewing."
                 raise InvalidOperationException(msg)
 
-            self._telescope.SlewToCoordinatesAsync(ra, dec)
+            lst = self._telescope.SiderealTime
+
+            # reject a target outside the limits before the driver sees it
+
+            reason = self._slewLimits.Validate(ra, dec, lst)
+
+            if reason is not None:
+                raise InvalidValueException(reason)
+
+            # aim the mount so that it corrects its known pointing errors
+
+            mountRa, mountDec = ra, dec
+
+            if self._pointingModel.IsActive:
+                pierSide = self._GetDestinationPierSide(lst - ra)
+                mountRa, mountDec = self._pointingModel.SkyToMount(
+                    ra, dec, lst, pierSide
+                )
+
+            self._telescope.SlewToCoordinatesAsync(mountRa, mountDec)
+            self._slewEstimator.SlewStarted(ra, dec)
+            future = self._slewMonitor.Add(SlewMonitor.SLEW, timeout)
+            self._TargetWasSet()
             self.ImmediateStatusUpdate()
 
-    def SlewToAltAzAsync(self, az, alt):
+            return future
+
+        return None
+
+    def SyncToCoordinates(self, ra, dec):
+        """
+        Tell the telescope that it is pointing at the given coordinates,
+        e.g. after centering a known object. While the pointing model is
+        enabled, the position is added to the model as a sync point and
+        the driver is not synced; otherwise the driver is synced.
+
+        Positional arguments:
+        ra  -- the true right ascension of the telescope's position
+        dec -- the true declination of the telescope's position
+        """
+        if self._telescope is None or not self._isConnected:
+            return
+
+        if self._pointingModel.IsEnabled:
+            self._pointingModel.AddPoint(
+                self._telescope.RightAscension,
+                self._telescope.Declination,
+                ra,
+                dec,
+                self._telescope.SiderealTime,
+                self._telescope.SideOfPier,
+            )
+            self._StorePointingModel()
+        elif self._capabilities.CanSync:
+            self._telescope.SyncToCoordinates(ra, dec)
+        else:
+            msg = "TelescopeManager.SyncToCoordinates cannot sync a "
+            msg += "telescope that does not support syncing."
+            raise InvalidOperationException(msg)
+
+        self.ImmediateStatusUpdate()
+
+    def SetPointingModelEnabled(self, isEnabled):
+        """
+        Turn the pointing model on or off. While it is off, slews are not
+        corrected and syncs are sent to the driver, but the sync points are
+        kept.
+
+        Positional arguments:
+        isEnabled -- True to correct the pointing with the model
+        """
+        self._pointingModel.IsEnabled = isEnabled
+        self._StorePointingModel()
+        self.ImmediateStatusUpdate()
+
+    def ClearPointingModel(self):
+        """
+        Discard the sync points of the pointing model
+        """
+        self._pointingModel.ClearPoints()
+        self._StorePointingModel()
+        self.ImmediateStatusUpdate()
+
+    def SlewToAltAzAsync(self, az, alt, timeout=None):
         """
         Perform an asynchronous slew to the requested terrestrial coordinates
 
         Positional arguments:
-        az  -- the destination azimuth
-        alt -- the destination altitude
+        az      -- the destination azimuth
+        alt     -- the destination altitude
+
+        Keyword arguments:
+        timeout -- the longest time that the slew may take, in seconds
+
+        Returns -- a Future that is resolved when the slew has finished, or
+                   None if not connected
         """
         if self._telescope is not None and self._isConnected:
             if self._telescope.Slewing:
@@ -374,12 +647,23 @@ class TelescopeManager:
                 msg += "while the telescope is already slewing."
                 raise InvalidOperationException(msg)
 
+            reason = self._slewLimits.ValidateAltAz(az, alt)
+
+            if reason is not None:
+                raise InvalidValueException(reason)
+
             self._telescope.SlewToAltAzAsync(az, alt)
+            future = self._slewMonitor.Add(SlewMonitor.SLEW, timeout)
             self.ImmediateStatusUpdate()
 
+            return future
+
+        return None
+
     def AbortSlew(self):
         """
-        Abort any asynchronous slew and resume tracking, if enabled
+        Abort any asynchronous slew and resume tracking, if enabled. The
+        futures of any motions in progress are cancelled.
         """
         if self._telescope is None or not self._isConnected:
             return
@@ -387,6 +671,9 @@ class TelescopeManager:
         if self._telescope.Slewing:
             self._telescope.AbortSlew()
 
+        self._slewMonitor.CancelAll()
+        self.ImmediateStatusUpdate()
+
     def StartMeridianFlip(self):
         """
         Flip a GEM to the other side of the meridian, if in a counterweight
@@ -417,12 +704,24 @@ class TelescopeManager:
             if newSide != PierSide.pierUnknown:
                 self._telescope.SideOfPier = newSide
         else:
-            # Slew to the same coordinates to do the flip
+            # Slew to the same coordinates to do the flip. The pointing
+            # errors change with the side of the pier, so aim for the
+            # same position on the sky.
 
             ra = self._telescope.RightAscension
             dec = self._telescope.Declination
 
+            if self._pointingModel.IsActive:
+                lst = self._telescope.SiderealTime
+                model = self._pointingModel
+                sideOfPier = self._telescope.SideOfPier
+                ra, dec = model.MountToSky(ra, dec, lst, sideOfPier)
+                pierSide = self._GetDestinationPierSide(lst - ra)
+                ra, dec = model.SkyToMount(ra, dec, lst, pierSide)
+
             self._telescope.SlewToCoordinatesAsync(ra, dec)
+            self._slewMonitor.Add(SlewMonitor.SLEW)
+            self._TargetWasSet()
 
     def SetParkPosition(self):
         """
@@ -440,12 +739,24 @@ class TelescopeManager:
         self._telescope.Tracking = newState
         self._InterruptPollingSleep()
 
-    def SeekHomePosition(self):
+    def SeekHomePosition(self, timeout=None):
         """
         Slew to the telescope's Home position
+
+        Keyword arguments:
+        timeout -- the longest time that the slew may take, in seconds
+
+        Returns -- a Future that is resolved when the telescope is at home,
+                   or None if it cannot find home
         """
         if self._capabilities.CanFindHome:
             self._telescope.FindHome()
+            future = self._slewMonitor.Add(SlewMonitor.HOME, timeout)
+            self.ImmediateStatusUpdate()
+
+            return future
+
+        return None
 
     # End of Public Methods
 
@@ -475,9 +786,9 @@ class TelescopeManager:
         # Check the requsted rate against the valid rates
 
         if axis == TelescopeAxes.axisPrimary:
-            axisRates = self.Capabilities.PrimaryAxisRates
+            axisRates = self._capabilities.PrimaryAxisRates
         else:
-            axisRates = self.Capabilities.SecondaryAxisRates
+            axisRates = self._capabilities.SecondaryAxisRates
 
         count = len(axisRates)
         tolerance = 0.00001
@@ -518,7 +829,7 @@ class TelescopeManager:
 
         return retval
 
-    def _StartNudgeMoveAxis(self, direction, rate):
+    def _StartNudgeMoveAxis(self, direction, rate, lease):
         # start nudging the scope at the requested rate, in the requested
         # direction
 
@@ -532,8 +843,7 @@ class TelescopeManager:
         self._ValidateMoveAxisRate(axis, rate)
         trueRate = rate * self._GetNudgeSign(direction)
 
-        self._telescope.MoveAxis(axis, trueRate)
-        self._InterruptPollingSleep()
+        self._nudgeController.SetAxisRate(axis, trueRate, lease)
 
     def _StopNudgeMoveAxis(self, direction):
         # stop nudging the scope in the requested direction
@@ -546,14 +856,28 @@ class TelescopeManager:
         if direction == NudgeDirection.Nothing:
             # here stop both axes from moving
 
-            if self._telescope.CanMoveAxis(TelescopeAxes.axisPrimary):
-                self._telescope.MoveAxis(TelescopeAxes.axisPrimary, 0.0)
-
-            if self._telescope.CanMoveAxis(TelescopeAxes.axisSecondary):
-                self._telescope.MoveAxis(TelescopeAxes.axisSecondary, 0.0)
+            self._nudgeController.StopAll()
         else:
             axis = self._GetNudgeAxis(direction)
-            self._telescope.MoveAxis(axis, 0.0)
+            self._nudgeController.SetAxisRate(axis, 0.0)
+
+    def _CanNudge(self):
+        # check the cached capabilities for MoveAxis on both axes
+
+        caps = self._capabilities
+
+        return caps.CanMovePrimaryAxis and caps.CanMoveSecondaryAxis
+
+    def _MoveAxis(self, axis, rate):
+        # send a MoveAxis command, on the nudge controller's thread
+
+        telescope = self._telescope
+
+        if telescope is None:
+            msg = "The telescope was disconnected while nudging."
+            raise InvalidOperationException(msg)
+
+        telescope.MoveAxis(axis, rate)
 
     def _SetSlewDirections(self):
         # set the slew directions based on the driver's AlignmentMode
@@ -580,76 +904,94 @@ class TelescopeManager:
                 self._slewDirections.append(SlewDirection("W", "West"))
                 self._slewDirections.append(SlewDirection("E", "East"))
 
-    def _PollScopeTask(self, stop):
-        # this method runs on a worker thread to periodically read and update
-        # the current telescope status
+    def _ReadStatus(self):
+        # get fresh status from the telescope, skipping the properties that
+        # are not available. Then resolve the futures of any motions that
+        # have finished.
 
-        while True:
-            if stop():  # terminate and return
-                break
+        readTime = monotonic()
+        status = TelescopeStatus(
+            self._telescope, self._unsupported, self._targetsNotSet
+        )
 
-            # get fresh status from the telescope
+        # report where the telescope points on the sky, not where the mount
+        # thinks it points
 
-            try:
-                self._status = TelescopeStatus(self._telescope)
-            except Exception as xcp:
-                self._pollingException = xcp
+        if self._pointingModel.IsActive:
+            status.CorrectPosition(self._pointingModel.MountToSky)
 
-                pub.sendMessage("TelescopePollingException", xcp=xcp)
+        self._slewMonitor.StatusUpdated(status, readTime)
 
-                return
+        # another client or the hand controller may have set the target, so
+        # look for it again when a slew starts, and every few polls
 
-            # send status update message
+        self._pollsSinceProbe += 1
+        isSlewStart = status.Slewing and not self._wasSlewing
 
-            pub.sendMessage("TelescopeStatusUpdate", sts=self._status)
+        if isSlewStart or self._pollsSinceProbe >= self._TARGET_PROBE_POLLS:
+            self._TargetWasSet()
 
-            # set our sleep interval to normal or fast (if slewing)
+        self._wasSlewing = status.Slewing
 
-            interval = self._POLLING_INTERVAL_NORMAL
+        return status
 
-            if self._status.Slewing:
-                interval = self._POLLING_INTERVAL_FAST
+    def _GetDestinationPierSide(self, hourAngle):
+        # predict the side of the pier for a slew. A German equatorial mount
+        # points east of the meridian from the west side of the pier.
 
-            # wait until we are signaled or until the sleep interval has
-            # expired.
+        if self._parameters.AlignmentMode != AlignmentModes.algGermanPolar:
+            return PierSide.pierUnknown
 
-            flag = self._eventObj.wait(interval)
+        hourAngle = (hourAngle + 12.0) % 24.0 - 12.0
 
-            # reset the event object so we can reuse it.
+        return PierSide.pierWest if hourAngle < 0.0 else PierSide.pierEast
 
-            if flag:
-                self._eventObj.clear()
+    def _CreateSlewLimits(self):
+        # build the slew limits from the settings. Altitudes can only be
+        # checked if the driver reports the site's location.
 
-    def _StartDevicePolling(self):
-        # begin polling any connected telescope for fresh status
+        try:
+            transform = CoordinateTransform.FromParameters(self._parameters)
+        except ValueError:
+            transform = None
 
-        # return if no connected scope
+        settings = ApplicationSettings.GetInstance()
+        limits = settings.GetDeviceConfiguration(self._id).SlewLimits
 
-        if self._telescope is None or not self._isConnected:
-            return
-        # return if already polling the scope
+        return SlewLimits.FromSettings(limits, transform)
 
-        if self._isPolling:
-            return
+    def _CreatePointingModel(self):
+        # build the pointing model from the sync points that were saved
+        # for this telescope
 
-        # subscribe to receive any unhandled exception raised by the polling
-        # thread.
+        settings = ApplicationSettings.GetInstance()
+        model = settings.GetDeviceConfiguration(self._id).PointingModel
 
-        pub.subscribe(self._PollingExceptionListener, "TelescopePollingException")
+        return PointingModel.FromSettings(model)
 
-        # create a worker thread to poll the telescope
+    def _StorePointingModel(self):
+        # keep the sync points in the settings, which are saved when the
+        # application closes
 
-        self._eventObj = thread.Event()
-        self._stopPolling = False
-        self._pollingThread = thread.Thread(
-            target=self._PollScopeTask, args=(lambda: self._stopPolling,)
-        )
-        self._pollingThread.start()
+        settings = ApplicationSettings.GetInstance()
+        settings.SetPointingModel(self._id, self._pointingModel.ToSettings())
+
+    def _TargetWasSet(self):
+        # the target may have been set, e.g. by a slew to coordinates, so
+        # resume reading it
+
+        self._targetsNotSet.clear()
+        self._pollsSinceProbe = 0
 
-    def _InterruptPollingSleep(self):
-        # interrupt the polling thread to force an immediate status update or
-        # to cause the thread to exit
-        self._eventObj.set()
+    def _GetPollingInterval(self, status):
+        # set our sleep interval to normal or fast (if slewing)
+
+        interval = self._POLLING_INTERVAL_NORMAL
+
+        if status.Slewing or self._slewMonitor.IsBusy:
+            interval = self._POLLING_INTERVAL_FAST
+
+        return interval
 
     def _PollingExceptionListener(self, xcp):
         # Stop the polling loop in response to an error and report the error
@@ -660,12 +1002,8 @@ class TelescopeManager:
         msg += "Details follow:\r\n\r\n"
         formatter = ExceptionFormatter.GetInstance()
         msg += formatter.Format(xcp)
-        messagebox.showerror("Slewing Error Occurred", msg)
+        ErrorReporter.GetInstance().Report("Slewing Error Occurred", msg, xcp)
 
-        self._stopPolling = True
-        self._InterruptPollingSleep()
-        self.pollingThread.join()
-        self._pollingThread = None
         self.Disconnect()
 
     # End of Private Helper Methods
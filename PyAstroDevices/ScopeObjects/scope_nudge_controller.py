@@ -0,0 +1,405 @@
+import threading as thread
+from collections import deque
+from time import monotonic
+
+from alpaca.telescope import TelescopeAxes
+
+from exception_formatter import ExceptionFormatter
+from error_reporter import ErrorReporter
+
+
+class NudgeController(object):
+    """
+    Class to send the MoveAxis commands for nudging the telescope from a
+    single worker thread, so that the user interface never waits for the
+    driver.
+
+    Callers only set the rate that each axis should be moving at. The worker
+    sends the commands that bring the axes from their last commanded rates
+    to the requested ones. Requests that arrive while a command is being
+    sent replace each other, so a burst of presses and releases becomes at
+    most one command per axis, and none at all if the axis ends where it
+    started.
+
+    Stops always go before starts. When the worker picks its next command,
+    any axis that must stop is sent first, so a release is never queued
+    behind other moves. A stop that fails is retried until it succeeds or
+    the controller is stopped.
+
+    A request can be given a lease. This is a deadman for input sources that
+    can be lost without sending a release, such as a held key when the
+    window loses focus, or a gamepad that is unplugged. Each axis has its
+    own lease, so a source that holds one on an axis does not affect a
+    nudge from another source on the other axis. While a lease is held, the
+    source must renew it with KeepAlive, and if the lease runs out the
+    worker stops that axis. The longest that an axis can keep moving after
+    the input is lost is the lease time plus the time that the driver takes
+    to accept the stop.
+
+    The latency of each command is the time from the first request that it
+    carries to the return of the MoveAxis call. It is kept for the most
+    recent commands.
+    """
+
+    _AXES = (TelescopeAxes.axisPrimary, TelescopeAxes.axisSecondary)
+    _RETRY_INTERVAL = 0.25  # seconds between attempts to resend a stop
+    _HISTORY_LENGTH = 100  # the number of command latencies that are kept
+
+    def __init__(self, moveAxis, commandSent=None):
+        """
+        Initializer method for the NudgeController class
+
+        Positional arguments:
+        moveAxis    -- the callable that sends a MoveAxis command to the
+                       driver, with the axis and the rate in degrees per
+                       second
+
+        Keyword arguments:
+        commandSent -- an optional callable that is called after the worker
+                       has sent each batch of commands
+        """
+        self._moveAxis = moveAxis
+        self._commandSent = commandSent
+        self._condition = thread.Condition()
+        self._requested = dict.fromkeys(self._AXES, 0.0)
+        self._commanded = dict.fromkeys(self._AXES, 0.0)
+        self._isRunning = False
+        self._nudgeThread = None
+        self._requestCount = 0
+        self._commandCount = 0
+        self._expiredCount = 0
+        self._deadlines = {}
+        self._requestTimes = {}
+        self._history = deque(maxlen=self._HISTORY_LENGTH)
+
+    # Start of Public Properties
+
+    @property
+    def IsRunning(self):
+        return self._isRunning
+
+    @property
+    def IsMoving(self):
+        # True if either axis has been told to move, or is about to be
+
+        with self._condition:
+            rates = list(self._requested.values()) + list(self._commanded.values())
+
+        return any(rate != 0.0 for rate in rates)
+
+    @property
+    def RequestCount(self):
+        # the number of rate changes that have been requested
+
+        return self._requestCount
+
+    @property
+    def CommandCount(self):
+        # the number of MoveAxis commands that have been sent
+
+        return self._commandCount
+
+    @property
+    def ExpiredCount(self):
+        # the number of times that an axis was stopped because its lease ran
+        # out
+
+        return self._expiredCount
+
+    @property
+    def HasLease(self):
+        # True if either axis holds a lease
+
+        return len(self._deadlines) > 0
+
+    @property
+    def LastLatency(self):
+        # the latency of the most recent command, in seconds, or NaN if no
+        # command has been sent
+
+        history = self._history
+
+        return history[-1][1] if history else float("nan")
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def Start(self):
+        """
+        Start the worker thread. The axes are assumed to be stopped.
+        """
+        if self._isRunning:
+            return
+
+        with self._condition:
+            self._requested = dict.fromkeys(self._AXES, 0.0)
+            self._commanded = dict.fromkeys(self._AXES, 0.0)
+            self._deadlines = {}
+            self._requestTimes = {}
+            self._isRunning = True
+
+        self._nudgeThread = thread.Thread(
+            target=self._NudgeTask, name="NudgeController", daemon=True
+        )
+        self._nudgeThread.start()
+
+    def Stop(self):
+        """
+        Stop the worker thread, after stopping any axis that is moving
+        """
+        if not self._isRunning:
+            return
+
+        self.StopAll()
+
+        with self._condition:
+            self._isRunning = False
+            self._condition.notify_all()
+
+        if self._nudgeThread is not thread.current_thread():
+            self._nudgeThread.join()
+
+        self._nudgeThread = None
+
+    def SetAxisRate(self, axis, rate, lease=None):
+        """
+        Request that an axis moves at a rate. The command is sent by the
+        worker thread, and this method returns at once.
+
+        Positional arguments:
+        axis  -- the TelescopeAxes member
+        rate  -- the signed rate, in degrees per second, or 0 to stop
+
+        Keyword arguments:
+        lease -- the number of seconds that the request holds unless it is
+                 renewed with KeepAlive, or None for a request that holds
+                 until it is replaced. The lease is for this axis only, and
+                 a stop does not need one.
+        """
+        with self._condition:
+            self._requested[axis] = float(rate)
+            self._requestCount += 1
+            self._SetLease(axis, None if rate == 0.0 else lease)
+            self._NoteRequestTime(axis)
+            self._condition.notify_all()
+
+    def StopAll(self):
+        """
+        Request that both axes stop
+        """
+        with self._condition:
+            self._StopAxes()
+            self._requestCount += 1
+            self._deadlines = {}
+            self._condition.notify_all()
+
+    def KeepAlive(self, lease, axes=None):
+        """
+        Renew the leases on the current requests. An axis that does not hold
+        a lease is not given one.
+
+        Positional arguments:
+        lease -- the number of seconds that the requests hold from now
+
+        Keyword arguments:
+        axes  -- the TelescopeAxes members whose leases are renewed, or None
+                 for every axis that holds a lease
+        """
+        with self._condition:
+            for axis in self._AXES if axes is None else axes:
+                if axis in self._deadlines:
+                    self._SetLease(axis, lease)
+
+            self._condition.notify_all()
+
+    def WaitUntilSent(self, timeout=None):
+        """
+        Wait until every requested rate has been sent to the driver
+
+        Keyword arguments:
+        timeout -- the maximum number of seconds to wait, or None to wait
+                   indefinitely
+
+        Returns -- True if the commands were sent, or False if the wait
+                   timed out
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._isRunning or self._requested == self._commanded,
+                timeout,
+            )
+
+    def GetLatencyStatistics(self):
+        """
+        Get the latency statistics of the most recent commands
+
+        Returns -- a dictionary with the number of commands, and the mean and
+                   largest latency of the start and stop commands, in
+                   seconds
+        """
+        history = list(self._history)
+        stats = {"Count": len(history)}
+
+        for isStop, name in ((False, "Start"), (True, "Stop")):
+            values = [h[1] for h in history if h[0] == isStop]
+            count = len(values)
+            stats[f"Mean{name}Latency"] = (
+                sum(values) / count if count else float("nan")
+            )
+            stats[f"Max{name}Latency"] = max(values) if count else float("nan")
+
+        return stats
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _NudgeTask(self):
+        # send the commands that bring the axes to their requested rates
+        # until stopped
+
+        isFailing = False
+
+        while True:
+            with self._condition:
+                if isFailing:
+                    # wait before trying a failed stop again
+
+                    self._condition.wait(self._RETRY_INTERVAL)
+
+                self._CheckLease()
+
+                while self._isRunning and self._requested == self._commanded:
+                    self._condition.wait(self._GetWaitTime())
+                    self._CheckLease()
+
+                if self._requested == self._commanded:
+                    # only reached when stopping with nothing left to send
+
+                    return
+
+                axis, rate = self._GetNextCommand()
+
+            try:
+                self._moveAxis(axis, rate)
+            except Exception as xcp:
+                if not self._isRunning:
+                    # the driver cannot be reached while shutting down
+
+                    return
+
+                # report only the first of a run of failures
+
+                if not isFailing:
+                    self._CommandFailed(axis, rate, xcp)
+
+                isFailing = self._CancelFailedStart(axis, rate)
+
+                continue
+
+            isFailing = False
+
+            now = monotonic()
+
+            with self._condition:
+                self._commanded[axis] = rate
+                self._commandCount += 1
+                requestTime = self._requestTimes.pop(axis, now)
+                self._history.append((rate == 0.0, now - requestTime))
+                self._NoteRequestTime(axis)
+                isDone = self._requested == self._commanded
+                self._condition.notify_all()
+
+            if isDone and self._commandSent is not None:
+                self._commandSent()
+
+    def _SetLease(self, axis, lease):
+        # set the time that the request for an axis runs out, or remove its
+        # lease. The caller must hold the condition lock.
+
+        if lease is None:
+            self._deadlines.pop(axis, None)
+        else:
+            self._deadlines[axis] = monotonic() + lease
+
+    def _GetWaitTime(self):
+        # the time to wait before the next lease must be checked, or None if
+        # there is no lease. The caller must hold the condition lock.
+
+        if not self._deadlines:
+            return None
+
+        return max(0.0, min(self._deadlines.values()) - monotonic())
+
+    def _CheckLease(self):
+        # stop each axis whose lease has run out. The caller must hold the
+        # condition lock.
+
+        now = monotonic()
+        expired = [a for a, d in self._deadlines.items() if now >= d]
+
+        for axis in expired:
+            del self._deadlines[axis]
+
+            if self._requested[axis] != 0.0:
+                self._requested[axis] = 0.0
+                self._NoteRequestTime(axis)
+                self._expiredCount += 1
+
+    def _StopAxes(self):
+        # request that both axes stop. The caller must hold the condition
+        # lock.
+
+        for axis in self._AXES:
+            self._requested[axis] = 0.0
+            self._NoteRequestTime(axis)
+
+    def _NoteRequestTime(self, axis):
+        # keep the time of the first request that has not been sent for an
+        # axis. The caller must hold the condition lock.
+
+        if self._requested[axis] == self._commanded[axis]:
+            self._requestTimes.pop(axis, None)
+        else:
+            self._requestTimes.setdefault(axis, monotonic())
+
+    def _GetNextCommand(self):
+        # pick the next command, stops before starts. The caller must hold
+        # the condition lock.
+
+        changed = [a for a in self._AXES if self._requested[a] != self._commanded[a]]
+        stops = [a for a in changed if self._requested[a] == 0.0]
+        axis = stops[0] if stops else changed[0]
+
+        return axis, self._requested[axis]
+
+    def _CancelFailedStart(self, axis, rate):
+        # a failed stop is retried, but a failed start is abandoned. Returns
+        # True if the command will be retried.
+
+        if rate == 0.0:
+            return True
+
+        with self._condition:
+            if self._requested[axis] == rate:
+                self._requested[axis] = self._commanded[axis]
+                self._NoteRequestTime(axis)
+                self._condition.notify_all()
+
+        return False
+
+    def _CommandFailed(self, axis, rate, xcp):
+        # report a command that the driver did not accept
+
+        if rate == 0.0:
+            msg = "Unable to stop nudging the telescope. The stop will be "
+            msg += "tried again. Details follow:\r\n\r\n"
+        else:
+            msg = "Unable to start nudging the telescope. "
+            msg += "Details follow:\r\n\r\n"
+
+        msg += ExceptionFormatter.GetInstance().Format(xcp)
+        ErrorReporter.GetInstance().Report("Telescope Driver Error", msg, xcp)
+
+    # End of Private Helper Methods
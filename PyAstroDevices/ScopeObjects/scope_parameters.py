@@ -10,7 +10,11 @@ class TelescopeParameters:
     empty instance, or one with values read from the driver.
     """
 
-    def __init__(self, telescope=None):
+    def __init__(self, telescope=None, deviceId=None):
+        # telescope -- the connected telescope, or None for an empty instance
+        # deviceId  -- the ID of the telescope instance, used to get the
+        #              driver name for an empty instance
+
         self._telescope = telescope
 
         if telescope:
@@ -52,6 +56,9 @@ class TelescopeParameters:
             self._interfaceVersion = 0
             settings = ApplicationSettings.GetInstance()
             self._name = settings.TelescopeDriverName
+
+            if deviceId is not None:
+                self._name = settings.GetDeviceConfiguration(deviceId).DriverName
             self._siteElevation = float("nan")
             self._siteLatitude = float("nan")
             self._siteLongitude = float("nan")
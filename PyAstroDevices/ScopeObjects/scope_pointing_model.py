@@ -0,0 +1,336 @@
+import threading as thread
+
+import numpy as np
+
+from alpaca.telescope import PierSide
+
+
+class PointingModel(object):
+    """
+    Class to model the pointing errors of an equatorial mount from sync
+    points, and to correct the targets of later slews so that they land on
+    target the first time.
+
+    Each sync point pairs the position that the mount reported with the
+    true position of the object that it was synced on. The differences are
+    fitted by linear least squares to the terms of a TPoint style model:
+
+    IH -- index error in hour angle
+    ID -- index error in declination
+    CH -- collimation (cone) error
+    NP -- non-perpendicularity of the axes
+    MA -- polar axis misalignment in azimuth
+    ME -- polar axis misalignment in elevation
+
+    The mount's hour angle and declination are the true ones plus
+
+    dH = IH + CH sec(dec) + NP tan(dec) - MA cos(H) tan(dec) + ME sin(H) tan(dec)
+    dDec = ID + MA sin(H) + ME cos(H)
+
+    For a German equatorial mount the CH, NP and ID terms change sign with
+    the side of the pier. The terms are in arcseconds. While only a few
+    points are known, only the terms that they can determine are fitted.
+    """
+
+    TERMS = ("IH", "ID", "ME", "MA", "CH", "NP")
+
+    def __init__(self):
+        # the instance initializer
+
+        self._lock = thread.Lock()
+        self._points = []
+        self._terms = dict.fromkeys(self.TERMS, 0.0)
+        self._rmsError = float("nan")
+        self._isEnabled = True
+
+    @classmethod
+    def FromSettings(cls, settings):
+        """
+        Create the model from a telescope's POINTING_MODEL settings, and fit
+        it to the saved sync points
+
+        Positional arguments:
+        settings -- a dictionary with the ENABLED flag and the POINTS, as
+                    returned by ToSettings, either of which may be missing
+
+        Returns -- the PointingModel
+        """
+        model = cls()
+        model._isEnabled = bool(settings.get("ENABLED", True))
+        points = settings.get("POINTS", [])
+        model._points = [tuple(float(v) for v in p) for p in points if len(p) == 5]
+        model.Fit()
+
+        return model
+
+    # Start of Public Properties
+
+    @property
+    def IsEnabled(self):
+        return self._isEnabled
+
+    @IsEnabled.setter
+    def IsEnabled(self, value):
+        self._isEnabled = value
+
+    @property
+    def IsActive(self):
+        # True if the model is enabled and has been fitted
+
+        return self._isEnabled and len(self._points) > 0
+
+    @property
+    def PointCount(self):
+        return len(self._points)
+
+    @property
+    def Terms(self):
+        return dict(self._terms)
+
+    @property
+    def RmsError(self):
+        # the RMS of the fit residuals on the sky, in arcseconds
+
+        return self._rmsError
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def AddPoint(
+        self,
+        mountRightAscension,
+        mountDeclination,
+        trueRightAscension,
+        trueDeclination,
+        siderealTime,
+        pierSide=PierSide.pierUnknown,
+    ):
+        """
+        Record a sync point and fit the model again
+
+        Positional arguments:
+        mountRightAscension -- the right ascension that the mount reported,
+                               in hours
+        mountDeclination    -- the declination that the mount reported, in
+                               degrees
+        trueRightAscension  -- the object's right ascension, in hours
+        trueDeclination     -- the object's declination, in degrees
+        siderealTime        -- the local sidereal time, in hours
+
+        Keyword arguments:
+        pierSide            -- the side of the pier, for a German equatorial
+                               mount
+        """
+        point = (
+            siderealTime - mountRightAscension,
+            mountDeclination,
+            siderealTime - trueRightAscension,
+            trueDeclination,
+            self._GetPierSign(pierSide),
+        )
+
+        with self._lock:
+            self._points.append(point)
+
+        self.Fit()
+
+    def ClearPoints(self):
+        """
+        Discard all the sync points and the fitted model
+        """
+        with self._lock:
+            self._points = []
+            self._terms = dict.fromkeys(self.TERMS, 0.0)
+            self._rmsError = float("nan")
+
+    def Fit(self):
+        """
+        Fit the model terms to the sync points
+
+        Returns -- a dictionary of the fitted terms, in arcseconds
+        """
+        with self._lock:
+            points = np.array(self._points, dtype=float).reshape(-1, 5)
+
+        if len(points) == 0:
+            return self.Terms
+
+        mountHa, mountDec, trueHa, trueDec, pier = points.T
+
+        # the errors, in arcseconds, with the hour angle error measured on
+        # the sky so that every equation has the same weight
+
+        dHa = ((mountHa - trueHa + 12.0) % 24.0 - 12.0) * 15.0 * 3600.0
+        dDec = (mountDec - trueDec) * 3600.0
+        cosDec = np.cos(np.radians(trueDec))
+
+        haRows, decRows = self._GetDesign(trueHa, trueDec, pier)
+        design = np.vstack((haRows * cosDec[:, None], decRows))
+        errors = np.concatenate((dHa * cosDec, dDec))
+
+        # use only the terms that the points can determine
+
+        count = min(len(self.TERMS), max(2, 2 * len(points) - 2))
+        solution, _, _, _ = np.linalg.lstsq(design[:, :count], errors, rcond=None)
+        terms = dict.fromkeys(self.TERMS, 0.0)
+        terms.update(zip(self.TERMS, (float(v) for v in solution)))
+
+        residuals = errors - design[:, :count] @ solution
+        rmsError = float(np.sqrt(np.mean(residuals**2) * 2.0))
+
+        with self._lock:
+            self._terms = terms
+            self._rmsError = rmsError
+
+        return dict(terms)
+
+    def SkyToMount(self, rightAscension, declination, siderealTime, pierSide):
+        """
+        Get the mount coordinates that point at a position on the sky
+
+        Positional arguments:
+        rightAscension -- the right ascension, in hours
+        declination    -- the declination, in degrees
+        siderealTime   -- the local sidereal time, in hours
+        pierSide       -- the side of the pier that the mount will be on
+
+        Returns -- a tuple of the right ascension and declination to send to
+                   the mount
+        """
+        if not self.IsActive:
+            return rightAscension, declination
+
+        hourAngle = siderealTime - rightAscension
+        dHa, dDec = self._GetOffsets(hourAngle, declination, pierSide)
+
+        mountRa = (rightAscension - dHa) % 24.0
+        mountDec = max(-90.0, min(90.0, declination + dDec))
+
+        return mountRa, mountDec
+
+    def MountToSky(self, rightAscension, declination, siderealTime, pierSide):
+        """
+        Get the position on the sky that the mount is pointing at
+
+        Positional arguments:
+        rightAscension -- the right ascension that the mount reports, in
+                          hours
+        declination    -- the declination that the mount reports, in degrees
+        siderealTime   -- the local sidereal time, in hours
+        pierSide       -- the mount's side of the pier
+
+        Returns -- a tuple of the true right ascension and declination
+        """
+        if not self.IsActive:
+            return rightAscension, declination
+
+        # the offsets depend on the true position, so refine it a few times
+
+        ra = rightAscension
+        dec = declination
+
+        for _ in range(3):
+            dHa, dDec = self._GetOffsets(siderealTime - ra, dec, pierSide)
+            ra = (rightAscension + dHa) % 24.0
+            dec = max(-90.0, min(90.0, declination - dDec))
+
+        return ra, dec
+
+    def ToSettings(self):
+        """
+        Get the settings that FromSettings creates the model from
+
+        Returns -- a dictionary with the ENABLED flag and the POINTS, a list
+                   of the mount and true hour angles and declinations and the
+                   pier sign of each sync point
+        """
+        with self._lock:
+            points = [list(p) for p in self._points]
+
+        return {"ENABLED": self._isEnabled, "POINTS": points}
+
+    def SavePoints(self, filename):
+        """
+        Write the sync points to a CSV file
+
+        Positional arguments:
+        filename -- the name of the file
+        """
+        with self._lock:
+            points = np.array(self._points, dtype=float).reshape(-1, 5)
+
+        header = "MountHourAngle,MountDeclination,TrueHourAngle,TrueDeclination,Pier"
+        np.savetxt(filename, points, fmt="%.8f", delimiter=",", header=header)
+
+    def LoadPoints(self, filename):
+        """
+        Add the sync points from a CSV file that was written by SavePoints,
+        and fit the model
+
+        Positional arguments:
+        filename -- the name of the file
+
+        Returns -- the number of points that were added
+        """
+        points = np.loadtxt(filename, delimiter=",", ndmin=2)
+
+        with self._lock:
+            self._points.extend(tuple(float(v) for v in p) for p in points)
+
+        self.Fit()
+
+        return len(points)
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _GetPierSign(self, pierSide):
+        # the sign of the terms that change with the side of the pier
+
+        return -1.0 if pierSide == PierSide.pierEast else 1.0
+
+    def _GetDesign(self, hourAngle, declination, pier):
+        # get the partial derivatives of the errors with respect to the
+        # terms, in the order of TERMS
+
+        h = np.radians(np.asarray(hourAngle, dtype=float) * 15.0)
+        dec = np.radians(np.asarray(declination, dtype=float))
+
+        # keep the tangent and secant finite at the pole
+
+        cosDec = np.maximum(np.cos(dec), 1e-3)
+        tanDec = np.sin(dec) / cosDec
+        ones = np.ones_like(h)
+        zeros = np.zeros_like(h)
+
+        haRows = np.column_stack(
+            (
+                ones,
+                zeros,
+                np.sin(h) * tanDec,
+                -np.cos(h) * tanDec,
+                pier / cosDec,
+                pier * tanDec,
+            )
+        )
+        decRows = np.column_stack(
+            (zeros, pier * ones, np.cos(h), np.sin(h), zeros, zeros)
+        )
+
+        return haRows, decRows
+
+    def _GetOffsets(self, hourAngle, declination, pierSide):
+        # get the modelled errors at a position, in hours and degrees
+
+        terms = np.array([self._terms[t] for t in self.TERMS])
+        pier = self._GetPierSign(pierSide)
+        haRows, decRows = self._GetDesign([hourAngle], [declination], pier)
+
+        dHa = float(haRows[0] @ terms) / (15.0 * 3600.0)
+        dDec = float(decRows[0] @ terms) / 3600.0
+
+        return dHa, dDec
+
+    # End of Private Helper Methods
@@ -0,0 +1,408 @@
+import csv
+import time
+import threading as thread
+
+import numpy as np
+from pubsub import pub
+
+from alpaca.telescope import AlignmentModes
+from alpaca.exceptions import InvalidValueException
+
+from scope_helpers import Formatter
+
+
+class SequenceTarget(object):
+    """
+    Class to contain a single target of an observing sequence.
+    """
+
+    def __init__(self, name, rightAscension, declination, dwell=0.0):
+        """
+        Initializer method for the SequenceTarget class
+
+        Positional arguments:
+        name           -- the name of the target
+        rightAscension -- the right ascension, in hours
+        declination    -- the declination, in degrees
+
+        Keyword arguments:
+        dwell          -- the time to stay on the target, in seconds
+        """
+        self._name = name
+        self._rightAscension = rightAscension
+        self._declination = declination
+        self._dwell = dwell
+
+    @property
+    def Name(self):
+        return self._name
+
+    @property
+    def RightAscension(self):
+        return self._rightAscension
+
+    @property
+    def Declination(self):
+        return self._declination
+
+    @property
+    def Dwell(self):
+        return self._dwell
+
+
+class TargetSequencer(object):
+    """
+    Class to visit a list of targets with a telescope, in the order that
+    keeps the total slewing time short.
+
+    The slew cost between every pair of targets is calculated at once as
+    a matrix, from the angular separations and, for a German equatorial
+    mount, a penalty for changing the side of the pier. A nearest
+    neighbour tour from the telescope's position is then improved with
+    2-opt moves until no move makes it shorter.
+
+    The targets are visited one after another, each slew being started as
+    soon as the previous slew's completion future is resolved and the
+    dwell time has passed.
+    """
+
+    _DEFAULT_SLEW_RATE = 3.0  # degrees per second
+    _DEFAULT_SETTLE_TIME = 5.0  # seconds per slew
+    _DEFAULT_FLIP_TIME = 60.0  # seconds for a meridian flip
+    _MAX_PASSES = 100  # of 2-opt improvement
+
+    def __init__(self, telescopeManager):
+        """
+        Initializer method for the TargetSequencer class
+
+        Positional arguments:
+        telescopeManager -- the TelescopeManager of the telescope to use
+        """
+        self._mgr = telescopeManager
+        self._slewRate = self._DEFAULT_SLEW_RATE
+        self._settleTime = self._DEFAULT_SETTLE_TIME
+        self._flipTime = self._DEFAULT_FLIP_TIME
+        self._targets = []
+        self._stopRequested = False
+        self._sequenceThread = None
+
+    # Start of Public Properties
+
+    @property
+    def Targets(self):
+        return list(self._targets)
+
+    @property
+    def IsRunning(self):
+        return self._sequenceThread is not None and self._sequenceThread.is_alive()
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def SetSlewModel(self, slewRate, settleTime, flipTime):
+        """
+        Set the values that are used to estimate the slew times
+
+        Positional arguments:
+        slewRate   -- the slew rate, in degrees per second
+        settleTime -- the time for each slew to settle, in seconds
+        flipTime   -- the extra time for a meridian flip, in seconds
+        """
+        self._slewRate = slewRate
+        self._settleTime = settleTime
+        self._flipTime = flipTime
+
+    def LoadTargets(self, filename):
+        """
+        Read the targets from a CSV file with a header line. The columns are
+        Name, RA and Dec, with an optional Dwell column in seconds. RA is in
+        hours and Dec in degrees, either as decimal numbers or in
+        sexagesimal form, e.g. 05:35:17.3 and -05:23:28.
+
+        Positional arguments:
+        filename -- the name of the CSV file
+
+        Returns -- the number of targets that were read
+        """
+        targets = []
+
+        with open(filename, newline="") as f:
+            reader = csv.DictReader(f)
+
+            # allow any capitalization of the column names
+
+            reader.fieldnames = [n.strip().lower() for n in reader.fieldnames]
+
+            for row in reader:
+                if not row.get("ra") or not row.get("dec"):
+                    continue
+
+                targets.append(
+                    SequenceTarget(
+                        row.get("name", "").strip(),
+                        Formatter.ParseSexagesimal(row["ra"]),
+                        Formatter.ParseSexagesimal(row["dec"]),
+                        float(row.get("dwell") or 0.0),
+                    )
+                )
+
+        self._targets = targets
+
+        return len(targets)
+
+    def SetTargets(self, targets):
+        """
+        Set the targets to visit
+
+        Positional arguments:
+        targets -- a list of SequenceTarget instances
+        """
+        self._targets = list(targets)
+
+    def GetCostMatrix(self, rightAscensions, declinations, siderealTime):
+        """
+        Calculate the estimated slew time between every pair of positions.
+        Once the telescope's slew times have been learned, they are used in
+        place of the slew model.
+
+        Positional arguments:
+        rightAscensions -- an array of right ascensions, in hours
+        declinations    -- an array of declinations, in degrees
+        siderealTime    -- the local sidereal time, in hours
+
+        Returns -- a square matrix of slew times, in seconds
+        """
+        estimator = self._mgr.SlewEstimator
+
+        if estimator.IsFitted:
+            return self._GetLearnedCostMatrix(
+                estimator, rightAscensions, declinations, siderealTime
+            )
+
+        ra = np.radians(np.asarray(rightAscensions, dtype=float) * 15.0)
+        dec = np.radians(np.asarray(declinations, dtype=float))
+
+        # the haversine formula, for every pair of positions at once
+
+        dRa = ra[:, None] - ra[None, :]
+        dDec = dec[:, None] - dec[None, :]
+        h = np.sin(dDec / 2.0) ** 2
+        h += np.cos(dec[:, None]) * np.cos(dec[None, :]) * np.sin(dRa / 2.0) ** 2
+        separation = np.degrees(2.0 * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0))))
+
+        cost = separation / self._slewRate + self._settleTime
+
+        if self._IsGermanEquatorial():
+            # the pier side follows the sign of the hour angle
+
+            hourAngle = (siderealTime - np.degrees(ra) / 15.0 + 12.0) % 24.0 - 12.0
+            east = hourAngle < 0.0
+            cost += self._flipTime * (east[:, None] != east[None, :])
+
+        np.fill_diagonal(cost, 0.0)
+
+        return cost
+
+    def OrderTargets(self):
+        """
+        Put the targets in the order that minimizes the estimated total slew
+        time, starting from the telescope's current position.
+
+        Returns -- the estimated total slew time, in seconds
+        """
+        if len(self._targets) == 0:
+            return 0.0
+
+        sts = self._mgr.Status
+
+        # the telescope's position is node 0, the targets are nodes 1 to n
+
+        ra = [sts.RightAscension] + [t.RightAscension for t in self._targets]
+        dec = [sts.Declination] + [t.Declination for t in self._targets]
+        cost = self.GetCostMatrix(ra, dec, sts.SiderealTime)
+
+        tour = self._NearestNeighbourTour(cost)
+        tour = self._ImproveTour(tour, cost)
+
+        self._targets = [self._targets[i - 1] for i in tour[1:]]
+
+        return float(cost[tour[:-1], tour[1:]].sum())
+
+    def Start(self, onArrival=None):
+        """
+        Visit the targets in their current order on a background thread.
+
+        Keyword arguments:
+        onArrival -- an optional callable that is called with each target
+                     when the telescope has arrived. The sequence continues
+                     when it returns, or after the target's dwell time.
+        """
+        if self.IsRunning:
+            return
+
+        self._stopRequested = False
+        self._sequenceThread = thread.Thread(
+            target=self.Run, args=(onArrival,), name="TargetSequencer", daemon=True
+        )
+        self._sequenceThread.start()
+
+    def Stop(self):
+        """
+        Stop the sequence, aborting the slew in progress
+        """
+        self._stopRequested = True
+        self._mgr.AbortSlew()
+
+    def Run(self, onArrival=None):
+        """
+        Visit the targets in their current order. Progress is sent as
+        TelescopeSequenceProgress messages. Targets that are outside the
+        telescope's slew limits when their turn comes are skipped.
+
+        Keyword arguments:
+        onArrival -- an optional callable that is called with each target
+                     when the telescope has arrived
+
+        Returns -- the number of targets that were visited
+        """
+        topic = self._mgr.Topic("TelescopeSequenceProgress")
+        visited = 0
+
+        for index, target in enumerate(self._targets):
+            if self._stopRequested:
+                break
+
+            pub.sendMessage(topic, index=index, target=target, arrived=False)
+
+            try:
+                future = self._mgr.SlewToCoordinatesAsync(
+                    target.RightAscension, target.Declination
+                )
+            except InvalidValueException:
+                # the target is below the horizon or beyond the limits
+
+                continue
+
+            if future is None:
+                # the telescope is not connected
+
+                break
+
+            try:
+                future.result()
+            except Exception:
+                # the slew was aborted or did not finish
+
+                break
+
+            pub.sendMessage(topic, index=index, target=target, arrived=True)
+            visited += 1
+
+            if onArrival is not None:
+                onArrival(target)
+
+            self._Dwell(target.Dwell)
+
+        return visited
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _IsGermanEquatorial(self):
+        parms = self._mgr.Parameters
+
+        if parms is None:
+            return False
+
+        return parms.AlignmentMode == AlignmentModes.algGermanPolar
+
+    def _GetLearnedCostMatrix(
+        self, estimator, rightAscensions, declinations, siderealTime
+    ):
+        # get the slew times between every pair of positions from the
+        # learned slew times
+
+        ra = np.asarray(rightAscensions, dtype=float)
+        dec = np.asarray(declinations, dtype=float)
+        flip = False
+
+        if self._IsGermanEquatorial():
+            hourAngle = (siderealTime - ra + 12.0) % 24.0 - 12.0
+            east = hourAngle < 0.0
+            flip = east[:, None] != east[None, :]
+
+        cost = estimator.Predict(
+            ra[:, None], dec[:, None], ra[None, :], dec[None, :], siderealTime, flip
+        )
+        np.fill_diagonal(cost, 0.0)
+
+        return cost
+
+    def _NearestNeighbourTour(self, cost):
+        # build a tour from node 0 by always going to the nearest unvisited
+        # node
+
+        count = len(cost)
+        visited = np.zeros(count, dtype=bool)
+        tour = [0]
+        visited[0] = True
+
+        for _ in range(count - 1):
+            distances = np.where(visited, np.inf, cost[tour[-1]])
+            node = int(np.argmin(distances))
+            tour.append(node)
+            visited[node] = True
+
+        return np.array(tour)
+
+    def _ImproveTour(self, tour, cost):
+        # improve the open tour with 2-opt moves. Reversing the segment
+        # tour[i:j+1] replaces the edges (i-1, i) and (j, j+1) with
+        # (i-1, j) and (i, j+1). The gains for all j are found at once.
+
+        count = len(tour)
+
+        for _ in range(self._MAX_PASSES):
+            improved = False
+
+            for i in range(1, count - 1):
+                a = tour[i - 1]
+                b = tour[i]
+                js = np.arange(i + 1, count)
+                c = tour[js]
+
+                # the last node has no following edge
+
+                d = np.append(tour[js[:-1] + 1], -1)
+                after = np.where(d >= 0, cost[c, d.clip(0)], 0.0)
+                closing = np.where(d >= 0, cost[b, d.clip(0)], 0.0)
+
+                gain = cost[a, b] + after - cost[a, c] - closing
+                best = int(np.argmax(gain))
+
+                if gain[best] > 1e-9:
+                    j = js[best]
+                    tour[i : j + 1] = tour[i : j + 1][::-1].copy()
+                    improved = True
+
+            if not improved:
+                break
+
+        return tour
+
+    def _Dwell(self, seconds):
+        # wait on the target, returning early if the sequence is stopped
+
+        deadline = time.monotonic() + seconds
+
+        while not self._stopRequested:
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0.0:
+                break
+
+            time.sleep(min(0.5, remaining))
+
+    # End of Private Helper Methods
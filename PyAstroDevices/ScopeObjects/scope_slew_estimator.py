@@ -0,0 +1,515 @@
+import math
+import threading as thread
+from collections import deque
+from time import monotonic
+
+import numpy as np
+from pubsub import pub
+
+from alpaca.telescope import AlignmentModes, PierSide
+
+
+class SlewTimeEstimator(object):
+    """
+    Class to learn how long the telescope takes to slew, from the slews that
+    the polling loop sees, and to predict the time for any other slew.
+
+    Each axis is modelled as accelerating at a constant rate up to its top
+    speed, coasting, then decelerating, so a move of d degrees takes
+
+    t = d / v + v / a          if d >= v^2 / a
+    t = 2 sqrt(d / a)          otherwise
+
+    The axes move together, so a slew takes as long as its slower axis plus
+    the settle time. A meridian flip of a German equatorial mount turns the
+    declination axis through the pole and the hour angle axis through 12
+    hours, which is included in the axis moves, and may add a fixed extra
+    time, e.g. for the mount to check its limits.
+
+    The speeds, accelerations and flip time are fitted by least squares to
+    the recorded slews. Until enough slews have been seen, the defaults are
+    used.
+    """
+
+    _MINIMUM_SLEWS = 4
+    _MAXIMUM_SLEWS = 200
+    _MINIMUM_MOVE = 0.1  # degrees, smaller moves are not slews
+
+    def __init__(self, telescopeManager, slewRate=3.0, acceleration=1.0):
+        """
+        Initializer method for the SlewTimeEstimator class
+
+        Positional arguments:
+        telescopeManager -- the TelescopeManager of the telescope
+
+        Keyword arguments:
+        slewRate         -- the default top speed of each axis, in degrees
+                            per second
+        acceleration     -- the default acceleration of each axis, in degrees
+                            per second per second
+        """
+        self._mgr = telescopeManager
+        self._lock = thread.Lock()
+        self._slews = deque(maxlen=self._MAXIMUM_SLEWS)
+        self._rates = [slewRate, slewRate]
+        self._accelerations = [acceleration, acceleration]
+        self._flipTime = 0.0
+        self._rmsError = float("nan")
+        self._isRunning = False
+        self._idle = None
+        self._slew = None
+        self._slewEnd = None
+
+    # Start of Public Properties
+
+    @property
+    def IsFitted(self):
+        return len(self._slews) >= self._MINIMUM_SLEWS
+
+    @property
+    def SlewCount(self):
+        return len(self._slews)
+
+    @property
+    def SlewRates(self):
+        # the top speeds of the hour angle and declination axes, in degrees
+        # per second
+
+        return tuple(self._rates)
+
+    @property
+    def Accelerations(self):
+        # the accelerations of the hour angle and declination axes, in
+        # degrees per second per second
+
+        return tuple(self._accelerations)
+
+    @property
+    def FlipTime(self):
+        # the extra time for a meridian flip, in seconds
+
+        return self._flipTime
+
+    @property
+    def RmsError(self):
+        # the RMS difference between the recorded and fitted slew times, in
+        # seconds
+
+        return self._rmsError
+
+    @property
+    def RemainingTime(self):
+        # the estimated time until the current slew finishes, in seconds,
+        # or NaN if the telescope is not slewing to a known target
+
+        slewEnd = self._slewEnd
+
+        if slewEnd is None:
+            return float("nan")
+
+        return max(0.0, slewEnd - monotonic())
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def Start(self):
+        """
+        Start recording the slews from the telescope's status updates
+        """
+        if self._isRunning:
+            return
+
+        self._idle = None
+        self._slew = None
+        self._slewEnd = None
+        self._isRunning = True
+        pub.subscribe(self._StatusListener, self._mgr.Topic("TelescopeStatusUpdate"))
+
+    def Stop(self):
+        """
+        Stop recording slews
+        """
+        if not self._isRunning:
+            return
+
+        pub.unsubscribe(self._StatusListener, self._mgr.Topic("TelescopeStatusUpdate"))
+        self._isRunning = False
+        self._slew = None
+        self._slewEnd = None
+
+    def SlewStarted(self, rightAscension, declination):
+        """
+        Note that the telescope has been told to slew to a target. This
+        gives the exact start time and destination of the slew, which the
+        status updates do not.
+
+        Positional arguments:
+        rightAscension -- the target right ascension, in hours
+        declination    -- the target declination, in degrees
+        """
+        if self._isRunning and self._idle is not None:
+            self._BeginSlew(monotonic(), rightAscension, declination)
+
+    def Predict(
+        self,
+        fromRightAscension,
+        fromDeclination,
+        toRightAscension,
+        toDeclination,
+        siderealTime,
+        flip=False,
+    ):
+        """
+        Estimate the time for slews. The positions may be arrays, and are
+        broadcast against each other.
+
+        Positional arguments:
+        fromRightAscension -- the starting right ascensions, in hours
+        fromDeclination    -- the starting declinations, in degrees
+        toRightAscension   -- the target right ascensions, in hours
+        toDeclination      -- the target declinations, in degrees
+        siderealTime       -- the local sidereal time, in hours
+
+        Keyword arguments:
+        flip               -- True, or an array of booleans, for the slews
+                              that include a meridian flip
+
+        Returns -- the estimated slew times, in seconds
+        """
+        haMove, decMove = self.GetAxisMoves(
+            siderealTime - np.asarray(fromRightAscension, dtype=float),
+            fromDeclination,
+            siderealTime - np.asarray(toRightAscension, dtype=float),
+            toDeclination,
+            flip,
+        )
+
+        return self._PredictMoves(haMove, decMove, np.asarray(flip, dtype=float))
+
+    def PredictFromCurrent(self, rightAscension, declination):
+        """
+        Estimate the time to slew from the telescope's current position
+
+        Positional arguments:
+        rightAscension -- the target right ascension, in hours
+        declination    -- the target declination, in degrees
+
+        Returns -- the estimated slew time, in seconds, or NaN if the
+                   position of the telescope is not known
+        """
+        sts = self._mgr.Status
+
+        if sts is None or not math.isfinite(sts.HourAngle):
+            return float("nan")
+
+        lst = sts.SiderealTime
+        flip = self._IsFlip(sts.SideOfPier, lst - rightAscension)
+
+        duration = self.Predict(
+            sts.RightAscension, sts.Declination, rightAscension, declination, lst, flip
+        )
+
+        return float(duration)
+
+    def GetAxisMoves(
+        self, fromHourAngle, fromDeclination, toHourAngle, toDeclination, flip=False
+    ):
+        """
+        Get the distances that the axes turn for slews
+
+        Positional arguments:
+        fromHourAngle   -- the starting hour angles, in hours
+        fromDeclination -- the starting declinations, in degrees
+        toHourAngle     -- the target hour angles, in hours
+        toDeclination   -- the target declinations, in degrees
+
+        Keyword arguments:
+        flip            -- True, or an array of booleans, for the slews that
+                           include a meridian flip
+
+        Returns -- a tuple of the hour angle and declination axis moves, in
+                   degrees
+        """
+        fromDec = np.asarray(fromDeclination, dtype=float)
+        toDec = np.asarray(toDeclination, dtype=float)
+        flip = np.asarray(flip, dtype=bool)
+
+        # a flip turns the hour angle axis half a turn further, and the
+        # declination axis through the pole on the observer's side
+
+        dHa = np.asarray(toHourAngle, dtype=float) - fromHourAngle
+        dHa = np.where(flip, dHa + 12.0, dHa)
+        haMove = np.abs((dHa + 12.0) % 24.0 - 12.0) * 15.0
+
+        pole = -90.0 if self._IsSouthern() else 90.0
+        throughPole = np.abs(pole - fromDec) + np.abs(pole - toDec)
+        decMove = np.where(flip, throughPole, np.abs(toDec - fromDec))
+
+        return haMove, decMove
+
+    def Fit(self):
+        """
+        Fit the axis speeds, accelerations and flip time to the recorded
+        slews
+
+        Returns -- True if there were enough slews to fit
+        """
+        with self._lock:
+            slews = np.array(self._slews, dtype=float).reshape(-1, 4)
+
+        if len(slews) < self._MINIMUM_SLEWS:
+            return False
+
+        haMove, decMove, flip, duration = slews.T
+        moves = (haMove, decMove)
+        times = duration - self._GetSettleTime()
+        rates = list(self._rates)
+        accelerations = list(self._accelerations)
+        flipTime = self._flipTime
+
+        # The slower axis sets the time, which depends on the fit. Fit the
+        # coasting part of the profile, which is linear in the move, to the
+        # slews that each axis limits, then check which axis that is again.
+
+        for _ in range(5):
+            axisTimes = [
+                self._GetAxisTime(moves[i], rates[i], accelerations[i])
+                for i in range(2)
+            ]
+            limiting = [axisTimes[0] >= axisTimes[1], axisTimes[0] < axisTimes[1]]
+            columns = []
+            axes = []
+            used = np.zeros(len(slews), dtype=bool)
+
+            for i in range(2):
+                coasting = moves[i] >= rates[i] ** 2 / accelerations[i]
+                coasting &= limiting[i]
+
+                if coasting.sum() >= 2:
+                    columns += [moves[i] * coasting, coasting.astype(float)]
+                    axes.append(i)
+                    used |= coasting
+
+            if not axes:
+                break
+
+            useFlip = flip[used].any()
+
+            if useFlip:
+                columns.append(flip)
+
+            design = np.column_stack(columns)[used]
+            solution, _, _, _ = np.linalg.lstsq(design, times[used], rcond=None)
+
+            for n, i in enumerate(axes):
+                slope, intercept = solution[2 * n], solution[2 * n + 1]
+
+                # only accept a physically sensible speed and acceleration
+
+                if slope > 0.0 and intercept > 0.0:
+                    rates[i] = float(1.0 / slope)
+                    accelerations[i] = float(rates[i] / intercept)
+
+            if useFlip:
+                flipTime = max(0.0, float(solution[-1]))
+
+        predicted = self._PredictMoves(
+            haMove, decMove, flip, rates, accelerations, flipTime
+        )
+        rmsError = float(np.sqrt(np.mean((duration - predicted) ** 2)))
+
+        with self._lock:
+            self._rates = rates
+            self._accelerations = accelerations
+            self._flipTime = flipTime
+            self._rmsError = rmsError
+
+        return True
+
+    def ClearSlews(self):
+        """
+        Discard the recorded slews. The fitted values are kept until more
+        slews are fitted.
+        """
+        with self._lock:
+            self._slews.clear()
+
+    def SaveSlews(self, filename):
+        """
+        Write the recorded slews to a CSV file
+
+        Positional arguments:
+        filename -- the name of the file
+        """
+        with self._lock:
+            slews = np.array(self._slews, dtype=float).reshape(-1, 4)
+
+        header = "HourAngleMove,DeclinationMove,Flip,Duration"
+        np.savetxt(filename, slews, fmt="%.4f", delimiter=",", header=header)
+
+    def LoadSlews(self, filename):
+        """
+        Add the slews from a CSV file that was written by SaveSlews, and fit
+        the model
+
+        Positional arguments:
+        filename -- the name of the file
+
+        Returns -- the number of slews that were added
+        """
+        slews = np.loadtxt(filename, delimiter=",", ndmin=2)
+
+        with self._lock:
+            self._slews.extend(tuple(float(v) for v in s) for s in slews)
+
+        self.Fit()
+
+        return len(slews)
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    def _StatusListener(self, sts):
+        # watch for the start and end of each slew
+
+        now = monotonic()
+
+        if not sts.Connected or not math.isfinite(sts.HourAngle):
+            self._idle = None
+            self._slew = None
+            self._slewEnd = None
+
+            return
+
+        if sts.Slewing:
+            if self._slew is None and self._idle is not None:
+                # the slew was not started by the manager, so it began at
+                # some time since the last status update
+
+                self._BeginSlew(
+                    (self._idle[0] + now) / 2.0,
+                    sts.TargetRightAscension,
+                    sts.TargetDeclination,
+                )
+
+            if self._slew is not None:
+                self._slew["lastSlewing"] = now
+        else:
+            if self._slew is not None:
+                self._EndSlew(sts, now)
+
+            self._idle = (now, sts.HourAngle, sts.Declination, sts.SideOfPier)
+
+    def _BeginSlew(self, startTime, rightAscension, declination):
+        # remember where a slew started, and predict when it will finish
+
+        _, hourAngle, dec, side = self._idle
+        self._slew = {
+            "start": startTime,
+            "lastSlewing": startTime,
+            "hourAngle": hourAngle,
+            "declination": dec,
+            "side": side,
+        }
+        self._slewEnd = None
+
+        if math.isfinite(rightAscension) and math.isfinite(declination):
+            lst = self._mgr.Status.SiderealTime
+            targetHa = lst - rightAscension
+            flip = self._IsFlip(side, targetHa)
+            haMove, decMove = self.GetAxisMoves(
+                hourAngle, dec, targetHa, declination, flip
+            )
+            duration = float(self._PredictMoves(haMove, decMove, float(flip)))
+            self._slewEnd = startTime + duration
+
+    def _EndSlew(self, sts, now):
+        # record a finished slew. It finished at some time since the last
+        # status that showed it slewing.
+
+        slew = self._slew
+        self._slew = None
+        self._slewEnd = None
+
+        endTime = (slew["lastSlewing"] + now) / 2.0
+        duration = endTime - slew["start"]
+        flip = self._IsKnownSide(slew["side"]) and self._IsKnownSide(sts.SideOfPier)
+        flip = flip and slew["side"] != sts.SideOfPier
+        haMove, decMove = self.GetAxisMoves(
+            slew["hourAngle"], slew["declination"], sts.HourAngle, sts.Declination, flip
+        )
+
+        if max(float(haMove), float(decMove)) < self._MINIMUM_MOVE:
+            return
+
+        with self._lock:
+            self._slews.append((float(haMove), float(decMove), float(flip), duration))
+
+        self.Fit()
+
+    def _PredictMoves(
+        self, haMove, decMove, flip, rates=None, accelerations=None, flipTime=None
+    ):
+        # the slew time for axis moves, from the fitted or the given values
+
+        rates = self._rates if rates is None else rates
+        accelerations = self._accelerations if accelerations is None else accelerations
+        flipTime = self._flipTime if flipTime is None else flipTime
+
+        haTime = self._GetAxisTime(haMove, rates[0], accelerations[0])
+        decTime = self._GetAxisTime(decMove, rates[1], accelerations[1])
+
+        return np.maximum(haTime, decTime) + self._GetSettleTime() + flipTime * flip
+
+    def _GetAxisTime(self, move, rate, acceleration):
+        # the time for one axis to turn through a move, in seconds
+
+        move = np.asarray(move, dtype=float)
+        coasting = move / rate + rate / acceleration
+        accelerating = 2.0 * np.sqrt(move / acceleration)
+
+        return np.where(move >= rate**2 / acceleration, coasting, accelerating)
+
+    def _GetSettleTime(self):
+        parms = self._mgr.Parameters
+
+        if parms is None:
+            return 0.0
+
+        return float(parms.SlewSettleTime)
+
+    def _IsGermanEquatorial(self):
+        parms = self._mgr.Parameters
+
+        if parms is None:
+            return False
+
+        return parms.AlignmentMode == AlignmentModes.algGermanPolar
+
+    def _IsSouthern(self):
+        parms = self._mgr.Parameters
+
+        if parms is None:
+            return False
+
+        return parms.SiteLatitude < 0.0
+
+    def _IsKnownSide(self, side):
+        return side in (PierSide.pierEast, PierSide.pierWest)
+
+    def _IsFlip(self, side, targetHourAngle):
+        # check whether a slew to a target will flip a German equatorial
+        # mount. It points east of the meridian from the west side of the
+        # pier.
+
+        if not self._IsGermanEquatorial() or not self._IsKnownSide(side):
+            return False
+
+        targetHourAngle = (targetHourAngle + 12.0) % 24.0 - 12.0
+        targetSide = PierSide.pierWest if targetHourAngle < 0.0 else PierSide.pierEast
+
+        return side != targetSide
+
+    # End of Private Helper Methods
@@ -0,0 +1,313 @@
+import os
+import re
+
+import numpy as np
+
+from exception_formatter import ExceptionFormatter
+from error_reporter import ErrorReporter
+
+
+class HorizonMask(object):
+    """
+    Class to contain the local horizon, the lowest usable altitude in each
+    direction, e.g. above trees and buildings.
+
+    The horizon is given as a list of azimuth and altitude points, between
+    which it is interpolated. It is compiled into a table with an entry for
+    each tenth of a degree of azimuth, so the limit in any direction is a
+    single array lookup. Each entry holds the highest altitude within its
+    interval, so the table never allows a position below the horizon.
+    """
+
+    _STEPS_PER_DEGREE = 10
+
+    def __init__(self, points):
+        """
+        Initializer method for the HorizonMask class
+
+        Positional arguments:
+        points -- a list of (azimuth, altitude) tuples, in degrees
+        """
+        if len(points) == 0:
+            raise ValueError("The horizon has no points.")
+
+        points = sorted((az % 360.0, alt) for az, alt in points)
+        azimuths = np.array([p[0] for p in points])
+        altitudes = np.array([p[1] for p in points])
+
+        # the altitude at each edge of every table interval, interpolated
+        # around the full circle
+
+        count = 360 * self._STEPS_PER_DEGREE
+        edges = np.arange(count + 1) / self._STEPS_PER_DEGREE
+        atEdges = np.interp(edges, azimuths, altitudes, period=360.0)
+        table = np.maximum(atEdges[:-1], atEdges[1:])
+
+        # a point inside an interval may be higher than both its edges
+
+        inside = (azimuths * self._STEPS_PER_DEGREE).astype(int) % count
+        np.maximum.at(table, inside, altitudes)
+
+        self._points = points
+        self._table = table
+
+    @classmethod
+    def Load(cls, filename):
+        """
+        Read a horizon file, with an azimuth and an altitude in degrees on
+        each line, separated by spaces or a comma. Blank lines and lines
+        that start with # are ignored.
+
+        Positional arguments:
+        filename -- the name of the horizon file
+
+        Returns -- a HorizonMask
+        """
+        points = []
+
+        with open(filename) as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+
+                if line == "" or line.startswith("#"):
+                    continue
+
+                fields = re.split(r"[\s,;]+", line)
+
+                try:
+                    points.append((float(fields[0]), float(fields[1])))
+                except (IndexError, ValueError):
+                    msg = f"Line {number} of {filename} is not an azimuth and "
+                    msg += "an altitude."
+                    raise ValueError(msg)
+
+        return cls(points)
+
+    @property
+    def Points(self):
+        return list(self._points)
+
+    def GetMinimumAltitude(self, azimuth):
+        """
+        Get the lowest usable altitude in some directions
+
+        Positional arguments:
+        azimuth -- the azimuths, in degrees
+
+        Returns -- the altitudes of the horizon, in degrees
+        """
+        scaled = np.asarray(azimuth, dtype=float) * self._STEPS_PER_DEGREE
+        index = np.floor(scaled).astype(int) % len(self._table)
+
+        return self._table[index]
+
+
+class SlewLimits(object):
+    """
+    Class to check slew targets against the limits of a telescope before
+    the slew is started, so bad targets are rejected at once rather than by
+    the driver, or by a slew that times out.
+
+    A target must be above the horizon mask, if any, and above the minimum
+    altitude. Its hour angle must be within the east and west limits, which
+    keep a German equatorial mount clear of its pier. Whole target lists
+    can be checked in a single call.
+    """
+
+    def __init__(
+        self,
+        transform=None,
+        horizon=None,
+        minimumAltitude=0.0,
+        hourAngleEast=12.0,
+        hourAngleWest=12.0,
+    ):
+        """
+        Initializer method for the SlewLimits class
+
+        Keyword arguments:
+        transform       -- the site's CoordinateTransform, or None if the
+                           site is not known and altitudes cannot be checked
+        horizon         -- a HorizonMask, or None for a flat horizon
+        minimumAltitude -- the lowest altitude for any slew, in degrees
+        hourAngleEast   -- the furthest hour angle east of the meridian, in
+                           hours
+        hourAngleWest   -- the furthest hour angle west of the meridian, in
+                           hours
+        """
+        self._transform = transform
+        self._horizon = horizon
+        self._minimumAltitude = minimumAltitude
+        self._hourAngleEast = hourAngleEast
+        self._hourAngleWest = hourAngleWest
+
+    @classmethod
+    def FromSettings(cls, limits, transform=None):
+        """
+        Create the limits from a telescope's SLEW_LIMITS settings. A relative
+        HORIZON_FILE is in the application folder. A horizon file that
+        cannot be read is reported, and a flat horizon is used instead, so
+        the telescope can still be connected.
+
+        Positional arguments:
+        limits    -- the dictionary of slew limit settings
+
+        Keyword arguments:
+        transform -- the site's CoordinateTransform, or None
+
+        Returns -- the SlewLimits
+        """
+        horizon = None
+        horizonFile = limits.get("HORIZON_FILE", "")
+
+        if horizonFile:
+            horizon = cls._LoadHorizon(horizonFile)
+
+        return cls(
+            transform,
+            horizon,
+            limits.get("MINIMUM_ALTITUDE", 0.0),
+            limits.get("HOUR_ANGLE_EAST", 12.0),
+            limits.get("HOUR_ANGLE_WEST", 12.0),
+        )
+
+    # Start of Public Properties
+
+    @property
+    def Horizon(self):
+        return self._horizon
+
+    @property
+    def MinimumAltitude(self):
+        return self._minimumAltitude
+
+    @property
+    def HourAngleEast(self):
+        return self._hourAngleEast
+
+    @property
+    def HourAngleWest(self):
+        return self._hourAngleWest
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    def CheckAltAz(self, azimuth, altitude):
+        """
+        Check which horizontal positions are above the horizon
+
+        Positional arguments:
+        azimuth  -- the azimuths, in degrees
+        altitude -- the altitudes, in degrees
+
+        Returns -- True, or an array of booleans, for the allowed positions
+        """
+        altitude = np.asarray(altitude, dtype=float)
+        allowed = altitude >= self._minimumAltitude
+
+        if self._horizon is not None:
+            allowed &= altitude >= self._horizon.GetMinimumAltitude(azimuth)
+
+        return allowed
+
+    def Check(self, rightAscension, declination, siderealTime):
+        """
+        Check which equatorial positions are within the limits
+
+        Positional arguments:
+        rightAscension -- the right ascensions, in hours
+        declination    -- the declinations, in degrees
+        siderealTime   -- the local sidereal time, in hours
+
+        Returns -- True, or an array of booleans, for the allowed positions
+        """
+        allowed = self._CheckHourAngle(rightAscension, siderealTime)
+
+        if self._transform is not None:
+            azimuth, altitude = self._transform.EquatorialToHorizontal(
+                rightAscension, declination, siderealTime
+            )
+            allowed &= self.CheckAltAz(azimuth, altitude)
+
+        return allowed
+
+    def Validate(self, rightAscension, declination, siderealTime):
+        """
+        Check a single equatorial target and explain why it is not allowed
+
+        Positional arguments:
+        rightAscension -- the right ascension, in hours
+        declination    -- the declination, in degrees
+        siderealTime   -- the local sidereal time, in hours
+
+        Returns -- None if the target is allowed, otherwise the reason
+        """
+        if not self._CheckHourAngle(rightAscension, siderealTime):
+            return "The target is beyond the hour angle limits of the mount."
+
+        if self._transform is not None:
+            azimuth, altitude = self._transform.EquatorialToHorizontal(
+                rightAscension, declination, siderealTime
+            )
+
+            return self.ValidateAltAz(azimuth, altitude)
+
+        return None
+
+    def ValidateAltAz(self, azimuth, altitude):
+        """
+        Check a single horizontal target and explain why it is not allowed
+
+        Positional arguments:
+        azimuth  -- the azimuth, in degrees
+        altitude -- the altitude, in degrees
+
+        Returns -- None if the target is allowed, otherwise the reason
+        """
+        if self.CheckAltAz(azimuth, altitude):
+            return None
+
+        limit = self._minimumAltitude
+
+        if self._horizon is not None:
+            limit = max(limit, float(self._horizon.GetMinimumAltitude(azimuth)))
+
+        msg = f"The target altitude of {float(altitude):.1f} degrees is below "
+        msg += f"the limit of {limit:.1f} degrees at azimuth "
+        msg += f"{float(azimuth):.1f} degrees."
+
+        return msg
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    @classmethod
+    def _LoadHorizon(cls, horizonFile):
+        # read the horizon file, or report it and return None for a flat
+        # horizon
+
+        if not os.path.isabs(horizonFile):
+            appFolder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            horizonFile = os.path.join(appFolder, horizonFile)
+
+        try:
+            return HorizonMask.Load(horizonFile)
+        except (OSError, ValueError) as xcp:
+            msg = f"Unable to read the horizon file {horizonFile}. A flat "
+            msg += "horizon is used instead. Details follow:\r\n\r\n"
+            msg += ExceptionFormatter.GetInstance().Format(xcp)
+            ErrorReporter.GetInstance().Report("Slew Limits Error", msg, xcp)
+
+        return None
+
+    def _CheckHourAngle(self, rightAscension, siderealTime):
+        # check the hour angles against the east and west limits
+
+        hourAngle = np.asarray(siderealTime) - np.asarray(rightAscension)
+        hourAngle = (hourAngle + 12.0) % 24.0 - 12.0
+
+        return (hourAngle >= -self._hourAngleEast) & (hourAngle <= self._hourAngleWest)
+
+    # End of Private Helper Methods
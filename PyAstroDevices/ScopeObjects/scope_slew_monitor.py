@@ -0,0 +1,131 @@
+import threading as thread
+from time import monotonic
+from concurrent.futures import Future, InvalidStateError
+
+
+class SlewMonitor(object):
+    """
+    Class to track the completion of the telescope motions that were started
+    by the TelescopeManager. Each motion is represented by a
+    concurrent.futures.Future that is resolved by the polling loop, so that
+    scripts and sequences can wait for a slew to finish, or chain the next
+    move to it, without watching the status updates themselves.
+
+    A future is resolved with the status that shows the motion has
+    finished. It fails with a TimeoutError if the motion takes too long,
+    and is cancelled if the motion is aborted or the telescope is
+    disconnected.
+
+    Scripts can wait on a future directly, or in asyncio with
+    asyncio.wrap_future.
+    """
+
+    SLEW = "slew"
+    PARK = "park"
+    HOME = "home"
+
+    _DEFAULT_TIMEOUT = 300.0  # seconds
+
+    def __init__(self):
+        # the instance initializer
+
+        self._lock = thread.Lock()
+        self._motions = []
+
+    @property
+    def IsBusy(self):
+        return len(self._motions) > 0
+
+    def Add(self, kind, timeout=None):
+        """
+        Start tracking a motion that has just been started
+
+        Positional arguments:
+        kind    -- the kind of motion, SLEW, PARK or HOME
+
+        Keyword arguments:
+        timeout -- the longest time that the motion may take, in seconds
+
+        Returns -- the Future for the motion
+        """
+        if timeout is None:
+            timeout = self._DEFAULT_TIMEOUT
+
+        future = Future()
+        startTime = monotonic()
+
+        with self._lock:
+            self._motions.append((kind, startTime, startTime + timeout, future))
+
+        return future
+
+    def StatusUpdated(self, status, readTime):
+        """
+        Resolve the motions that a fresh status shows to be finished. Only a
+        status that was read after a motion was started can finish it.
+
+        Positional arguments:
+        status   -- the TelescopeStatus
+        readTime -- the monotonic time at which the status read was begun
+        """
+        now = monotonic()
+        finished = []
+        expired = []
+
+        with self._lock:
+            remaining = []
+
+            for motion in self._motions:
+                kind, startTime, deadline, future = motion
+
+                if future.done():
+                    # the caller has cancelled the future, so stop tracking it
+
+                    continue
+
+                if readTime >= startTime and self._IsFinished(kind, status):
+                    finished.append(future)
+                elif now > deadline:
+                    expired.append((kind, future))
+                else:
+                    remaining.append(motion)
+
+            self._motions = remaining
+
+        for future in finished:
+            self._Resolve(future.set_result, status)
+
+        for kind, future in expired:
+            xcp = TimeoutError(f"The {kind} did not finish in time.")
+            self._Resolve(future.set_exception, xcp)
+
+    def CancelAll(self):
+        """
+        Cancel all the tracked motions, e.g. when a slew is aborted
+        """
+        with self._lock:
+            motions = self._motions
+            self._motions = []
+
+        for _, _, _, future in motions:
+            future.cancel()
+
+    def _Resolve(self, setter, value):
+        # resolve a future, which the caller may have cancelled in the
+        # meantime. This is called from the polling loop, so it must never
+        # raise.
+
+        try:
+            setter(value)
+        except InvalidStateError:
+            pass
+
+    def _IsFinished(self, kind, status):
+        # check whether a status shows that a kind of motion has finished
+
+        if kind == self.PARK:
+            return status.AtPark
+        elif kind == self.HOME:
+            return status.AtHome and not status.Slewing
+
+        return not status.Slewing
@@ -1,4 +1,11 @@
+import math
+
 from alpaca.telescope import *  # Multiple Classes including Enumerations
+from alpaca.exceptions import (
+    InvalidOperationException,
+    NotImplementedException,
+    ValueNotSetException,
+)
 
 
 class TelescopeStatus:
@@ -8,7 +15,24 @@ class TelescopeStatus:
     create an empty instance, or one with values read from the driver.
     """
 
-    def __init__(self, telescope=None):
+    def __init__(self, telescope=None, unsupported=None, notSet=None):
+        # Initialize the object instance
+        #
+        # unsupported -- an optional set of the names of the properties that
+        #                are not to be read. A target coordinate that the
+        #                driver does not implement is added to the set, so
+        #                that later instances do not try again.
+        # notSet      -- an optional set of the names of the target
+        #                coordinates that have not been set. They are added
+        #                to the set and not read again until the owner
+        #                removes them, e.g. when a slew starts.
+
+        if unsupported is None:
+            unsupported = set()
+
+        if notSet is None:
+            notSet = set()
+
         if telescope:
             # populate this instance with values read from the telescope driver
 
@@ -38,15 +62,12 @@ class TelescopeStatus:
             # reading the target coordinates before they have been set will
             # raise an exception
 
-            try:
-                self._targetDeclination = telescope.TargetDeclination
-            except:
-                self._targetDeclination = float("nan")
-
-            try:
-                self._targetRightAscension = telescope.TargetRightAscension
-            except:
-                self._targetRightAscension = float("nan")
+            self._targetDeclination = self._ReadTarget(
+                telescope, "TargetDeclination", unsupported, notSet
+            )
+            self._targetRightAscension = self._ReadTarget(
+                telescope, "TargetRightAscension", unsupported, notSet
+            )
 
             self._tracking = telescope.Tracking
             self._trackingRate = telescope.TrackingRate
@@ -169,6 +190,93 @@ class TelescopeStatus:
     def IsCounterWeightUp(self):
         return self._isCwUp
 
+    def ToDict(self):
+        """
+        Get the status values, e.g. for sending to another process
+
+        Returns -- a dictionary of the status property values
+        """
+        return {
+            "Altitude": self._altitude,
+            "AtHome": self._atHome,
+            "AtPark": self._atPark,
+            "Azimuth": self._azimuth,
+            "Connected": self._connected,
+            "Declination": self._declination,
+            "DeclinationRate": self._declinationRate,
+            "GuideRateDeclination": self._guideRateDeclination,
+            "GuideRateRightAscension": self._guideRateRightAscension,
+            "IsPulseGuiding": self._isPulseGuiding,
+            "RightAscension": self._rightAscension,
+            "RightAscensionRate": self._rightAscensionRate,
+            "SideOfPier": int(self._sideOfPier),
+            "SiderealTime": self._siderealTime,
+            "Slewing": self._slewing,
+            "TargetDeclination": self._targetDeclination,
+            "TargetRightAscension": self._targetRightAscension,
+            "Tracking": self._tracking,
+            "TrackingRate": int(self._trackingRate),
+            "HourAngle": self._hourAngle,
+            "IsCounterWeightUp": self._isCwUp,
+        }
+
+    def CorrectPosition(self, correct):
+        """
+        Replace the position and the target that the driver reported with
+        the corrected ones, e.g. from a pointing model, and recalculate the
+        hour angle. The altitude and azimuth are left as they were read.
+
+        Positional arguments:
+        correct -- a function that takes the right ascension, declination,
+                   sidereal time and side of the pier, and returns the
+                   corrected right ascension and declination
+        """
+        if math.isfinite(self._rightAscension) and math.isfinite(self._declination):
+            self._rightAscension, self._declination = correct(
+                self._rightAscension,
+                self._declination,
+                self._siderealTime,
+                self._sideOfPier,
+            )
+            self._hourAngle = self._CalculateHourAngle(
+                self._siderealTime, self._rightAscension
+            )
+            self._isCwUp = self._CalculateCounterWeightUp(
+                self._sideOfPier, self._hourAngle
+            )
+
+        ra = self._targetRightAscension
+        dec = self._targetDeclination
+
+        if math.isfinite(ra) and math.isfinite(dec):
+            self._targetRightAscension, self._targetDeclination = correct(
+                ra, dec, self._siderealTime, self._sideOfPier
+            )
+
+    def _ReadTarget(self, telescope, name, unsupported, notSet):
+        # read a target coordinate, unless it is known to be unavailable
+
+        if name in unsupported or name in notSet:
+            return float("nan")
+
+        try:
+            return getattr(telescope, name)
+        except NotImplementedException:
+            # the driver does not support the target
+
+            unsupported.add(name)
+        except (ValueNotSetException, InvalidOperationException):
+            # the target has not been set, so stop reading it until the
+            # owner expects that it may have been
+
+            notSet.add(name)
+        except Exception:
+            # e.g. a network timeout, so try again on the next update
+
+            pass
+
+        return float("nan")
+
     def _CalculateHourAngle(self, siderealTime, ra):
         retval = siderealTime - ra
 
@@ -0,0 +1,348 @@
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+class CoordinateTransform(object):
+    """
+    Class to convert between equatorial (RA/Dec) and horizontal (Az/Alt)
+    coordinates at the telescope's site, without asking the driver.
+
+    All the methods take scalars or NumPy arrays, so thousands of targets
+    can be converted in a single call. Right ascension, hour angle and
+    sidereal time are in hours; declination, azimuth and altitude are in
+    degrees. Azimuth is measured from north through east.
+
+    The conversions are geometric. The equatorial coordinates are taken to
+    be in the mount's own system, so precession and nutation are not
+    applied. Atmospheric refraction can optionally be included, in which
+    case the altitudes are the apparent ones.
+
+    Catalog coordinates can be precessed between J2000 and the equinox of
+    date (JNow), for mounts that work in the equinox of date. Nutation and
+    aberration, which are under a minute of arc, are not applied.
+    """
+
+    _J2000 = 2451545.0  # Julian date of the J2000.0 epoch
+    _UNIX_EPOCH = 2440587.5  # Julian date of 1970-01-01 00:00 UTC
+    _DAYS_PER_CENTURY = 36525.0
+
+    def __init__(
+        self,
+        latitude,
+        longitude,
+        refraction=False,
+        pressure=1010.0,
+        temperature=10.0,
+    ):
+        """
+        Initializer method for the CoordinateTransform class
+
+        Positional arguments:
+        latitude    -- the site latitude, in degrees north
+        longitude   -- the site longitude, in degrees east
+
+        Keyword arguments:
+        refraction  -- if True, include atmospheric refraction
+        pressure    -- the air pressure for refraction, in hPa
+        temperature -- the air temperature for refraction, in degrees C
+        """
+        if not (math.isfinite(latitude) and math.isfinite(longitude)):
+            raise ValueError("The site latitude and longitude are not known.")
+
+        self._latitude = latitude
+        self._longitude = longitude
+        self._refraction = refraction
+        self._pressure = pressure
+        self._temperature = temperature
+        self._sinLatitude = math.sin(math.radians(latitude))
+        self._cosLatitude = math.cos(math.radians(latitude))
+
+    @classmethod
+    def FromParameters(cls, parameters, refraction=False):
+        """
+        Create a transform for the site of a telescope
+
+        Positional arguments:
+        parameters -- the TelescopeParameters of the telescope
+
+        Keyword arguments:
+        refraction -- if True, include atmospheric refraction
+
+        Returns -- a CoordinateTransform
+        """
+        return cls(parameters.SiteLatitude, parameters.SiteLongitude, refraction)
+
+    # Start of Public Properties
+
+    @property
+    def Latitude(self):
+        return self._latitude
+
+    @property
+    def Longitude(self):
+        return self._longitude
+
+    @property
+    def Refraction(self):
+        return self._refraction
+
+    @Refraction.setter
+    def Refraction(self, value):
+        self._refraction = value
+
+    # End of Public Properties
+
+    # Start of Public Methods
+
+    @classmethod
+    def JulianDate(cls, when=None):
+        """
+        Get the Julian date of a time
+
+        Keyword arguments:
+        when -- a datetime, or Unix times in seconds, or None for now
+
+        Returns -- the Julian date
+        """
+        if when is None:
+            when = datetime.now(timezone.utc)
+
+        if isinstance(when, datetime):
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=timezone.utc)
+
+            when = when.timestamp()
+
+        return np.asarray(when, dtype=float) / 86400.0 + cls._UNIX_EPOCH
+
+    def LocalSiderealTime(self, when=None):
+        """
+        Get the local mean sidereal time at the site
+
+        Keyword arguments:
+        when -- a datetime, or Unix times in seconds, or None for now
+
+        Returns -- the local sidereal time, in hours
+        """
+        days = self.JulianDate(when) - self._J2000
+        gmst = 18.697374558 + 24.06570982441908 * days
+
+        return (gmst + self._longitude / 15.0) % 24.0
+
+    def HourAngle(self, rightAscension, siderealTime):
+        """
+        Get the hour angle of a right ascension
+
+        Positional arguments:
+        rightAscension -- the right ascension, in hours
+        siderealTime   -- the local sidereal time, in hours
+
+        Returns -- the hour angle from -12 to 12 hours, negative to the east
+        """
+        hourAngle = np.asarray(siderealTime) - np.asarray(rightAscension)
+
+        return (hourAngle + 12.0) % 24.0 - 12.0
+
+    def EquatorialToHorizontal(self, rightAscension, declination, siderealTime):
+        """
+        Convert equatorial coordinates to horizontal coordinates
+
+        Positional arguments:
+        rightAscension -- the right ascension, in hours
+        declination    -- the declination, in degrees
+        siderealTime   -- the local sidereal time, in hours
+
+        Returns -- a tuple of the azimuth and altitude, in degrees
+        """
+        ha = np.radians(self.HourAngle(rightAscension, siderealTime) * 15.0)
+        dec = np.radians(np.asarray(declination, dtype=float))
+
+        sinDec = np.sin(dec)
+        cosDec = np.cos(dec)
+        cosHa = np.cos(ha)
+
+        sinAlt = sinDec * self._sinLatitude + cosDec * self._cosLatitude * cosHa
+        altitude = np.degrees(np.arcsin(np.clip(sinAlt, -1.0, 1.0)))
+
+        y = -cosDec * np.sin(ha)
+        x = sinDec * self._cosLatitude - cosDec * self._sinLatitude * cosHa
+        azimuth = np.degrees(np.arctan2(y, x)) % 360.0
+
+        if self._refraction:
+            altitude = altitude + self._RefractionOfTrue(altitude)
+
+        return azimuth, altitude
+
+    def HorizontalToEquatorial(self, azimuth, altitude, siderealTime):
+        """
+        Convert horizontal coordinates to equatorial coordinates
+
+        Positional arguments:
+        azimuth      -- the azimuth, in degrees
+        altitude     -- the altitude, in degrees
+        siderealTime -- the local sidereal time, in hours
+
+        Returns -- a tuple of the right ascension, in hours, and the
+                   declination, in degrees
+        """
+        altitude = np.asarray(altitude, dtype=float)
+
+        if self._refraction:
+            altitude = altitude - self._RefractionOfApparent(altitude)
+
+        az = np.radians(np.asarray(azimuth, dtype=float))
+        alt = np.radians(altitude)
+
+        sinAlt = np.sin(alt)
+        cosAlt = np.cos(alt)
+        cosAz = np.cos(az)
+
+        sinDec = sinAlt * self._sinLatitude + cosAlt * self._cosLatitude * cosAz
+        declination = np.degrees(np.arcsin(np.clip(sinDec, -1.0, 1.0)))
+
+        y = -np.sin(az) * cosAlt
+        x = sinAlt * self._cosLatitude - cosAlt * self._sinLatitude * cosAz
+        hourAngle = np.degrees(np.arctan2(y, x)) / 15.0
+        rightAscension = (np.asarray(siderealTime) - hourAngle) % 24.0
+
+        return rightAscension, declination
+
+    def IsAboveHorizon(self, rightAscension, declination, siderealTime, minimum=0.0):
+        """
+        Check which positions are above a minimum altitude
+
+        Positional arguments:
+        rightAscension -- the right ascension, in hours
+        declination    -- the declination, in degrees
+        siderealTime   -- the local sidereal time, in hours
+
+        Keyword arguments:
+        minimum        -- the lowest allowed altitude, in degrees
+
+        Returns -- True, or an array of booleans, for the positions that are
+                   above the minimum altitude
+        """
+        _, altitude = self.EquatorialToHorizontal(
+            rightAscension, declination, siderealTime
+        )
+
+        return altitude > minimum
+
+    @classmethod
+    def J2000ToJNow(cls, rightAscension, declination, when=None):
+        """
+        Precess J2000 coordinates to the equinox of date
+
+        Positional arguments:
+        rightAscension -- the J2000 right ascension, in hours
+        declination    -- the J2000 declination, in degrees
+
+        Keyword arguments:
+        when           -- a datetime, or a Unix time in seconds, or None for
+                          now
+
+        Returns -- a tuple of the right ascension, in hours, and the
+                   declination, in degrees, for the equinox of date
+        """
+        matrix = cls._PrecessionMatrix(when)
+
+        return cls._Rotate(matrix, rightAscension, declination)
+
+    @classmethod
+    def JNowToJ2000(cls, rightAscension, declination, when=None):
+        """
+        Precess coordinates for the equinox of date back to J2000
+
+        Positional arguments:
+        rightAscension -- the right ascension of date, in hours
+        declination    -- the declination of date, in degrees
+
+        Keyword arguments:
+        when           -- a datetime, or a Unix time in seconds, or None for
+                          now
+
+        Returns -- a tuple of the J2000 right ascension, in hours, and
+                   declination, in degrees
+        """
+        matrix = cls._PrecessionMatrix(when)
+
+        return cls._Rotate(matrix.T, rightAscension, declination)
+
+    # End of Public Methods
+
+    # Start of Private Helper Methods
+
+    @classmethod
+    def _PrecessionMatrix(cls, when):
+        # the IAU 1976 precession from J2000 to a date, as a rotation matrix
+        # (Meeus, Astronomical Algorithms, chapter 21)
+
+        t = float(cls.JulianDate(when) - cls._J2000) / cls._DAYS_PER_CENTURY
+        zeta = (2306.2181 + (0.30188 + 0.017998 * t) * t) * t
+        z = (2306.2181 + (1.09468 + 0.018203 * t) * t) * t
+        theta = (2004.3109 - (0.42665 + 0.041833 * t) * t) * t
+        zeta, z, theta = np.radians(np.array([zeta, z, theta]) / 3600.0)
+
+        return cls._RotationZ(-z) @ cls._RotationY(theta) @ cls._RotationZ(-zeta)
+
+    @staticmethod
+    def _RotationZ(angle):
+        # the rotation of the coordinate frame about the z axis
+
+        c, s = math.cos(angle), math.sin(angle)
+
+        return np.array([[c, s, 0.0], [-s, c, 0.0], [0.0, 0.0, 1.0]])
+
+    @staticmethod
+    def _RotationY(angle):
+        # the rotation of the coordinate frame about the y axis
+
+        c, s = math.cos(angle), math.sin(angle)
+
+        return np.array([[c, 0.0, -s], [0.0, 1.0, 0.0], [s, 0.0, c]])
+
+    @staticmethod
+    def _Rotate(matrix, rightAscension, declination):
+        # apply a rotation matrix to equatorial coordinates
+
+        ra = np.radians(np.asarray(rightAscension, dtype=float) * 15.0)
+        dec = np.radians(np.asarray(declination, dtype=float))
+        vector = np.array(
+            [np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)]
+        )
+        x, y, z = np.tensordot(matrix, vector, axes=1)
+
+        rightAscension = (np.degrees(np.arctan2(y, x)) / 15.0) % 24.0
+        declination = np.degrees(np.arcsin(np.clip(z, -1.0, 1.0)))
+
+        return rightAscension, declination
+
+    def _AtmosphereFactor(self):
+        # scale the standard refraction to the air pressure and temperature
+
+        return (self._pressure / 1010.0) * (283.0 / (273.0 + self._temperature))
+
+    def _RefractionOfTrue(self, altitude):
+        # the refraction, in degrees, at a true altitude (Saemundsson). No
+        # refraction is applied well below the horizon.
+
+        h = np.maximum(altitude, -1.0)
+        minutes = 1.02 / np.tan(np.radians(h + 10.3 / (h + 5.11)))
+
+        return np.where(altitude > -1.0, minutes / 60.0, 0.0) * self._AtmosphereFactor()
+
+    def _RefractionOfApparent(self, altitude):
+        # the refraction, in degrees, at an apparent altitude. The true
+        # altitude is found by iterating the formula for true altitudes, so
+        # that the two conversions are the inverse of each other.
+
+        trueAltitude = altitude
+
+        for _ in range(4):
+            trueAltitude = altitude - self._RefractionOfTrue(trueAltitude)
+
+        return altitude - trueAltitude
+
+    # End of Private Helper Methods
@@ -5,6 +5,7 @@ from tkinter import ttk
 from pubsub import pub
 
 from scope_capabilities import TelescopeCapabilities
+from device_topic import DeviceTopic
 
 
 class TelescopeCapabilitiesView(object):
@@ -13,10 +14,11 @@ class TelescopeCapabilitiesView(object):
     Telescope Capabilities tab page
     """
 
-    def __init__(self, parentFrame):
+    def __init__(self, parentFrame, deviceId=None):
         # instance initializer
 
         self._parent = parentFrame
+        self._deviceId = deviceId
 
         # create the variables that are bound to the U/I
 
@@ -49,7 +51,8 @@ class TelescopeCapabilitiesView(object):
 
         # create the capabilities update listener
 
-        pub.subscribe(self._CapsListener, "TelescopeCapabilitiesUpdate")
+        topic = DeviceTopic.Format("TelescopeCapabilitiesUpdate", self._deviceId)
+        pub.subscribe(self._CapsListener, topic)
 
     # Start of Public Properties and Methods
 
@@ -1,3 +1,4 @@
+import math
 import locale
 
 import tkinter as tk
@@ -12,6 +13,9 @@ from alpaca.telescope import *  # Multiple Classes including Enumerations
 from scope_status import TelescopeStatus
 from scope_mgr import TelescopeManager
 from scope_helpers import PierSideSwitch, Formatter, Validator
+from scope_catalog import ObjectCatalog
+from scope_transforms import CoordinateTransform
+from exception_formatter import ExceptionFormatter
 from float_entry_widget import FloatEntry
 from float_entry_widget import FloatEntry
 
@@ -72,18 +76,36 @@ class TelescopeDirectSlewView:
         self._primaryAxisTargetDisplay.set(bl)
         self._secondaryAxisTargetDisplay = tk.StringVar(master=None)
         self._secondaryAxisTargetDisplay.set(bl)
+        self._targetNameDisplay = tk.StringVar(master=None)
+        self._targetNameDisplay.set(bl)
+        self._pointingAtDisplay = tk.StringVar(master=None)
+        self._pointingAtDisplay.set(bl)
+        self._pointingModelDisplay = tk.StringVar(master=None)
+        self._pointingModelDisplay.set("on")
+        self._pointingPointsDisplay = tk.StringVar(master=None)
+        self._pointingPointsDisplay.set(bl)
+
+        # the object catalog is opened when it is first needed
+
+        self._catalog = None
+        self._catalogError = None
 
         self._CreateWidgets()
 
         self._status = TelescopeStatus()
+        self._parms = None
 
         # create for the messages that we need to listen for
 
-        pub.subscribe(self._StatusListener, "TelescopeStatusUpdate")
-        pub.subscribe(self._ParmsListener, "TelescopeParametersUpdate")
-        pub.subscribe(self._CapsListener, "TelescopeCapabilitiesUpdate")
-        pub.subscribe(self._ScopeDisconnectListener, "ScopeDisconnect")
-        pub.subscribe(self._DirectSlewSelectedListener, "DirectSlewActivated")
+        pub.subscribe(self._StatusListener, self._mgr.Topic("TelescopeStatusUpdate"))
+        pub.subscribe(self._ParmsListener, self._mgr.Topic("TelescopeParametersUpdate"))
+        pub.subscribe(
+            self._CapsListener, self._mgr.Topic("TelescopeCapabilitiesUpdate")
+        )
+        pub.subscribe(self._ScopeDisconnectListener, self._mgr.Topic("ScopeDisconnect"))
+        pub.subscribe(
+            self._DirectSlewSelectedListener, self._mgr.Topic("DirectSlewActivated")
+        )
 
     # Start of Public Properties and Methods
 
@@ -200,7 +222,7 @@ class TelescopeDirectSlewView:
         ttk.Label(
             labelsFrame,
             textvariable=self._slewingFlagDisplay,
-            width=7,
+            width=12,
             style="ValueText.TLabel",
         ).pack(side=tk.LEFT, padx=3)
         ttk.Label(
@@ -251,6 +273,9 @@ class TelescopeDirectSlewView:
         ttk.Button(
             slewButtonsFrame, text="Slew To Target", command=self._StartDirectSlew
         ).pack(side=tk.LEFT, padx=(6, 0))
+        ttk.Button(slewButtonsFrame, text="Sync", command=self._SyncToTarget).pack(
+            side=tk.LEFT, padx=(6, 0)
+        )
         image = Image.open("./assets/stop.png")
         image = image.resize((40, 40), Image.ANTIALIAS)
         self._stopIcon = ImageTk.PhotoImage(image)
@@ -265,6 +290,56 @@ class TelescopeDirectSlewView:
 
         slewButtonsFrame.grid(row=4, column=0, columnspan=2, pady=26)
 
+        # create the name lookup for the target coordinates and the display
+        # of the object that the telescope is pointing at
+
+        ttk.Label(scopeSlewFrame, text="Object Name:").grid(
+            row=5, column=0, sticky="e", padx=3
+        )
+        nameFrame = tk.Frame(scopeSlewFrame)
+        self._nameEntry = ttk.Combobox(
+            nameFrame, width=16, textvariable=self._targetNameDisplay
+        )
+        self._nameEntry.pack(side=tk.LEFT)
+        self._nameEntry.bind("<Return>", lambda event: self._FindTarget())
+        self._nameEntry.bind("<KeyRelease>", self._CompleteTargetName)
+        self._nameEntry.bind("<<ComboboxSelected>>", lambda event: self._FindTarget())
+        ttk.Button(nameFrame, text="Find", command=self._FindTarget).pack(
+            side=tk.LEFT, padx=(6, 0)
+        )
+        nameFrame.grid(row=5, column=1, sticky="w")
+        ttk.Label(scopeSlewFrame, text="Pointing At:").grid(
+            row=6, column=0, sticky="e", padx=3, pady=(14, 0)
+        )
+        ttk.Label(
+            scopeSlewFrame,
+            textvariable=self._pointingAtDisplay,
+            style="ValueText.TLabel",
+        ).grid(row=6, column=1, sticky="w", pady=(14, 0))
+
+        # create the controls for the pointing model that is fitted from
+        # the syncs
+
+        ttk.Label(scopeSlewFrame, text="Pointing Model:").grid(
+            row=7, column=0, sticky="e", padx=3, pady=(14, 0)
+        )
+        modelFrame = tk.Frame(scopeSlewFrame)
+        ttk.Checkbutton(
+            modelFrame,
+            text="On",
+            variable=self._pointingModelDisplay,
+            command=self._OnPointingModelToggle,
+            onvalue="on",
+            offvalue="off",
+        ).pack(side=tk.LEFT)
+        ttk.Label(modelFrame, textvariable=self._pointingPointsDisplay).pack(
+            side=tk.LEFT, padx=(6, 0)
+        )
+        ttk.Button(modelFrame, text="Clear", command=self._ClearPointingModel).pack(
+            side=tk.LEFT, padx=(6, 0)
+        )
+        modelFrame.grid(row=7, column=1, sticky="w", pady=(14, 0))
+
         # position the child frames into their grid cells.
 
         scopeStateFrame.grid(row=0, column=0, sticky="N", padx=4, pady=4)
@@ -317,6 +392,12 @@ class TelescopeDirectSlewView:
 
         if sts.Slewing:
             text = "Slewing"
+            remaining = self._mgr.SlewEstimator.RemainingTime
+
+            # count down to the estimated end of the slew
+
+            if not math.isnan(remaining):
+                text = f"Slewing {remaining:.0f}s"
 
         self._slewingFlagDisplay.set(text)
 
@@ -346,6 +427,9 @@ class TelescopeDirectSlewView:
             self._secondaryAxisNameDisplay.set("Target Altitude:")
             self._secondaryAxisUnitsDisplay.set("(degrees)")
 
+        self._pointingAtDisplay.set(self._GetPointingAtText(sts))
+        self._UpdatePointingModelDisplay()
+
     def _ScopeDisconnectListener(self):
         # handle disconnects from the device
         self._isConnectedDisplay.set("Not Connected")
@@ -432,6 +516,192 @@ class TelescopeDirectSlewView:
                     msg += "Details follow:\r\n\r\n"
                     self._ShowExceptionError(title, msg, e)
 
+    def _GetCatalog(self):
+        # open the object catalog, or return None if it is unavailable
+
+        if self._catalog is None and self._catalogError is None:
+            try:
+                self._catalog = ObjectCatalog.GetInstance()
+            except Exception as e:
+                self._catalogError = e
+
+        return self._catalog
+
+    def _GetPointingAtText(self, sts):
+        # get the name of the catalog object nearest the telescope's
+        # position
+
+        if not sts.Connected or sts.Slewing or math.isnan(sts.RightAscension):
+            return ""
+
+        catalog = self._GetCatalog()
+
+        if catalog is None:
+            return ""
+
+        # the catalog is in J2000
+
+        ra, dec = sts.RightAscension, sts.Declination
+
+        if self._IsEquinoxOfDate():
+            ra, dec = CoordinateTransform.JNowToJ2000(ra, dec)
+
+        nearest = catalog.FindNearest(float(ra), float(dec), radius=1.0, limit=1)
+
+        if len(nearest) == 0:
+            return ""
+
+        obj, separation = nearest[0]
+
+        return f"{obj.Name} ({separation * 60.0:.0f}' away)"
+
+    def _IsEquinoxOfDate(self):
+        # check whether the mount's coordinates are for the equinox of date
+
+        if self._parms is None:
+            return False
+
+        return self._parms.EquatorialSystem == EquatorialCoordinateType.equTopocentric
+
+    def _CompleteTargetName(self, event):
+        # offer the catalog names that start with the text typed so far
+
+        if event.keysym in ("Return", "Up", "Down", "Escape"):
+            return
+
+        catalog = self._GetCatalog()
+
+        if catalog is None:
+            return
+
+        self._nameEntry["values"] = catalog.CompleteName(
+            self._targetNameDisplay.get(), limit=12
+        )
+
+    def _FindTarget(self):
+        # look up the entered object name and fill in its coordinates as the
+        # target
+
+        name = self._targetNameDisplay.get().strip()
+
+        if name == "":
+            return
+
+        title = "Object Lookup Error"
+        catalog = self._GetCatalog()
+
+        if catalog is None:
+            msg = "The object catalog could not be opened. "
+            msg += "Details follow:\r\n\r\n"
+            self._ShowExceptionError(title, msg, self._catalogError)
+            return
+
+        obj = catalog.FindByName(name)
+
+        if obj is None:
+            msg = f"'{name}' was not found in the object catalog."
+            messagebox.showerror(title, msg)
+            return
+
+        # the catalog is in J2000, so precess the coordinates for a mount
+        # that works in the equinox of date
+
+        primaryTgt = obj.RightAscension
+        secondaryTgt = obj.Declination
+
+        if self._IsEquinoxOfDate():
+            primaryTgt, secondaryTgt = CoordinateTransform.J2000ToJNow(
+                primaryTgt, secondaryTgt
+            )
+
+        if self._status.Connected and not self._status.Tracking:
+            # the target is entered as an azimuth and altitude
+
+            try:
+                transform = CoordinateTransform.FromParameters(self._parms)
+            except ValueError as e:
+                msg = "The object's azimuth and altitude cannot be "
+                msg += "calculated. Details follow:\r\n\r\n"
+                self._ShowExceptionError(title, msg, e)
+                return
+
+            primaryTgt, secondaryTgt = transform.EquatorialToHorizontal(
+                primaryTgt, secondaryTgt, self._status.SiderealTime
+            )
+
+        self._primaryAxisTargetDisplay.set(
+            locale.format_string("%.5f", float(primaryTgt))
+        )
+        self._secondaryAxisTargetDisplay.set(
+            locale.format_string("%.5f", float(secondaryTgt))
+        )
+
+    def _SyncToTarget(self):
+        # click handler for the Sync button. The telescope is centered on
+        # the target, so its coordinates are the true position.
+
+        if self._status is None or not self._status.Connected:
+            return
+
+        title = "Sync Error"
+
+        if not self._status.Tracking:
+            msg = "The telescope can only be synced to a right ascension "
+            msg += "and declination while it is tracking."
+            messagebox.showerror(title, msg)
+            return
+
+        try:
+            ra = locale.atof(self._primaryAxisTargetDisplay.get())
+            dec = locale.atof(self._secondaryAxisTargetDisplay.get())
+        except ValueError:
+            messagebox.showerror(title, "The target coordinates are not valid.")
+            return
+
+        if not Validator.InRange(ra, 0.0, True, 24.0, False) or not (
+            Validator.InRange(dec, -90.0, True, 90.0, True)
+        ):
+            messagebox.showerror(title, "The target coordinates are not valid.")
+            return
+
+        try:
+            self._mgr.SyncToCoordinates(ra, dec)
+        except Exception as e:
+            msg = "Unable to sync the telescope. Details follow:\r\n\r\n"
+            self._ShowExceptionError(title, msg, e)
+
+    def _OnPointingModelToggle(self):
+        # handler for the pointing model checkbox
+
+        self._mgr.SetPointingModelEnabled(self._pointingModelDisplay.get() == "on")
+        self._UpdatePointingModelDisplay()
+
+    def _ClearPointingModel(self):
+        # click handler for the pointing model's Clear button
+
+        model = self._mgr.PointingModel
+
+        if model.PointCount == 0:
+            return
+
+        msg = f"Discard the {model.PointCount} sync points of the pointing model?"
+
+        if messagebox.askyesno("Clear Pointing Model", msg, parent=self._parent):
+            self._mgr.ClearPointingModel()
+            self._UpdatePointingModelDisplay()
+
+    def _UpdatePointingModelDisplay(self):
+        # show the state of the pointing model and how well it fits
+
+        model = self._mgr.PointingModel
+        self._pointingModelDisplay.set("on" if model.IsEnabled else "off")
+        text = f"{model.PointCount} points"
+
+        if model.PointCount > 1 and math.isfinite(model.RmsError):
+            text += f', {model.RmsError:.0f}" RMS'
+
+        self._pointingPointsDisplay.set(text)
+
     def _AbortSlew(self):
         # immediately stop any slew in progress
 
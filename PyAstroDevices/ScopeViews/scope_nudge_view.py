@@ -11,6 +11,7 @@ from alpaca.telescope import *  # Multiple Classes including Enumerations
 
 from scope_status import TelescopeStatus
 from scope_helpers import *
+from scope_gamepad import GamepadJog
 from exception_formatter import ExceptionFormatter
 
 
@@ -22,6 +23,25 @@ class TelescopeNudgeView:
 
     _ERROR_TITLE = "Telescope Driver Error"
 
+    # the arrow keys nudge the telescope like the direction buttons. Shift
+    # nudges at the fastest rate and Control at the slowest.
+
+    _JOG_KEYS = {
+        "Up": NudgeDirection.North,
+        "Down": NudgeDirection.South,
+        "Left": NudgeDirection.West,
+        "Right": NudgeDirection.East,
+    }
+    _JOG_MODIFIERS = {
+        "Shift_L": 0x1,
+        "Shift_R": 0x1,
+        "Control_L": 0x4,
+        "Control_R": 0x4,
+    }
+    _JOG_LEASE = 0.5  # seconds that a key nudge continues without a renewal
+    _KEEP_ALIVE_INTERVAL = 100  # milliseconds between renewals of the lease
+    _RELEASE_DELAY = 30  # milliseconds to wait for a key to repeat
+
     def __init__(self, parentFrame, scopeManager):
         # instance initializer
 
@@ -64,6 +84,19 @@ class TelescopeNudgeView:
         self._selectedNudgeRateDisplay.set(bl)
         self._isConnectedDisplay = tk.StringVar(master=None)
         self._isConnectedDisplay.set("Not Connected")
+        self._latencyDisplay = tk.StringVar(master=None)
+        self._latencyDisplay.set(bl)
+        self._gamepadDisplay = tk.StringVar(master=None)
+        self._gamepadDisplay.set("off")
+
+        # the state of the keyboard and gamepad nudges
+
+        self._heldKeys = []
+        self._jogModifiers = 0
+        self._jogCommands = [None, None]
+        self._releaseJobs = {}
+        self._keepAliveJob = None
+        self._gamepad = GamepadJog(scopeManager)
 
         self._nudgeBtnDisplay = []
 
@@ -78,10 +111,12 @@ class TelescopeNudgeView:
 
         # create the telescope status update listener
 
-        pub.subscribe(self._StatusListener, "TelescopeStatusUpdate")
-        pub.subscribe(self._ParmsListener, "TelescopeParametersUpdate")
-        pub.subscribe(self._CapsListener, "TelescopeCapabilitiesUpdate")
-        pub.subscribe(self._ScopeDisconnectListener, "ScopeDisconnect")
+        pub.subscribe(self._StatusListener, self._mgr.Topic("TelescopeStatusUpdate"))
+        pub.subscribe(self._ParmsListener, self._mgr.Topic("TelescopeParametersUpdate"))
+        pub.subscribe(
+            self._CapsListener, self._mgr.Topic("TelescopeCapabilitiesUpdate")
+        )
+        pub.subscribe(self._ScopeDisconnectListener, self._mgr.Topic("ScopeDisconnect"))
 
     # Start of Public Properties and Methods
 
@@ -125,6 +160,26 @@ class TelescopeNudgeView:
         )
         self._flipBtn.pack(side=tk.LEFT, padx=(4, 0), ipadx=2)
 
+        # create the checkbox that nudges from a gamepad, which is only
+        # enabled when the evdev package is installed
+
+        self._gamepadChkbox = ttk.Checkbutton(
+            nudgeTopFrame,
+            text="Gamepad",
+            variable=self._gamepadDisplay,
+            command=self._OnGamepadToggle,
+            onvalue="on",
+            offvalue="off",
+        )
+        self._gamepadChkbox.pack(side=tk.LEFT, padx=(8, 0))
+
+        if not GamepadJog.IsAvailable():
+            self._gamepadChkbox.state(["disabled"])
+
+        ttk.Label(nudgeTopFrame, textvariable=self._latencyDisplay).pack(
+            side=tk.LEFT, padx=(8, 0)
+        )
+
         # now create the frames to hold the nudge controls, the label
         # frame (groupbox) to hold the state variables, and the other
         # actions label frame to hold the Set Park button
@@ -280,7 +335,7 @@ class TelescopeNudgeView:
         ttk.Label(
             labels1Frame,
             textvariable=self._slewingFlagDisplay,
-            width=7,
+            width=12,
             style="ValueText.TLabel",
         ).pack(side=tk.LEFT, padx=3)
         ttk.Label(
@@ -334,6 +389,14 @@ class TelescopeNudgeView:
         nudgeBottomFrame.pack(side=tk.TOP, anchor="w", fill="x")
         self._parent.pack()
 
+        # the arrow keys are bound to the top level window, so that they
+        # work whichever widget on the page has the focus
+
+        top = self._parent.winfo_toplevel()
+        top.bind("<KeyPress>", self._OnJogKeyPress, add="+")
+        top.bind("<KeyRelease>", self._OnJogKeyRelease, add="+")
+        top.bind("<FocusOut>", self._OnJogFocusOut, add="+")
+
     def _ParmsListener(self, parms):
         # callback to handle messages with fresh parameters values
 
@@ -430,6 +493,12 @@ class TelescopeNudgeView:
 
         if sts.Slewing:
             text = "Slewing"
+            remaining = self._mgr.SlewEstimator.RemainingTime
+
+            # count down to the estimated end of the slew
+
+            if not math.isnan(remaining):
+                text = f"Slewing {remaining:.0f}s"
 
         self._slewingFlagDisplay.set(text)
 
@@ -464,6 +533,14 @@ class TelescopeNudgeView:
 
         self._setParkBtn.state(state)
 
+        # show the nudge latency, and clear the Gamepad checkbox if the
+        # gamepad has stopped
+
+        self._ShowJogLatency()
+
+        if not self._gamepad.IsRunning:
+            self._gamepadDisplay.set("off")
+
         # enable/disable the Find Home button
 
         if self._caps.CanFindHome:
@@ -479,6 +556,10 @@ class TelescopeNudgeView:
 
         self._isConnectedDisplay.set("Not Connected")
 
+        self._ReleaseJogKeys()
+        self._gamepad.Stop()
+        self._gamepadDisplay.set("off")
+
         self._SetNudgeButtonLabels()
         self._HideFindHomeButton()
 
@@ -670,6 +751,214 @@ class TelescopeNudgeView:
             msg += "Details follow:\r\n\r\n"
             self._ShowExceptionError(self._ERROR_TITLE, msg, e)
     
+    def _OnJogKeyPress(self, event):
+        # key press handler for the arrow keys and their modifiers. Held
+        # keys repeat, so this is called many times for each key.
+
+        if event.keysym in self._JOG_MODIFIERS:
+            self._jogModifiers |= self._JOG_MODIFIERS[event.keysym]
+            self._UpdateJog()
+
+            return
+
+        if event.keysym == "Escape":
+            self._ReleaseJogKeys()
+
+            return
+
+        direction = self._JOG_KEYS.get(event.keysym)
+
+        if direction is None or not self._CanJog(event):
+            return
+
+        # a press that follows a release at once is the key repeating
+
+        job = self._releaseJobs.pop(event.keysym, None)
+
+        if job is not None:
+            self._parent.after_cancel(job)
+
+        if direction not in self._heldKeys:
+            self._heldKeys.append(direction)
+
+        self._jogModifiers = event.state & 0x5
+        self._UpdateJog()
+
+    def _OnJogKeyRelease(self, event):
+        # key release handler for the arrow keys and their modifiers
+
+        if event.keysym in self._JOG_MODIFIERS:
+            self._jogModifiers &= ~self._JOG_MODIFIERS[event.keysym]
+            self._UpdateJog()
+
+            return
+
+        direction = self._JOG_KEYS.get(event.keysym)
+
+        if direction is None or direction not in self._heldKeys:
+            return
+
+        # wait briefly before stopping, in case the key is repeating
+
+        keysym = event.keysym
+        self._releaseJobs[keysym] = self._parent.after(
+            self._RELEASE_DELAY, lambda: self._ReleaseJogKey(keysym)
+        )
+
+    def _OnJogFocusOut(self, event):
+        # the key releases are not seen once the window loses the focus, so
+        # stop nudging when the focus moves
+
+        self._ReleaseJogKeys()
+
+    def _CanJog(self, event):
+        # the arrow keys nudge the telescope when this page is showing and
+        # the focus is not in a widget that uses them
+
+        if not self._mgr.IsConnected or not self._nudgeRates:
+            return False
+
+        if not self._parent.winfo_viewable():
+            return False
+
+        return not isinstance(event.widget, (tk.Entry, ttk.Entry))
+
+    def _ReleaseJogKey(self, keysym):
+        # stop nudging in the direction of a key that has been released
+
+        self._releaseJobs.pop(keysym, None)
+        direction = self._JOG_KEYS[keysym]
+
+        if direction in self._heldKeys:
+            self._heldKeys.remove(direction)
+
+        self._UpdateJog()
+
+    def _ReleaseJogKeys(self):
+        # stop all the nudges that were started from the keyboard
+
+        for job in self._releaseJobs.values():
+            self._parent.after_cancel(job)
+
+        self._releaseJobs.clear()
+        self._heldKeys.clear()
+        self._UpdateJog()
+
+    def _GetJogRate(self):
+        # get the key nudge rate, from the selected rate and the modifiers
+
+        rates = sorted(rate.Rate for rate in self._nudgeRates)
+
+        if self._jogModifiers & 0x1:
+            return rates[-1]
+
+        if self._jogModifiers & 0x4:
+            return rates[0]
+
+        ndx = self._nudgeRates_cbx.current()
+
+        return self._nudgeRates[ndx].Rate
+
+    def _UpdateJog(self):
+        # nudge each axis in the direction of its most recently pressed key,
+        # sending only the changes
+
+        axes = (
+            (NudgeDirection.West, NudgeDirection.East),
+            (NudgeDirection.North, NudgeDirection.South),
+        )
+
+        try:
+            for index, axisKeys in enumerate(axes):
+                held = [d for d in self._heldKeys if d in axisKeys]
+                command = None
+
+                if held:
+                    command = (held[-1], self._GetJogRate())
+
+                if command == self._jogCommands[index]:
+                    continue
+
+                if command is None:
+                    direction = self._jogCommands[index][0]
+                    self._mgr.StopNudgeScope(direction)
+                else:
+                    self._mgr.StartNudgeScope(*command, lease=self._JOG_LEASE)
+
+                self._jogCommands[index] = command
+        except Exception as e:
+            commands = [c for c in self._jogCommands if c is not None]
+            self._heldKeys.clear()
+            self._jogCommands = [None, None]
+
+            try:
+                for direction, _ in commands:
+                    self._mgr.StopNudgeScope(direction)
+            except Exception:
+                # the telescope has been disconnected
+
+                pass
+
+            msg = "Unable to nudge the telescope from the keyboard. "
+            msg += "Details follow:\r\n\r\n"
+            self._ShowExceptionError(self._ERROR_TITLE, msg, e)
+
+        if self._jogCommands != [None, None] and self._keepAliveJob is None:
+            self._KeepJogAlive()
+
+    def _KeepJogAlive(self):
+        # renew the leases while keys are held. If the user interface stops
+        # responding the leases run out and the axes that the keys move are
+        # stopped.
+
+        self._keepAliveJob = None
+        directions = [c[0] for c in self._jogCommands if c is not None]
+
+        if not directions:
+            return
+
+        self._mgr.KeepNudgeAlive(directions, self._JOG_LEASE)
+        self._ShowJogLatency()
+        self._keepAliveJob = self._parent.after(
+            self._KEEP_ALIVE_INTERVAL, self._KeepJogAlive
+        )
+
+    def _ShowJogLatency(self):
+        # show the mean time from a press or a release to the command that
+        # it sent
+
+        stats = self._mgr.NudgeController.GetLatencyStatistics()
+        text = ""
+
+        if stats["Count"] > 0:
+            start = stats["MeanStartLatency"] * 1000.0
+            stop = stats["MeanStopLatency"] * 1000.0
+            text = "Latency:"
+
+            if not math.isnan(start):
+                text += f" start {start:.0f} ms"
+
+            if not math.isnan(stop):
+                text += f" stop {stop:.0f} ms"
+
+        self._latencyDisplay.set(text)
+
+    def _OnGamepadToggle(self):
+        # handler for the Gamepad checkbox
+
+        if self._gamepadDisplay.get() == "off":
+            self._gamepad.Stop()
+
+            return
+
+        try:
+            self._gamepad.Start()
+        except Exception as e:
+            self._gamepadDisplay.set("off")
+            msg = "Unable to nudge the telescope from a gamepad. "
+            msg += "Details follow:\r\n\r\n"
+            self._ShowExceptionError(self._ERROR_TITLE, msg, e)
+
     def _ShowButton(self, widget, side, padx, pady):
         # unhide a widget
         widget.pack(side=side, padx=padx, pady=pady)
@@ -9,6 +9,7 @@ from alpaca.telescope import *  # Multiple Classes including Enumerations
 
 from scope_parameters import TelescopeParameters
 from scope_helpers import *
+from device_topic import DeviceTopic
 
 
 class AlignmentModeSwitch(Switch):
@@ -58,9 +59,10 @@ class TelescopeParametersView(object):
     Telescope Static Properties tab page
     """
 
-    def __init__(self, parentFrame):
+    def __init__(self, parentFrame, deviceId=None):
         # instance initializer
         self._parent = parentFrame
+        self._deviceId = deviceId
 
         # create the variables that are bound to the U/I
 
@@ -87,12 +89,13 @@ class TelescopeParametersView(object):
         # fill the _parameters instance with default values and
         # populate the U/I
 
-        self._parameters = TelescopeParameters()
+        self._parameters = TelescopeParameters(deviceId=self._deviceId)
         self._ParmsListener(self._parameters)
 
         # subscribe to parameters update messages
 
-        pub.subscribe(self._ParmsListener, "TelescopeParametersUpdate")
+        topic = DeviceTopic.Format("TelescopeParametersUpdate", self._deviceId)
+        pub.subscribe(self._ParmsListener, topic)
 
     # Start of Public Properties and Methods
 
@@ -1,14 +1,19 @@
 import locale
+import os
+from datetime import datetime
 
 import tkinter as tk
 from tkinter import font as tkFont
 from tkinter import ttk
+from tkinter import filedialog
+from tkinter import messagebox
 from pubsub import pub
 from alpaca.telescope import *  # Multiple Classes including Enumerations
 
 from scope_status import TelescopeStatus
 from scope_helpers import DriveRatesSwitch
 from float_entry_widget import FloatEntry
+from exception_formatter import ExceptionFormatter
 
 
 class TelescopeTrackingRatesView:
@@ -17,6 +22,8 @@ class TelescopeTrackingRatesView:
     Telescope Tracking Rates tab page.
     """
 
+    _ERROR_TITLE = "Telescope Driver Error"
+
     def __init__(self, parentFrame, scopeManager):
         # instance initializer
 
@@ -47,6 +54,10 @@ class TelescopeTrackingRatesView:
         self._decOffsetNewRateDisplay.set(bl)
         self._decOffsetNewUnitsDisplay = tk.StringVar(master=None)
         self._decOffsetNewUnitsDisplay.set("arc-seconds / SI second")
+        self._ephemerisFileDisplay = tk.StringVar(master=None)
+        self._ephemerisFileDisplay.set("No ephemeris is loaded.")
+        self._ephemerisStateDisplay = tk.StringVar(master=None)
+        self._ephemerisStateDisplay.set(bl)
 
         # add the widgets to the view
 
@@ -55,13 +66,19 @@ class TelescopeTrackingRatesView:
         # initialize the status object
 
         self._status = TelescopeStatus()
+        self._caps = None
 
         # create the message handlers that we will use
 
-        pub.subscribe(self._StatusListener, "TelescopeStatusUpdate")
-        pub.subscribe(self._ParmsListener, "TelescopeParametersUpdate")
-        pub.subscribe(self._CapsListener, "TelescopeCapabilitiesUpdate")
-        pub.subscribe(self._ScopeDisconnectListener, "ScopeDisconnect")
+        pub.subscribe(self._StatusListener, self._mgr.Topic("TelescopeStatusUpdate"))
+        pub.subscribe(self._ParmsListener, self._mgr.Topic("TelescopeParametersUpdate"))
+        pub.subscribe(
+            self._CapsListener, self._mgr.Topic("TelescopeCapabilitiesUpdate")
+        )
+        pub.subscribe(self._ScopeDisconnectListener, self._mgr.Topic("ScopeDisconnect"))
+        pub.subscribe(
+            self._EphemerisListener, self._mgr.Topic("TelescopeEphemerisUpdate")
+        )
 
     # Start of Public Methods
 
@@ -84,6 +101,7 @@ class TelescopeTrackingRatesView:
         ratesTopFrame.grid_rowconfigure(1)
         ratesTopFrame.grid_rowconfigure(2)
         ratesTopFrame.grid_rowconfigure(3)
+        ratesTopFrame.grid_rowconfigure(4)
         ratesTopFrame.grid_columnconfigure(0, weight=1)
 
         ttk.Label(
@@ -281,8 +299,41 @@ class TelescopeTrackingRatesView:
         btemp.grid(row=0, column=3, rowspan=3, sticky="NE", pady=10)
         self._sendBtn = btemp
 
+        # create and populate the groupbox that contains the widgets for
+        # following a moving object from an ephemeris file
+
+        ephemerisFrame = tk.LabelFrame(ratesTopFrame, text="Follow An Ephemeris")
+
+        for r in range(2):
+            ephemerisFrame.grid_rowconfigure(r)
+
+        for c in range(3):
+            ephemerisFrame.grid_columnconfigure(c)
+
+        self._loadEphemerisBtn = ttk.Button(
+            ephemerisFrame, text="Load...", command=self._OnLoadEphemeris
+        )
+        self._loadEphemerisBtn.grid(row=0, column=0, sticky="w", padx=6, pady=4)
+        ttk.Label(
+            ephemerisFrame, textvariable=self._ephemerisFileDisplay, width=52
+        ).grid(row=0, column=1, columnspan=2, sticky="w")
+
+        self._followBtn = ttk.Button(
+            ephemerisFrame,
+            text="Start",
+            state="disabled",
+            command=self._OnFollowEphemeris,
+        )
+        self._followBtn.grid(row=1, column=0, sticky="w", padx=6, pady=4)
+        ttk.Label(
+            ephemerisFrame,
+            textvariable=self._ephemerisStateDisplay,
+            style="ValueText.TLabel",
+        ).grid(row=1, column=1, columnspan=2, sticky="w")
+
         rateButtonsFrame.grid(row=2, column=0, padx=60, sticky="w")
         changeRatesFrame.grid(row=3, column=0, sticky="wn", ipadx=6, padx=6, pady=6)
+        ephemerisFrame.grid(row=4, column=0, sticky="wn", ipadx=6, padx=6, pady=6)
         ratesTopFrame.pack(side=tk.TOP, anchor="nw", fill="x")
         self._parent.pack()
 
@@ -307,6 +358,7 @@ class TelescopeTrackingRatesView:
 
         if caps.CanSetRightAscensionRate and caps.CanSetDeclinationRate:
             self._sendBtn["state"] = tk.NORMAL
+            self._SetFollowButtonState()
 
     def _StatusListener(self, sts):
         # callback to handle status updates
@@ -349,6 +401,7 @@ class TelescopeTrackingRatesView:
         self._solarRateBtn["state"] = tk.DISABLED
         self._kingRateBtn["state"] = tk.DISABLED
         self._sendBtn["state"] = tk.DISABLED
+        self._followBtn["state"] = tk.DISABLED
 
         rate = self._rateUnits[0]
         self._newRatesUnitsDisplay.set(rate[1])
@@ -444,6 +497,82 @@ class TelescopeTrackingRatesView:
 
         self._SetTrackingRate(DriveRates.driveKing)
 
+    def _OnLoadEphemeris(self):
+        # button click handler to read a JPL Horizons ephemeris file
+
+        filename = filedialog.askopenfilename(
+            parent=self._parent,
+            title="Open a JPL Horizons Ephemeris",
+            filetypes=(("Text Files", "*.txt"), ("All Files", "*.*")),
+        )
+
+        if not filename:
+            return
+
+        try:
+            table = self._mgr.EphemerisTracker.Load(filename)
+        except Exception as e:
+            msg = "Unable to read the ephemeris file. Details follow:\r\n\r\n"
+            self._ShowExceptionError("Ephemeris File Error", msg, e)
+
+            return
+
+        start = datetime.fromtimestamp(table.StartTime).strftime("%Y-%m-%d %H:%M")
+        end = datetime.fromtimestamp(table.EndTime).strftime("%Y-%m-%d %H:%M")
+        msg = f"{os.path.basename(filename)}, {start} to {end}"
+        self._ephemerisFileDisplay.set(msg)
+        self._SetFollowButtonState()
+
+    def _OnFollowEphemeris(self):
+        # button click handler to start or stop following the ephemeris
+
+        tracker = self._mgr.EphemerisTracker
+
+        try:
+            if tracker.IsRunning:
+                tracker.Stop()
+            else:
+                tracker.Start()
+        except Exception as e:
+            msg = "Unable to follow the ephemeris. Details follow:\r\n\r\n"
+            self._ShowExceptionError(self._ERROR_TITLE, msg, e)
+
+    def _EphemerisListener(self, isRunning, rates):
+        # callback to handle changes to the ephemeris tracking
+
+        text = ""
+
+        if isRunning and rates is not None:
+            raRate = locale.format_string("%.3f", rates[0])
+            decRate = locale.format_string("%.3f", rates[1])
+            text = f"Following at {raRate}, {decRate} arc-seconds / hour"
+
+        self._ephemerisStateDisplay.set(text)
+        self._followBtn.config(text="Stop" if isRunning else "Start")
+
+    def _SetFollowButtonState(self):
+        # the ephemeris can only be followed if both rates can be set
+
+        caps = self._caps
+        state = tk.DISABLED
+
+        if (
+            caps is not None
+            and caps.CanSetRightAscensionRate
+            and caps.CanSetDeclinationRate
+            and self._mgr.EphemerisTracker.Table is not None
+        ):
+            state = tk.NORMAL
+
+        self._followBtn["state"] = state
+
+    def _ShowExceptionError(self, title, message, xcp):
+        msg = message
+        formatter = ExceptionFormatter.GetInstance()
+        msg += formatter.Format(xcp)
+        root = self._parent
+        messagebox.showerror(title, msg, parent=root)
+
     def _SetTrackingRate(self, driveRate):
         try:
             self._mgr.SetTrackingRate(driveRate)
@@ -9,6 +9,7 @@ from scope_mgr import TelescopeManager
 from scope_status import TelescopeStatus
 from scope_parameters import TelescopeParameters
 from exception_formatter import ExceptionFormatter
+from device_topic import DeviceTopic
 
 from scope_nudge_view import TelescopeNudgeView
 from scope_direct_slew_view import TelescopeDirectSlewView
@@ -27,12 +28,19 @@ class TelescopeView:
     Capabilities, and Static Properties views.
     """
 
-    def __init__(self, parentFrame):
+    def __init__(self, parentFrame, deviceId=None):
         # instance initializer
+        #
+        # deviceId -- the ID of the telescope instance that this view
+        #             controls. The default is the first telescope.
+
+        if deviceId is None:
+            deviceId = DeviceTopic.MakeDeviceId("telescope", 1)
 
         self._parent = parentFrame
+        self._deviceId = deviceId
         self._isConnected = False
-        self._mgr = TelescopeManager()
+        self._mgr = TelescopeManager(deviceId)
         self._status = TelescopeStatus()
         self._connectButtonText = tk.StringVar(master=None)
         self._connectButtonText.set("Connect Telescope")
@@ -43,7 +51,7 @@ class TelescopeView:
 
         self._settings = ApplicationSettings.GetInstance()
         self._settings.InitFromSettingsFile()
-        name = self._settings.TelescopeDriverName
+        name = self._settings.GetDeviceConfiguration(deviceId).DriverName
 
         if len(name) != 0:
             name = f"({name})"
@@ -51,7 +59,7 @@ class TelescopeView:
 
         # initialize the parameters object
 
-        self._parms = TelescopeParameters()
+        self._parms = TelescopeParameters(deviceId=deviceId)
 
         self._CreateWidgets()
 
@@ -65,13 +73,17 @@ class TelescopeView:
     def set_IsConnected(self, value):
         self._isConnected = value
 
+    @property
+    def DeviceId(self):
+        return self._deviceId
+
     def ConnectTelescope(self):
         """
         Connect to the telescope
         """
         # subscribe to parameters updates
 
-        pub.subscribe(self._ParmsListener, "TelescopeParametersUpdate")
+        pub.subscribe(self._ParmsListener, self._mgr.Topic("TelescopeParametersUpdate"))
 
         # send a message to the main view to select the hourglass cursor
         # in case the connect operation takes significant time.
@@ -80,10 +92,11 @@ class TelescopeView:
 
         # do the connect
 
+        config = self._settings.GetDeviceConfiguration(self._deviceId)
         success = self._mgr.Connect(
-            self._settings.TelescopeAddress,
-            self._settings.TelescopeDeviceNumber,
-            self._settings.TelescopeProtocol,
+            config.Address,
+            config.DeviceNumber,
+            config.Protocol,
         )
 
         # connect is complete, change back to the arrow cursor
@@ -120,13 +133,13 @@ class TelescopeView:
         self._telescopeSelect_btn.config(state=tk.NORMAL)
         self._isConnected = False
 
-        name = self._settings.TelescopeDriverName
+        name = self._settings.GetDeviceConfiguration(self._deviceId).DriverName
 
         if len(name) > 0:
             name = "(" + name + ")"
 
         self._telescopeIdDisplay.set(name)
-        pub.sendMessage("ScopeDisconnect")
+        pub.sendMessage(self._mgr.Topic("ScopeDisconnect"))
 
     # End of Public Properties and Methods
 
@@ -144,7 +157,7 @@ class TelescopeView:
 
         btn = ttk.Button(row0Frame, textvariable=self._connectButtonText, width=20)
         state = tk.NORMAL
-        if self._settings.TelescopeAddress == "":
+        if self._settings.GetDeviceConfiguration(self._deviceId).Address == "":
             state = tk.DISABLED
         btn.config(command=self._OnConnectButtonClick, state=state)
         btn.grid(row=0, column=0, padx=4, pady=4, sticky="NW")
@@ -183,8 +196,8 @@ class TelescopeView:
         self._nudgeView = TelescopeNudgeView(nudgeTab, self._mgr)
         self._directSlewView = TelescopeDirectSlewView(directTab, self._mgr)
         self._trackingRatesView = TelescopeTrackingRatesView(ratesTab, self._mgr)
-        self._capsView = TelescopeCapabilitiesView(capabilitiesTab)
-        self._parmsView = TelescopeParametersView(parametersTab)
+        self._capsView = TelescopeCapabilitiesView(capabilitiesTab, self._deviceId)
+        self._parmsView = TelescopeParametersView(parametersTab, self._deviceId)
 
         # add the tab pages to the Telescope Notebook
 
@@ -244,6 +257,7 @@ class TelescopeView:
             device.Address,
             device.DeviceNumber,
             device.Protocol,
+            deviceId=self._deviceId,
         )
 
         self._settings.SaveSettings()
@@ -258,7 +272,7 @@ class TelescopeView:
 
         if tab == "Direct Slew":
             self._mgr.ImmediateStatusUpdate()
-            pub.sendMessage("DirectSlewActivated")
+            pub.sendMessage(self._mgr.Topic("DirectSlewActivated"))
 
     def _ShowExceptionError(self, title, message, xcp):
         msg = message